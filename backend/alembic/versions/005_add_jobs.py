@@ -0,0 +1,43 @@
+"""add background jobs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='queued'),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_jobs_id', 'jobs', ['id'])
+    op.create_index('ix_jobs_job_type', 'jobs', ['job_type'])
+    op.create_index('ix_jobs_status', 'jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status', 'jobs')
+    op.drop_index('ix_jobs_job_type', 'jobs')
+    op.drop_index('ix_jobs_id', 'jobs')
+    op.drop_table('jobs')
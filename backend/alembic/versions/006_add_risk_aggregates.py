@@ -0,0 +1,67 @@
+"""add materialized risk aggregates
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    risk_aggregates = op.create_table(
+        'risk_aggregates',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('total_risks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('high_severity_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('escalated_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('approval_pending', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('risk_score_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('risks_by_category', sa.JSON(), nullable=False),
+        sa.Column('risks_by_severity', sa.JSON(), nullable=False),
+        sa.Column('risks_by_status', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+    
+    # Backfill from existing risks with one GROUP BY, rolled up per project
+    conn = op.get_bind()
+    groups = conn.execute(text(
+        "SELECT project_id, category, severity, status, COUNT(*), "
+        "SUM(CASE WHEN is_escalated IS NOT NULL AND is_escalated <> 0 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN approval_status = 'pending' THEN 1 ELSE 0 END), "
+        "SUM(COALESCE(risk_score, 0)) "
+        "FROM risks GROUP BY project_id, category, severity, status"
+    )).fetchall()
+    
+    rows = {}
+    for project_id, category, severity, status, count, escalated, pending, score_sum in groups:
+        row = rows.setdefault(project_id, {
+            'project_id': project_id, 'total_risks': 0, 'high_severity_count': 0,
+            'escalated_count': 0, 'approval_pending': 0, 'risk_score_sum': 0.0,
+            'risks_by_category': {}, 'risks_by_severity': {}, 'risks_by_status': {},
+        })
+        row['total_risks'] += count
+        row['high_severity_count'] += count if severity == 'high' else 0
+        row['escalated_count'] += escalated or 0
+        row['approval_pending'] += pending or 0
+        row['risk_score_sum'] += float(score_sum or 0)
+        for key, value in (('risks_by_category', category), ('risks_by_severity', severity), ('risks_by_status', status)):
+            row[key][value] = row[key].get(value, 0) + count
+    
+    if rows:
+        op.bulk_insert(risk_aggregates, list(rows.values()))
+
+
+def downgrade() -> None:
+    op.drop_table('risk_aggregates')
@@ -0,0 +1,34 @@
+"""add allocated hours counter to resources
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'resources',
+        sa.Column('allocated_hours', sa.Numeric(10, 2), nullable=False, server_default='0'),
+    )
+    
+    # Backfill from existing allocations with one correlated UPDATE
+    op.execute(
+        "UPDATE resources SET allocated_hours = COALESCE("
+        "(SELECT SUM(allocations.allocated_hours) FROM allocations "
+        "WHERE allocations.resource_id = resources.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('resources', 'allocated_hours')
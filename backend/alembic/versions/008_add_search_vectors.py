@@ -0,0 +1,55 @@
+"""add full-text search vectors
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+# Weighted tsvector per searchable table; must match SEARCH_FIELDS in app/services/search_service.py
+SEARCH_VECTORS = {
+    'meetings': (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(decisions, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(raw_text, '')), 'C')"
+    ),
+    'action_items': (
+        "setweight(to_tsvector('english', coalesce(description, '')), 'A')"
+    ),
+    'risks': (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(mitigation_plan, '')), 'C')"
+    ),
+}
+
+
+def upgrade() -> None:
+    # Other databases use the in-process search index instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for table, vector in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for table in SEARCH_VECTORS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,32 @@
+"""add single-flight results
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'single_flight_results',
+        sa.Column('key', sa.String(128), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_single_flight_results_finished_at', 'single_flight_results', ['finished_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_single_flight_results_finished_at', 'single_flight_results')
+    op.drop_table('single_flight_results')
@@ -0,0 +1,34 @@
+"""add single-flight claim columns
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows from 009 are finished results
+    op.add_column('single_flight_results', sa.Column('status', sa.String(16), server_default='succeeded', nullable=False))
+    op.alter_column('single_flight_results', 'status', server_default='running')
+    op.add_column('single_flight_results', sa.Column('owner', sa.String(32), nullable=True))
+    op.add_column('single_flight_results', sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('single_flight_results', sa.Column('error', sa.Text(), nullable=True))
+    op.create_index('ix_single_flight_results_started_at', 'single_flight_results', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_single_flight_results_started_at', 'single_flight_results')
+    op.drop_column('single_flight_results', 'error')
+    op.drop_column('single_flight_results', 'started_at')
+    op.drop_column('single_flight_results', 'owner')
+    op.drop_column('single_flight_results', 'status')
@@ -0,0 +1,70 @@
+import math
+import re
+from typing import List, Tuple
+
+# "Alice:", "[10:02] Bob Smith:", "10:02:15 - Carol:" at the start of a line
+SPEAKER_PATTERN = re.compile(r"^\s*(\[?\d{1,2}:\d{2}(:\d{2})?\]?\s*[-–]?\s*)?[A-Z][\w .'()-]{0,40}:\s")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _split_units(text: str) -> List[Tuple[str, str]]:
+    """
+    Split a transcript into (separator, unit) pairs: paragraphs, and within a
+    paragraph, speaker turns. The separator is what joined the unit to the previous one.
+    """
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        separator = "\n\n"
+        turn: List[str] = []
+        for line in paragraph.splitlines():
+            if turn and SPEAKER_PATTERN.match(line):
+                units.append((separator, "\n".join(turn)))
+                separator = "\n"
+                turn = []
+            turn.append(line)
+        if turn:
+            units.append((separator, "\n".join(turn)))
+    return units
+
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """Split a single turn that exceeds the budget on sentences, then on words."""
+    pieces, current = [], ""
+    for sentence in SENTENCE_PATTERN.split(unit):
+        for part in ([sentence] if estimate_tokens(sentence) <= max_tokens else sentence.split(" ")):
+            candidate = f"{current} {part}" if current else part
+            if current and estimate_tokens(candidate) > max_tokens:
+                pieces.append(current)
+                candidate = part
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_transcript(text: str, max_tokens: int) -> List[str]:
+    """
+    Pack a transcript into chunks of at most `max_tokens` (estimated), breaking
+    only between paragraphs or speaker turns unless a single turn is too long.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current = [], ""
+    for separator, unit in _split_units(text):
+        parts = [unit] if estimate_tokens(unit) <= max_tokens else _split_oversized(unit, max_tokens)
+        for part in parts:
+            candidate = f"{current}{separator}{part}" if current else part
+            if current and estimate_tokens(candidate) > max_tokens:
+                chunks.append(current)
+                candidate = part
+            current = candidate
+            separator = " "
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,128 @@
+"""
+Token-budgeted prompt context.
+
+A context is a list of titled sections. Each section has an optional aggregate
+line that is always kept (counts, totals) and a list of detail items, ranked
+most important first. build() keeps every section's aggregate, then fills the
+remaining budget with items in rank order: first up to each section's
+weighted share, then whatever is left goes to the heaviest sections. Items that
+do not fit are replaced by one "omitted" note, so the prompt says what was left
+out instead of silently dropping it. The result stays within the budget unless
+the headers, aggregates and notes alone exceed it. Token counts use the same
+estimate as app.ai.chunking.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+from app.ai.chunking import estimate_tokens
+
+# Reserved per section for the note that replaces omitted items
+OMISSION_NOTE_TOKENS = 24
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """`text` cut at a word boundary to about `max_tokens`, marked with an ellipsis."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(max_tokens * 4 - 2, 0)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return f"{cut.rstrip()} …"
+
+
+@dataclass
+class ContextSection:
+    title: str
+    items: Sequence[str] = ()
+    summary: Optional[str] = None
+    weight: float = 1.0
+    # Note for the items that did not fit, given how many were left out (from the end)
+    omitted: Optional[Callable[[int], str]] = None
+    empty: Optional[str] = None
+    kept: List[str] = field(default_factory=list)
+
+    def header(self) -> List[str]:
+        lines = [f"--- {self.title.upper()} ---"]
+        if self.summary:
+            lines.append(self.summary)
+        return lines
+
+
+class ContextBuilder:
+    """Collects sections and renders them within `budget_tokens`."""
+
+    def __init__(self, budget_tokens: int, max_item_share: float = 0.25):
+        self.budget_tokens = budget_tokens
+        # No single item may take more than this share of the budget
+        self.max_item_tokens = max(int(budget_tokens * max_item_share), 16)
+        self.sections: List[ContextSection] = []
+
+    def add_section(
+        self,
+        title: str,
+        items: Sequence[str],
+        summary: Optional[str] = None,
+        weight: float = 1.0,
+        omitted: Optional[Callable[[int], str]] = None,
+        empty: Optional[str] = None,
+    ) -> None:
+        """A section of ranked `items` under an always-kept `summary` line."""
+        self.sections.append(ContextSection(
+            title=title,
+            items=[truncate_to_tokens(item, self.max_item_tokens) for item in items],
+            summary=truncate_to_tokens(summary, self.max_item_tokens) if summary else summary,
+            weight=weight,
+            omitted=omitted,
+            empty=empty,
+        ))
+
+    def _fixed_tokens(self, section: ContextSection) -> int:
+        """Tokens of the lines a section always renders, each counted with its newline."""
+        tokens = estimate_tokens("\n".join(section.header())) + 1
+        if section.items:
+            tokens += OMISSION_NOTE_TOKENS
+        elif section.empty:
+            tokens += estimate_tokens(section.empty) + 1
+        # Blank line after the section
+        return tokens + 1
+
+    def _fill(self, section: ContextSection, allowance: int) -> int:
+        """Keep further items of `section` within `allowance`; returns the tokens used."""
+        used = 0
+        for item in section.items[len(section.kept):]:
+            cost = estimate_tokens(item) + 1
+            if used + cost > allowance:
+                break
+            section.kept.append(item)
+            used += cost
+        return used
+
+    def build(self) -> str:
+        for section in self.sections:
+            section.kept = []
+        fixed = sum(self._fixed_tokens(section) for section in self.sections)
+        remaining = max(self.budget_tokens - fixed, 0)
+        total_weight = sum(section.weight for section in self.sections if section.items) or 1.0
+
+        shares = remaining
+        for section in self.sections:
+            if section.items:
+                remaining -= self._fill(section, int(shares * section.weight / total_weight))
+        for section in sorted(self.sections, key=lambda s: -s.weight):
+            if section.items and remaining > 0:
+                remaining -= self._fill(section, remaining)
+
+        lines: List[str] = []
+        for section in self.sections:
+            lines.extend(section.header())
+            lines.extend(section.kept)
+            left_out = len(section.items) - len(section.kept)
+            if left_out:
+                lines.append(truncate_to_tokens(
+                    section.omitted(left_out) if section.omitted else f"... {left_out} more not shown",
+                    OMISSION_NOTE_TOKENS - 1,
+                ))
+            elif not section.items and section.empty:
+                lines.append(section.empty)
+            lines.append("")
+        return "\n".join(lines).strip()
@@ -0,0 +1,149 @@
+import json
+from typing import Any, Dict, List, Optional
+
+ESCAPE_LENGTHS = {"u": 6}
+
+
+class JSONFieldStream:
+    """
+    Incremental parser for a streamed JSON object.
+    `feed` returns events as the text arrives:
+      {"event": "delta", "field": key, "text": ...}  new characters of a top-level string value
+      {"event": "field", "field": key, "value": ...} a top-level value is complete
+    `result` parses the full text once the stream has ended.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._expect = "key"
+        self._in_string = False
+        self._escape = ""
+        self._role: Optional[str] = None
+        self._chars: List[str] = []
+        self._key: Optional[str] = None
+        self._scalar: Optional[List[str]] = None
+        self._container: Optional[List[str]] = None
+        self.fields: Dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume the next piece of text and return the resulting events."""
+        self._chunks.append(chunk)
+        events: List[Dict[str, Any]] = []
+        for ch in chunk:
+            self._consume(ch, events)
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        """Parse the complete text, ignoring anything around the outermost object."""
+        text = "".join(self._chunks)
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            start, end = text.find("{"), text.rfind("}")
+            if start == -1 or end <= start:
+                raise
+            return json.loads(text[start:end + 1])
+
+    def _emit_delta(self, text: str, events: List[Dict[str, Any]]) -> None:
+        if events and events[-1]["event"] == "delta" and events[-1]["field"] == self._key:
+            events[-1]["text"] += text
+        else:
+            events.append({"event": "delta", "field": self._key, "text": text})
+
+    def _finish_value(self, value: Any, events: List[Dict[str, Any]]) -> None:
+        self.fields[self._key] = value
+        events.append({"event": "field", "field": self._key, "value": value})
+        self._expect = "comma"
+
+    def _consume_string(self, ch: str, events: List[Dict[str, Any]]) -> None:
+        if self._container is not None:
+            # Inside a nested value: only track where the string ends
+            self._container.append(ch)
+            if self._escape:
+                self._escape = ""
+            elif ch == "\\":
+                self._escape = ch
+            elif ch == '"':
+                self._in_string = False
+            return
+
+        if self._escape:
+            self._escape += ch
+            if len(self._escape) < ESCAPE_LENGTHS.get(self._escape[1], 2):
+                return
+            try:
+                text = json.loads(f'"{self._escape}"')
+            except json.JSONDecodeError:
+                text = self._escape
+            self._escape = ""
+        elif ch == "\\":
+            self._escape = ch
+            return
+        elif ch == '"':
+            self._in_string = False
+            if self._role == "key":
+                self._key = "".join(self._chars)
+                self._expect = "colon"
+            elif self._role == "value":
+                self._finish_value("".join(self._chars), events)
+            return
+        else:
+            text = ch
+
+        if self._role is not None:
+            self._chars.append(text)
+        if self._role == "value":
+            self._emit_delta(text, events)
+
+    def _consume(self, ch: str, events: List[Dict[str, Any]]) -> None:
+        if self._in_string:
+            self._consume_string(ch, events)
+            return
+
+        if self._scalar is not None:
+            if ch not in ",}" and not ch.isspace():
+                self._scalar.append(ch)
+                return
+            raw = "".join(self._scalar)
+            self._scalar = None
+            try:
+                self._finish_value(json.loads(raw), events)
+            except json.JSONDecodeError:
+                self._expect = "comma"
+
+        if self._container is not None:
+            self._container.append(ch)
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    raw = "".join(self._container)
+                    self._container = None
+                    self._finish_value(json.loads(raw), events)
+            return
+
+        if self._depth == 0:
+            if ch == "{":
+                self._depth = 1
+                self._expect = "key"
+            return
+
+        if ch == '"':
+            self._in_string = True
+            self._role = "value" if self._expect == "value" else "key"
+            self._chars = []
+        elif ch == ":":
+            self._expect = "value"
+        elif ch == ",":
+            self._expect = "key"
+        elif ch == "}":
+            self._depth = 0
+        elif self._expect == "value" and ch in "{[":
+            self._container = [ch]
+            self._depth += 1
+        elif self._expect == "value" and not ch.isspace():
+            self._scalar = [ch]
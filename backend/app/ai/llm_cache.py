@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import Dict, Any, Iterator, Optional
+from app.core.config import settings
+
+
+def make_cache_key(model: str, temperature: float, system_prompt: Optional[str], prompt: str) -> str:
+    """Content-addressed key for an LLM request."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "system_prompt": system_prompt, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LRU + TTL cache of raw LLM completions, with an optional SQLite layer on disk.
+    Entries are stored as the raw response text so every hit is parsed into a fresh object.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if sqlite_path:
+            self._init_sqlite()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for one disk operation: committed (or rolled back), then closed."""
+        with closing(sqlite3.connect(self.sqlite_path)) as conn, conn:
+            yield conn
+
+    def _init_sqlite(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT expires_at, content FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] <= time.time():
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return row
+
+    def _disk_set(self, key: str, expires_at: float, content: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, expires_at) VALUES (?, ?, ?)",
+                (key, content, expires_at),
+            )
+
+    def _remember(self, key: str, expires_at: float, content: str) -> None:
+        self._entries[key] = (expires_at, content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response text for `key`, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self._entries[key]
+
+        if self.sqlite_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row:
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content: str) -> None:
+        """Store a response text under `key`."""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, content)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._disk_set, key, expires_at, content)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the SQLite layer is left untouched)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.llm_cache_enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sqlite_path": self.sqlite_path,
+        }
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    sqlite_path=settings.llm_cache_sqlite_path,
+)
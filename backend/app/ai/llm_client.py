@@ -1,36 +1,129 @@
 import json
-from groq import AsyncGroq
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, AsyncIterator
 from app.core.config import settings
+from app.ai.llm_cache import llm_cache, make_cache_key
+from app.ai.llm_gateway import llm_gateway, create_client
+from app.ai.json_stream import JSONFieldStream
+from app.core.metrics import record_llm_call, record_llm_cache_hit
 
-# Initialize client only if API key is available
-client = AsyncGroq(api_key=settings.groq_api_key) if settings.groq_api_key else None
+# Initialize client only if API key is available; one pooled HTTP client per process
+client = create_client(settings.groq_api_key) if settings.groq_api_key else None
 
 
-async def call_llm(prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> Dict[str, Any]:
-    """
-    Centralized LLM client for Groq API calls.
-    Returns structured JSON output.
-    """
+def _ensure_client() -> None:
     if not client or not settings.groq_api_key:
         raise ValueError(
             "AI service not available. GROQ_API_KEY environment variable is not set. "
             "Get a free API key at https://console.groq.com"
         )
-    
+
+
+async def close_client() -> None:
+    """Close the shared HTTP connection pool (on shutdown)."""
+    if client is not None and hasattr(client, "close"):
+        await client.close()
+
+
+def _build_messages(prompt: str, system_prompt: Optional[str]) -> list:
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+async def call_llm(prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Centralized LLM client for Groq API calls.
+    Returns structured JSON output.
+    Calls go through the LLM gateway (deadline, retries, hedging, circuit breaker).
+    Identical requests (model, temperature, system prompt, prompt) are served from the response cache.
+    """
+    _ensure_client()
+    
+    temperature = temperature or settings.groq_temperature
+    cache_key = make_cache_key(settings.groq_model, temperature, system_prompt, prompt)
+    if settings.llm_cache_enabled:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            record_llm_cache_hit()
+            return json.loads(cached)
+    
+    messages = _build_messages(prompt, system_prompt)
 
-    response = await client.chat.completions.create(
+    start = time.perf_counter()
+    response = await llm_gateway.complete(
+        client,
         model=settings.groq_model,
         messages=messages,
-        temperature=temperature or settings.groq_temperature,
+        temperature=temperature,
     )
+    record_llm_call(time.perf_counter() - start, usage=getattr(response, "usage", None))
 
     content = response.choices[0].message.content
     if not content:
         raise ValueError("Empty response from Groq API")
-    return json.loads(content)
+    parsed = json.loads(content)
+    
+    if settings.llm_cache_enabled:
+        await llm_cache.set(cache_key, content)
+    return parsed
+
 
+async def stream_llm(prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of call_llm.
+    Yields JSONFieldStream events ("delta" for string fields as they are generated,
+    "field" when a top-level value is complete) and finally {"event": "result", "value": parsed}.
+    Cached responses are replayed as "field" events.
+    """
+    _ensure_client()
+    
+    temperature = temperature or settings.groq_temperature
+    cache_key = make_cache_key(settings.groq_model, temperature, system_prompt, prompt)
+    if settings.llm_cache_enabled:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            record_llm_cache_hit()
+            parsed = json.loads(cached)
+            for key, value in parsed.items():
+                yield {"event": "field", "field": key, "value": value}
+            yield {"event": "result", "value": parsed}
+            return
+    
+    start = time.perf_counter()
+    stream = llm_gateway.stream(
+        client,
+        model=settings.groq_model,
+        messages=_build_messages(prompt, system_prompt),
+        temperature=temperature,
+    )
+    
+    parser = JSONFieldStream()
+    received = False
+    usage = None
+    try:
+        async for chunk in stream:
+            # Groq reports usage on the final chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                received = True
+                for event in parser.feed(text):
+                    yield event
+    finally:
+        # Closes the provider stream right away when our consumer stops early
+        await stream.aclose()
+    
+    record_llm_call(time.perf_counter() - start, stream=True, usage=usage)
+    if not received:
+        raise ValueError("Empty response from Groq API")
+    parsed = parser.result()
+    if settings.llm_cache_enabled:
+        await llm_cache.set(cache_key, json.dumps(parsed))
+    yield {"event": "result", "value": parsed}
@@ -0,0 +1,358 @@
+"""
+Resilience layer between app.ai.llm_client and the Groq API.
+
+Every call gets one deadline (`llm_timeout_seconds`) that covers retries and
+hedges, so an AI endpoint never waits on the provider for longer than that.
+Within the deadline:
+
+- 429, 408/409, 5xx, timeouts and connection errors are retried with full-jitter
+  exponential backoff (honouring Retry-After on 429);
+- a non-streaming call still running after the recent p95 latency gets a second,
+  hedged request, and whichever finishes first wins;
+- a circuit breaker opens after `llm_breaker_failure_threshold` consecutive
+  provider failures and rejects calls immediately until a probe call succeeds
+  `llm_breaker_reset_seconds` later.
+
+The Groq client is created with SDK retries disabled (the gateway owns them)
+and one pooled HTTP client per process.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+import httpx
+from app.core.config import settings
+from app.core.metrics import CallbackMetric, Counter
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+MIN_HEDGE_SAMPLES = 20
+
+LLM_GATEWAY_EVENTS = Counter(
+    "llm_gateway_events_total",
+    "LLM gateway retries, hedged requests (and hedges that won), timeouts and calls rejected by the open circuit.",
+    ("event",),
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """The circuit breaker is open: the provider failed repeatedly and is not being called."""
+
+
+class LLMTimeoutError(TimeoutError):
+    """The call did not complete within its deadline, retries and hedges included."""
+
+
+def create_client(api_key: str) -> Any:
+    """AsyncGroq with a pooled HTTP client and SDK-level retries disabled."""
+    from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_connections,
+            keepalive_expiry=60,
+        ),
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=10),
+    )
+    return AsyncGroq(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def _is_provider_failure(error: BaseException) -> bool:
+    """Failures that count towards opening the circuit; 429 is back-pressure, not an outage."""
+    return is_retryable(error) and _status_code(error) != 429
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers and headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _close_stream(response: Any) -> None:
+    """Close a provider stream (and its HTTP response); errors while closing are only logged."""
+    close = getattr(response, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        print(f"Closing LLM stream failed: {str(e)}")
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+            return True
+        if self.state == "open":
+            self.rejected += 1
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                print(f"LLM circuit breaker opened after {self.failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """The call ended without a verdict (cancelled or a client error); let another probe through."""
+        self._probing = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic()) if self.state == "open" else 0.0
+
+
+class LatencyTracker:
+    """Recent successful call latencies; their p95 is the hedging delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self._samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LLMGateway:
+    """Deadline, retry, hedging and circuit breaking around `client.chat.completions.create`."""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(settings.llm_breaker_failure_threshold, settings.llm_breaker_reset_seconds)
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            LLM_GATEWAY_EVENTS.inc(event="rejected")
+            raise LLMUnavailableError(
+                f"AI service temporarily unavailable after repeated provider failures; "
+                f"retry in {self.breaker.retry_in():.0f}s"
+            )
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not settings.llm_hedge_enabled or self.breaker.state != "closed":
+            return None
+        p95 = self.latency.percentile(0.95)
+        return max(p95, settings.llm_hedge_min_delay_seconds) if p95 is not None else None
+
+    async def _backoff(self, attempt: int, error: BaseException, deadline: float) -> None:
+        """Sleep before the next attempt, or re-raise `error` if the deadline leaves no room for one."""
+        delay = random.uniform(0, min(settings.llm_retry_max_seconds, settings.llm_retry_base_seconds * 2 ** attempt))
+        delay = max(delay, _retry_after(error) or 0.0)
+        if time.monotonic() + delay >= deadline:
+            raise error
+        self.retries += 1
+        LLM_GATEWAY_EVENTS.inc(event="retry")
+        print(f"LLM call failed ({type(error).__name__}: {str(error)[:200]}); retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _timed_out(self) -> LLMTimeoutError:
+        self.timeouts += 1
+        LLM_GATEWAY_EVENTS.inc(event="timeout")
+        return LLMTimeoutError(f"AI service did not respond within {settings.llm_timeout_seconds:g}s")
+
+    async def _hedged(self, client: Any, kwargs: Dict[str, Any], deadline: float) -> Any:
+        """One attempt: the request plus, past the p95 latency, a duplicate; the first success wins."""
+        started = time.monotonic()
+        hedge_delay = self._hedge_delay()
+        primary = asyncio.ensure_future(client.chat.completions.create(**kwargs))
+        pending = {primary}
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise asyncio.TimeoutError()
+                wait = deadline - now
+                hedge_due = hedge_delay is not None
+                if hedge_due:
+                    wait = min(wait, started + hedge_delay - now)
+                done, pending = await asyncio.wait(pending, timeout=max(wait, 0), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                            LLM_GATEWAY_EVENTS.inc(event="hedge_won")
+                        self.latency.record(time.monotonic() - started)
+                        return task.result()
+                if done and not pending:
+                    raise next(iter(done)).exception()
+                if not done and hedge_due:
+                    self.hedges += 1
+                    LLM_GATEWAY_EVENTS.inc(event="hedge")
+                    hedge_delay = None
+                    pending.add(asyncio.ensure_future(client.chat.completions.create(**kwargs)))
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def complete(self, client: Any, **kwargs: Any) -> Any:
+        """`client.chat.completions.create(**kwargs)` within the gateway's deadline, retries and hedging."""
+        self.calls += 1
+        deadline = time.monotonic() + settings.llm_timeout_seconds
+        attempt = 0
+        while True:
+            self._admit()
+            verdict = False
+            try:
+                response = await self._hedged(client, kwargs, deadline)
+                self.breaker.record_success()
+                verdict = True
+                return response
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if _is_provider_failure(e):
+                    self.breaker.record_failure()
+                    verdict = True
+                if isinstance(e, asyncio.TimeoutError) and time.monotonic() >= deadline:
+                    raise self._timed_out() from e
+                if attempt >= settings.llm_max_retries:
+                    raise
+                await self._backoff(attempt, e, deadline)
+                attempt += 1
+            finally:
+                if not verdict:
+                    self.breaker.release()
+
+    async def stream(self, client: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Streaming completion chunks within the call's deadline. Failures before the
+        first chunk are retried; once output has been yielded they are raised,
+        since a partial stream cannot be replayed. Streams are not hedged. The
+        provider stream is closed however iteration ends, including when the
+        consumer stops early.
+        """
+        self.calls += 1
+        deadline = time.monotonic() + settings.llm_timeout_seconds
+        attempt = 0
+        while True:
+            self._admit()
+            response = None
+            try:
+                response = await asyncio.wait_for(
+                    client.chat.completions.create(stream=True, **kwargs), max(deadline - time.monotonic(), 0)
+                )
+                chunks = response.__aiter__()
+                first = await asyncio.wait_for(chunks.__anext__(), max(deadline - time.monotonic(), 0))
+                break
+            except StopAsyncIteration:
+                self.breaker.record_success()
+                await _close_stream(response)
+                return
+            except Exception as e:
+                await _close_stream(response)
+                if not is_retryable(e):
+                    self.breaker.release()
+                    raise
+                if _is_provider_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release()
+                if isinstance(e, asyncio.TimeoutError) and time.monotonic() >= deadline:
+                    raise self._timed_out() from e
+                if attempt >= settings.llm_max_retries:
+                    raise
+                await self._backoff(attempt, e, deadline)
+                attempt += 1
+            except BaseException:
+                self.breaker.release()
+                await _close_stream(response)
+                raise
+
+        self.breaker.record_success()
+        try:
+            yield first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(deadline - time.monotonic(), 0))
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError as e:
+                    raise self._timed_out() from e
+                yield chunk
+        finally:
+            await _close_stream(response)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "p50_seconds": self.latency.percentile(0.5),
+            "p95_seconds": self.latency.percentile(0.95),
+            "timeout_seconds": settings.llm_timeout_seconds,
+        }
+
+
+llm_gateway = LLMGateway()
+
+CallbackMetric(
+    "llm_circuit_open",
+    "1 while the LLM circuit breaker rejects calls (open or half-open), else 0.",
+    lambda: 0 if llm_gateway.breaker.state == "closed" else 1,
+)
@@ -0,0 +1,26 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Async limiter that spaces calls evenly to at most `requests_per_minute`.
+    A limit of None or 0 disables throttling.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int]):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the next call slot is free."""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
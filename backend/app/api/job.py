@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.models.job import Job
+from app.schemas.job import JobResponse
+from app.services.job_service import get_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_accepted_response(job: Job) -> JSONResponse:
+    """202 Accepted response pointing the client at the job status endpoint."""
+    return JSONResponse(
+        status_code=202,
+        content=JobResponse.model_validate(job).model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status of a background job."""
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the result of a background job.
+    Returns 202 with the job status while it is still queued or running.
+    """
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error or "Job failed")
+    if job.status != "succeeded":
+        return job_accepted_response(job)
+    
+    return job.result
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 import json
 from app.core.database import get_db
 from app.models.meeting import Meeting
 from app.schemas.meeting import MeetingUpload, MeetingResponse, MeetingCreate, MeetingUpdate
-from app.services.meeting_service import create_meeting_from_text, get_meetings_by_project
+from app.services.meeting_service import create_meeting_from_text, stream_meeting_from_text, get_meetings_by_project
+from app.services.job_service import enqueue_job
+from app.api.job import job_accepted_response
+from app.utils.sse import sse_response
+from app.utils.pagination import (
+    MAX_PAGE_SIZE, parse_fields, paginated_query, split_page, serialize_items, page_response
+)
 
 router = APIRouter(prefix="/meetings", tags=["meetings"])
 
@@ -14,16 +20,35 @@ router = APIRouter(prefix="/meetings", tags=["meetings"])
 @router.post("/upload", response_model=MeetingResponse, status_code=201)
 async def upload_meeting(
     meeting_data: MeetingUpload,
+    background: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload meeting text and process with LLM."""
+    """
+    Upload meeting text and process with LLM.
+    With background=true, returns 202 and a job id instead of waiting for the LLM.
+    """
     try:
+        if background:
+            job = await enqueue_job(db, "meeting_upload", meeting_data.model_dump())
+            return job_accepted_response(job)
         meeting = await create_meeting_from_text(db, meeting_data)
         return meeting
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/upload/stream")
+async def upload_meeting_stream(
+    meeting_data: MeetingUpload
+):
+    """
+    Upload meeting text and stream the LLM analysis as server-sent events:
+    "delta"/"field" events as the summary is generated, "progress" while long
+    transcripts are analyzed in chunks, and "done" with the saved meeting.
+    """
+    return sse_response(stream_meeting_from_text(meeting_data))
+
+
 @router.post("", response_model=MeetingResponse, status_code=201)
 async def create_meeting(
     meeting_data: MeetingCreate,
@@ -84,34 +109,46 @@ async def create_meeting(
 
 @router.get("", response_model=List[MeetingResponse])
 async def get_all_meetings(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all meetings."""
-    result = await db.execute(select(Meeting).order_by(Meeting.created_at.desc()))
-    meetings = result.scalars().all()
+    """
+    Get meetings, newest first. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `fields` (comma-separated) to load only those columns, e.g. to skip raw_text.
+    """
+    try:
+        field_list = parse_fields(fields, MeetingResponse, Meeting)
+        filters = []
+        if project_id is not None:
+            filters.append(Meeting.project_id == project_id)
+        if status is not None:
+            filters.append(Meeting.status == status)
+        
+        result = await db.execute(paginated_query(Meeting, filters, cursor, limit, field_list))
+        meetings, next_cursor = split_page(list(result.scalars().all()), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Convert to response objects with proper serialization
+    converters = {
+        'date': lambda meeting: meeting.date.strftime("%Y-%m-%d") if meeting.date else None,
+        'attendees': lambda meeting: json.loads(meeting.attendees) if meeting.attendees else [],
+        'status': lambda meeting: meeting.status or 'scheduled',
+    }
+    names = field_list if field_list is not None else list(MeetingResponse.model_fields)
     response_meetings = []
     for meeting in meetings:
         meeting_dict = {
-            'id': meeting.id,
-            'project_id': meeting.project_id,
-            'title': meeting.title,
-            'raw_text': meeting.raw_text,
-            'summary': meeting.summary,
-            'decisions': meeting.decisions,
-            'open_questions': meeting.open_questions,
-            'date': meeting.date.strftime("%Y-%m-%d") if meeting.date else None,
-            'time': meeting.time,
-            'duration': meeting.duration,
-            'attendees': json.loads(meeting.attendees) if meeting.attendees else [],
-            'status': meeting.status or 'scheduled',
-            'created_at': meeting.created_at,
-            'updated_at': meeting.updated_at,
+            name: converters[name](meeting) if name in converters else getattr(meeting, name)
+            for name in names
         }
         response_meetings.append(meeting_dict)
     
-    return response_meetings
+    return page_response(serialize_items(response_meetings, MeetingResponse, field_list), next_cursor)
 
 
 @router.get("/{project_id}", response_model=List[MeetingResponse])
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
+from app.core.cache import cached_json_response
 from app.core.database import get_db
 from app.models.project import Project
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.services.resource_service import release_project_allocations
+from app.utils.pagination import (
+    MAX_PAGE_SIZE, parse_fields, paginated_query, split_page, serialize_items, page_response
+)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -31,12 +36,35 @@ async def create_project(
 
 @router.get("", response_model=List[ProjectResponse])
 async def get_projects(
+    request: Request,
+    status: Optional[str] = None,
+    priority: Optional[int] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all projects."""
-    result = await db.execute(select(Project).order_by(Project.created_at.desc()))
-    projects = result.scalars().all()
-    return list(projects)
+    """
+    Get projects, newest first. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `fields` (comma-separated) to load only those columns.
+    Served through the response cache (ETag / If-None-Match supported).
+    """
+    async def load():
+        try:
+            field_list = parse_fields(fields, ProjectResponse, Project)
+            filters = []
+            if status is not None:
+                filters.append(Project.status == status)
+            if priority is not None:
+                filters.append(Project.priority == priority)
+            
+            result = await db.execute(paginated_query(Project, filters, cursor, limit, field_list))
+            projects, next_cursor = split_page(list(result.scalars().all()), limit)
+            return page_response(serialize_items(projects, ProjectResponse, field_list), next_cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return await cached_json_response(request, ("projects",), load)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -98,6 +126,7 @@ async def delete_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    await release_project_allocations(db, project_id)
     await db.delete(project)
     await db.commit()
     return None
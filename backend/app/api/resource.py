@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import date, timedelta
+from app.core.cache import cached_json_response
 from app.core.database import get_db
 from app.schemas.resource import (
     ResourceCreate, 
@@ -12,19 +14,33 @@ from app.schemas.resource import (
     ProjectRequirementCreate,
     ProjectRequirementResponse,
     ResourceUtilizationResponse,
+    UtilizationTimelineResponse,
     SchedulingConflict,
     AllocationOptimizationResponse,
     ScenarioCreate,
     ScenarioResponse,
-    ScenarioComparisonResponse
+    ScenarioComparisonResponse,
+    ScenarioSimulationResponse,
+    PortfolioOptimizationRequest,
+    PortfolioOptimizationResponse,
+    BulkImportResponse
 )
 from app.services.resource_service import create_resource, allocate_resource, get_resources_by_project
 from app.services.allocation_optimizer_service import (
+    UTILIZATION_BATCH_SIZE,
     get_resource_utilization,
+    get_utilization_timeline,
     detect_scheduling_conflicts,
     recommend_optimal_allocation,
     create_allocation_scenario,
-    compare_scenarios
+    compare_scenarios,
+    simulate_allocation_scenarios
+)
+from app.services.portfolio_optimizer_service import optimize_portfolio_allocation
+from app.services.resource_import_service import bulk_import
+from app.utils.record_stream import iter_records
+from app.utils.pagination import (
+    MAX_PAGE_SIZE, parse_fields, paginated_query, split_page, serialize_items, page_response
 )
 
 router = APIRouter(prefix="/resources", tags=["resources"])
@@ -32,20 +48,39 @@ router = APIRouter(prefix="/resources", tags=["resources"])
 
 @router.get("", response_model=List[ResourceResponse])
 async def get_all_resources(
+    project_id: Optional[int] = None,
+    role: Optional[str] = None,
+    department: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all resources."""
+    """
+    Get resources, newest first. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `fields` (comma-separated) to load only those columns; allocations and
+    skills are only loaded when requested.
+    """
     from app.models.resource import Resource
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
     
-    result = await db.execute(
-        select(Resource)
-        .options(selectinload(Resource.allocations))
-        .options(selectinload(Resource.skills))
-    )
-    resources = result.scalars().all()
-    return resources
+    try:
+        relationships = ("allocations", "skills")
+        field_list = parse_fields(fields, ResourceResponse, Resource, relationships)
+        filters = []
+        if project_id is not None:
+            filters.append(Resource.project_id == project_id)
+        if role is not None:
+            filters.append(Resource.role == role)
+        if department is not None:
+            filters.append(Resource.department == department)
+        
+        result = await db.execute(
+            paginated_query(Resource, filters, cursor, limit, field_list, relationships)
+        )
+        resources, next_cursor = split_page(list(result.scalars().all()), limit)
+        return page_response(serialize_items(resources, ResourceResponse, field_list), next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("", response_model=ResourceResponse, status_code=201)
@@ -61,6 +96,31 @@ async def create_resource_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_import_endpoint(
+    request: Request,
+    kind: str = Query("resources", pattern="^(resources|skills|allocations)$"),
+    record_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$"),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import resources, skills or allocations from a streamed NDJSON or CSV body.
+    The format defaults from Content-Type (text/csv, otherwise NDJSON). Valid rows are
+    committed in chunks; invalid rows are reported per row. CSV resource rows can list
+    skills as "Python:4;SQL:3". With `dry_run`, rows are validated but not written.
+    """
+    if record_format is None:
+        record_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    try:
+        return await bulk_import(db, kind, iter_records(request.stream(), record_format), dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/{resource_id}", status_code=204)
 async def delete_resource_endpoint(
     resource_id: int,
@@ -112,14 +172,50 @@ async def get_resources(
 
 @router.get("/utilization/all", response_model=List[ResourceUtilizationResponse])
 async def get_all_resource_utilization(
+    request: Request,
+    batch_size: int = Query(UTILIZATION_BATCH_SIZE, ge=1, le=5000),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get utilization metrics for all resources.
     Identifies over-utilized and under-utilized resources.
+    Resources are loaded in batches of `batch_size` per query.
+    Served through the response cache (ETag / If-None-Match supported).
+    """
+    try:
+        return await cached_json_response(
+            request,
+            ("resources",),
+            lambda: get_resource_utilization(db, batch_size=batch_size),
+            List[ResourceUtilizationResponse],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/utilization/timeline", response_model=UtilizationTimelineResponse)
+async def get_resource_utilization_timeline(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    granularity: str = Query("week", pattern="^(day|week|month)$"),
+    project_id: Optional[int] = None,
+    department: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get utilization per resource per day, week or month (e.g. for a heatmap).
+    Defaults to the year starting today. Allocations are spread evenly over
+    their start/end dates; capacity_hours is treated as monthly capacity.
     """
+    start = start or date.today()
+    end = end or start + timedelta(days=364)
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    
     try:
-        return await get_resource_utilization(db)
+        return await get_utilization_timeline(db, start, end, granularity, project_id, department)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -151,6 +247,25 @@ async def detect_conflicts(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/optimize/portfolio", response_model=PortfolioOptimizationResponse)
+async def optimize_portfolio(
+    request: Optional[PortfolioOptimizationRequest] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Assign resources to all active projects at once under capacity and date constraints.
+    Returns the best plan found within the time budget.
+    """
+    request = request or PortfolioOptimizationRequest()
+    if request.time_budget_seconds <= 0:
+        raise HTTPException(status_code=400, detail="time_budget_seconds must be positive")
+    
+    try:
+        return await optimize_portfolio_allocation(db, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/optimize/{project_id}", response_model=AllocationOptimizationResponse)
 async def optimize_allocation(
     project_id: int,
@@ -200,6 +315,24 @@ async def compare_allocation_scenarios(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/scenarios/simulate", response_model=ScenarioSimulationResponse)
+async def simulate_allocation_scenarios_endpoint(
+    scenarios: List[ScenarioCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Simulate what-if scenarios without saving them or touching live allocations.
+    Each scenario is overlaid on the current allocations to report conflicts,
+    utilization distribution and skill coverage; scenarios are then ranked.
+    """
+    try:
+        return await simulate_allocation_scenarios(db, scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/skills/{resource_id}", response_model=ResourceSkillResponse, status_code=201)
 async def add_resource_skill(
     resource_id: int,
@@ -1,17 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Dict
+from typing import List, Dict, Optional
+from app.core.cache import cached_json_response
 from app.core.database import get_db
+from app.core.config import settings
 from app.models.risk import Risk
 from app.schemas.risk import RiskAnalyze, RiskResponse, RiskCreate, RiskUpdate, RiskAnalyticsResponse, RiskMatrixDataResponse
-from app.services.risk_service import analyze_risks_from_text, get_risks_by_project, analyze_project_documentation
+from app.services.risk_service import (
+    get_risks_by_project,
+    analyze_risks_from_text_coalesced,
+    analyze_project_documentation_coalesced
+)
 from app.services.risk_analytics_service import (
     get_risk_analytics, 
     calculate_trend, 
+    refresh_risk_trends,
     detect_early_warnings,
     calculate_risk_score,
-    record_risk_metric
+    record_risk_metric,
+    risk_snapshot,
+    update_risk_aggregate
+)
+from app.services.job_service import enqueue_job
+from app.api.job import job_accepted_response
+from app.utils.pagination import (
+    MAX_PAGE_SIZE, parse_fields, paginated_query, split_page, serialize_items, page_response
 )
 
 router = APIRouter(prefix="/risks", tags=["risks"])
@@ -20,11 +34,18 @@ router = APIRouter(prefix="/risks", tags=["risks"])
 @router.post("/analyze", response_model=List[RiskResponse], status_code=201)
 async def analyze_risks(
     risk_data: RiskAnalyze,
+    background: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Analyze project text for risks using LLM."""
+    """
+    Analyze project text for risks using LLM.
+    With background=true, returns 202 and a job id instead of waiting for the LLM.
+    """
     try:
-        risks = await analyze_risks_from_text(db, risk_data)
+        if background:
+            job = await enqueue_job(db, "risk_analyze", risk_data.model_dump())
+            return job_accepted_response(job)
+        risks = await analyze_risks_from_text_coalesced(risk_data)
         return risks
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -33,11 +54,18 @@ async def analyze_risks(
 @router.post("/analyze-project/{project_id}", response_model=List[RiskResponse], status_code=201)
 async def analyze_project_docs(
     project_id: int,
+    background: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Automatically analyze all project documentation (status reports, resources, allocations) for risks."""
+    """
+    Automatically analyze all project documentation (status reports, resources, allocations) for risks.
+    With background=true, returns 202 and a job id instead of waiting for the LLM.
+    """
     try:
-        risks = await analyze_project_documentation(db, project_id)
+        if background:
+            job = await enqueue_job(db, "risk_analyze_project", {"project_id": project_id})
+            return job_accepted_response(job)
+        risks = await analyze_project_documentation_coalesced(project_id)
         return risks
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -60,12 +88,14 @@ async def analyze_project_docs(
 @router.get("/analytics/{project_id}", response_model=RiskAnalyticsResponse)
 async def get_analytics(
     project_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get risk analytics for a project."""
+    """Get risk analytics for a project (cached, with ETag support)."""
     try:
-        analytics = await get_risk_analytics(db, project_id)
-        return analytics
+        return await cached_json_response(
+            request, ("risks",), lambda: get_risk_analytics(db, project_id), RiskAnalyticsResponse
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -101,6 +131,26 @@ async def get_early_warnings(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/trends/refresh", response_model=Dict)
+async def refresh_trends(
+    project_id: Optional[int] = None,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recompute risk trends from metric history for one project (or all projects).
+    The same refresh also runs on a schedule; with background=true it is queued as a job.
+    """
+    try:
+        params = {"project_id": project_id, "days": settings.risk_trend_window_days}
+        if background:
+            job = await enqueue_job(db, "risk_trend_refresh", params)
+            return job_accepted_response(job)
+        return await refresh_risk_trends(db, **params)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("", response_model=RiskResponse, status_code=201)
 async def create_risk(
     risk_data: RiskCreate,
@@ -135,6 +185,8 @@ async def create_risk(
         trend="stable",
     )
     db.add(risk)
+    await db.flush()
+    await update_risk_aggregate(db, risk.project_id, added=[risk_snapshot(risk)])
     await db.commit()
     await db.refresh(risk)
     
@@ -147,12 +199,39 @@ async def create_risk(
 
 @router.get("", response_model=List[RiskResponse])
 async def get_all_risks(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    category: Optional[str] = None,
+    approval_status: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all risks."""
-    result = await db.execute(select(Risk).order_by(Risk.created_at.desc()))
-    risks = result.scalars().all()
-    return list(risks)
+    """
+    Get risks, newest first. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `fields` (comma-separated) to load only those columns.
+    """
+    try:
+        field_list = parse_fields(fields, RiskResponse, Risk)
+        filters = []
+        if project_id is not None:
+            filters.append(Risk.project_id == project_id)
+        if status is not None:
+            filters.append(Risk.status == status)
+        if severity is not None:
+            filters.append(Risk.severity == severity)
+        if category is not None:
+            filters.append(Risk.category == category)
+        if approval_status is not None:
+            filters.append(Risk.approval_status == approval_status)
+        
+        result = await db.execute(paginated_query(Risk, filters, cursor, limit, field_list))
+        risks, next_cursor = split_page(list(result.scalars().all()), limit)
+        return page_response(serialize_items(risks, RiskResponse, field_list), next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{project_id}", response_model=List[RiskResponse])
@@ -172,12 +251,15 @@ async def update_risk(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a risk."""
-    result = await db.execute(select(Risk).where(Risk.id == risk_id))
+    # Locked so concurrent writers to the same risk cannot apply aggregate deltas from the same snapshot
+    result = await db.execute(select(Risk).where(Risk.id == risk_id).with_for_update())
     risk = result.scalar_one_or_none()
     
     if not risk:
         raise HTTPException(status_code=404, detail="Risk not found")
     
+    before = risk_snapshot(risk)
+    
     # Track if probability or impact changed for recalculation
     needs_score_recalc = False
     
@@ -213,6 +295,8 @@ async def update_risk(
         risk.trend = await calculate_trend(db, risk.id)
     
     db.add(risk)
+    await db.flush()
+    await update_risk_aggregate(db, risk.project_id, removed=[before], added=[risk_snapshot(risk)])
     await db.commit()
     await db.refresh(risk)
     return risk
@@ -225,15 +309,18 @@ async def approve_risk(
     db: AsyncSession = Depends(get_db)
 ):
     """Approve a risk and record the metric."""
-    result = await db.execute(select(Risk).where(Risk.id == risk_id))
+    result = await db.execute(select(Risk).where(Risk.id == risk_id).with_for_update())
     risk = result.scalar_one_or_none()
     
     if not risk:
         raise HTTPException(status_code=404, detail="Risk not found")
     
+    before = risk_snapshot(risk)
     risk.approval_status = "approved"
     risk.approved_by = approved_by
     db.add(risk)
+    await db.flush()
+    await update_risk_aggregate(db, risk.project_id, removed=[before], added=[risk_snapshot(risk)])
     await db.commit()
     await db.refresh(risk)
     
@@ -250,15 +337,18 @@ async def reject_risk(
     db: AsyncSession = Depends(get_db)
 ):
     """Reject a risk."""
-    result = await db.execute(select(Risk).where(Risk.id == risk_id))
+    result = await db.execute(select(Risk).where(Risk.id == risk_id).with_for_update())
     risk = result.scalar_one_or_none()
     
     if not risk:
         raise HTTPException(status_code=404, detail="Risk not found")
     
+    before = risk_snapshot(risk)
     risk.approval_status = "rejected"
     risk.approved_by = approved_by
     db.add(risk)
+    await db.flush()
+    await update_risk_aggregate(db, risk.project_id, removed=[before], added=[risk_snapshot(risk)])
     await db.commit()
     await db.refresh(risk)
     
@@ -271,12 +361,15 @@ async def delete_risk(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a risk."""
-    result = await db.execute(select(Risk).where(Risk.id == risk_id))
+    result = await db.execute(select(Risk).where(Risk.id == risk_id).with_for_update())
     risk = result.scalar_one_or_none()
     
     if not risk:
         raise HTTPException(status_code=404, detail="Risk not found")
     
+    before = risk_snapshot(risk)
     await db.delete(risk)
+    await db.flush()
+    await update_risk_aggregate(db, risk.project_id, removed=[before])
     await db.commit()
     return None
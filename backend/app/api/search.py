@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_db
+from app.schemas.search import SearchHit
+from app.services.search_service import search, parse_search_types
+from app.utils.pagination import encode_offset_cursor, decode_offset_cursor
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+MAX_SEARCH_PAGE_SIZE = 100
+
+
+@router.get("", response_model=List[SearchHit])
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=500),
+    types: Optional[str] = None,
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over meetings, action items and risks, best match first.
+    `types` is a comma-separated subset of meeting, action_item, risk. Matching
+    words in `snippet` are wrapped in <b></b>. The total match count is in
+    X-Total-Count and the next page's cursor in X-Next-Cursor.
+    """
+    try:
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        total, hits = await search(db, q, parse_search_types(types), project_id, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {"X-Total-Count": str(total)}
+    if offset + limit < total:
+        headers["X-Next-Cursor"] = encode_offset_cursor(offset + limit)
+    return JSONResponse(content=[SearchHit(**hit).model_dump(mode="json") for hit in hits], headers=headers)
@@ -1,33 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from app.core.cache import cached_json_response
 from app.core.database import get_db
 from app.models.status_report import StatusReport
-from app.schemas.status_report import StatusReportResponse
-from app.services.status_service import generate_status_report, get_status_report_by_project
+from app.schemas.status_report import StatusReportResponse, BulkStatusReportRequest, BulkStatusReportResponse
+from app.services.status_service import (
+    generate_status_report_coalesced,
+    generate_status_reports_bulk,
+    stream_status_report,
+    get_status_report_by_project
+)
+from app.services.job_service import enqueue_job
+from app.api.job import job_accepted_response
+from app.utils.sse import sse_response
+from app.utils.pagination import (
+    MAX_PAGE_SIZE, parse_fields, paginated_query, split_page, serialize_items, page_response
+)
 
 router = APIRouter(prefix="/status", tags=["status"])
 
 
 @router.get("", response_model=List[StatusReportResponse])
 async def get_all_status_reports(
+    project_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all status reports."""
-    from sqlalchemy import select
-    result = await db.execute(select(StatusReport))
-    reports = result.scalars().all()
-    return reports
+    """
+    Get status reports, newest first. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `fields` (comma-separated) to load only those columns.
+    """
+    try:
+        field_list = parse_fields(fields, StatusReportResponse, StatusReport)
+        filters = []
+        if project_id is not None:
+            filters.append(StatusReport.project_id == project_id)
+        
+        result = await db.execute(paginated_query(
+            StatusReport, filters, cursor, limit, field_list, sort_column=StatusReport.generated_at
+        ))
+        reports, next_cursor = split_page(list(result.scalars().all()), limit, sort_attr="generated_at")
+        return page_response(serialize_items(reports, StatusReportResponse, field_list), next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/generate-bulk", response_model=BulkStatusReportResponse, status_code=201)
+async def generate_status_bulk(
+    request: Optional[BulkStatusReportRequest] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate status reports for many projects (all active projects by default).
+    LLM calls run concurrently; projects that fail are listed in `failed`.
+    """
+    request = request or BulkStatusReportRequest()
+    try:
+        return await generate_status_reports_bulk(
+            db,
+            project_ids=request.project_ids,
+            max_concurrency=request.max_concurrency,
+            requests_per_minute=request.requests_per_minute,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/generate/{project_id}", response_model=StatusReportResponse, status_code=201)
 async def generate_status(
     project_id: int,
+    background: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Generate status report for a project."""
+    """
+    Generate status report for a project.
+    With background=true, returns 202 and a job id instead of waiting for the LLM.
+    """
     try:
-        status_report = await generate_status_report(db, project_id)
+        if background:
+            job = await enqueue_job(db, "status_generate", {"project_id": project_id})
+            return job_accepted_response(job)
+        status_report = await generate_status_report_coalesced(project_id)
         return status_report
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -35,16 +91,38 @@ async def generate_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/{project_id}/stream")
+async def generate_status_stream(
+    project_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate status report for a project, streaming the LLM output as server-sent
+    events ("delta"/"field" as the executive summary is generated, then "done" with the saved report).
+    """
+    try:
+        events = await stream_status_report(db, project_id)
+        return sse_response(events)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{project_id}", response_model=StatusReportResponse)
 async def get_status(
     project_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get the latest status report for a project."""
-    status_report = await get_status_report_by_project(db, project_id)
-    
-    if not status_report:
-        raise HTTPException(status_code=404, detail="Status report not found")
+    """Get the latest status report for a project (cached, with ETag support)."""
+    async def load():
+        status_report = await get_status_report_by_project(db, project_id)
+        
+        if not status_report:
+            raise HTTPException(status_code=404, detail="Status report not found")
+        
+        return status_report
     
-    return status_report
+    return await cached_json_response(request, ("status",), load, StatusReportResponse)
 
@@ -0,0 +1,363 @@
+"""
+Read-through cache for hot GET endpoints.
+
+Responses are stored as serialized JSON under a key that includes the current
+generation of every namespace the endpoint reads from ("projects", "risks",
+"resources", "status"). Writes never delete entries: committing a session that
+touched a namespace's tables bumps its generation, so later reads miss and the
+stale entries age out through the TTL / LRU. Every response carries an ETag, and
+a matching If-None-Match gets a 304 without a body.
+
+Backends: "memory" (in-process LRU + TTL, the default and the local stand-in
+for Redis), "redis" (any Redis-compatible server; needs the optional `redis`
+package) and "none" (no caching, ETags only).
+
+The memory backend keeps its generation counters in the process, so a write
+only invalidates the worker that committed it. With several uvicorn/gunicorn
+workers the others keep serving stale responses for up to `cache_ttl_seconds`;
+run more than one worker only with "redis" (or "none").
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from app.core.config import settings
+from app.core.metrics import Counter
+
+CACHE_NAMESPACES = ("projects", "risks", "resources", "status")
+
+# Table -> namespaces whose cached responses read it. Projects feed every
+# namespace (names in utilization rows, cascading deletes).
+TABLE_NAMESPACES: Dict[str, Tuple[str, ...]] = {
+    "projects": CACHE_NAMESPACES,
+    "risks": ("risks",),
+    "risk_metrics": ("risks",),
+    "risk_aggregates": ("risks",),
+    "resources": ("resources",),
+    "allocations": ("resources",),
+    "resource_skills": ("resources",),
+    "status_reports": ("status",),
+}
+
+# Response headers worth replaying from a cached entry (e.g. X-Next-Cursor)
+CACHED_HEADER_PREFIX = "x-"
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Cached endpoint lookups by namespace and outcome.", ("namespace", "result")
+)
+
+
+class MemoryCacheBackend:
+    """In-process LRU + TTL store. Generation counters are kept apart so eviction never resets them."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        now = time.time()
+        values = []
+        for key in keys:
+            if key in self._counters:
+                values.append(str(self._counters[key]).encode())
+                continue
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+                continue
+            if entry:
+                del self._entries[key]
+            values.append(None)
+        return values
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._entries[key] = (time.time() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._counters.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+class RedisCacheBackend:
+    """Any Redis-compatible server; entries expire server-side and memory limits are Redis's own."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "cache:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("cache_backend='redis' requires the 'redis' package (pip install redis)") from e
+        self.prefix = prefix
+        self.client = redis.from_url(url)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return await self.client.mget(list(keys))
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(key, value, ex=max(1, int(ttl_seconds)))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def _serialize(value: Any, response_model: Any) -> Tuple[bytes, Dict[str, str]]:
+    """JSON body plus replayable headers, the way FastAPI would have rendered the route."""
+    if isinstance(value, Response):
+        headers = {
+            key: header for key, header in value.headers.items()
+            if key.lower().startswith(CACHED_HEADER_PREFIX)
+        }
+        return bytes(value.body), headers
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True)), {}
+
+
+def _pack(body: bytes, headers: Dict[str, str], etag: str) -> bytes:
+    return json.dumps({"etag": etag, "headers": headers}).encode() + b"\n" + body
+
+
+def _unpack(value: bytes) -> Tuple[bytes, Dict[str, str], str]:
+    meta, _, body = value.partition(b"\n")
+    meta = json.loads(meta)
+    return body, meta["headers"], meta["etag"]
+
+
+class ResponseCache:
+    """Generation-versioned response cache over a pluggable backend (None disables storage)."""
+
+    def __init__(self, backend: Optional[Any], ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _generation_key(namespace: str) -> str:
+        return f"cache:gen:{namespace}"
+
+    @staticmethod
+    def request_key(request: Request) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    async def _lookup(self, namespaces: Sequence[str], request_key: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """Entry key for the current generations and the stored value, if any."""
+        generations = await self.backend.get_many([self._generation_key(namespace) for namespace in namespaces])
+        versions = ".".join((generation or b"0").decode() for generation in generations)
+        key = f"cache:{versions}:{request_key}"
+        return key, (await self.backend.get_many([key]))[0]
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: Sequence[str],
+        loader: Callable[[], Awaitable[Any]],
+        response_model: Any = None,
+    ) -> Response:
+        """
+        Serve `request` from the cache, or run `loader` and store its result.
+        `loader` returns either a Response (its body and X- headers are kept) or a
+        value that is rendered through `response_model`. Exceptions are not cached.
+        """
+        label = namespaces[0]
+        key = cached = None
+        if self.backend is not None:
+            try:
+                key, cached = await self._lookup(namespaces, self.request_key(request))
+            except Exception as e:
+                # A cache outage degrades to uncached reads
+                self.errors += 1
+                key = None
+                print(f"Response cache lookup failed: {str(e)}")
+
+        if cached is not None:
+            self.hits += 1
+            body, headers, etag = _unpack(cached)
+            result = "hit"
+        else:
+            self.misses += 1
+            body, headers = _serialize(await loader(), response_model)
+            etag = _etag(body)
+            result = "miss"
+            if key is not None:
+                try:
+                    await self.backend.set(key, _pack(body, headers, etag), self.ttl_seconds)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Response cache store failed: {str(e)}")
+
+        headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            RESPONSE_CACHE_REQUESTS.inc(namespace=label, result="not_modified")
+            return Response(status_code=304, headers=headers)
+        RESPONSE_CACHE_REQUESTS.inc(namespace=label, result=result)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, namespaces: Iterable[str]) -> None:
+        """Bump the generation of `namespaces`; entries written under older generations are never read again."""
+        if self.backend is None:
+            return
+        for namespace in sorted(set(namespaces)):
+            try:
+                await self.backend.incr(self._generation_key(namespace))
+                self.invalidations += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Response cache invalidation of '{namespace}' failed: {str(e)}")
+
+    async def clear(self) -> None:
+        if self.backend is not None:
+            await self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus backend details."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **(self.backend.stats() if self.backend is not None else {}),
+        }
+
+
+def build_cache_backend() -> Optional[Any]:
+    """Backend for `settings.cache_backend`."""
+    if settings.cache_backend == "none":
+        return None
+    if settings.cache_backend == "memory":
+        # WEB_CONCURRENCY is the worker count uvicorn and gunicorn read by default
+        if int(os.getenv("WEB_CONCURRENCY") or 1) > 1:
+            print(
+                "Warning: cache_backend='memory' invalidates per worker; with "
+                f"WEB_CONCURRENCY={os.getenv('WEB_CONCURRENCY')} other workers serve stale responses "
+                f"for up to {settings.cache_ttl_seconds}s. Use cache_backend='redis'."
+            )
+        return MemoryCacheBackend(settings.cache_max_entries)
+    if settings.cache_backend == "redis":
+        if not settings.cache_redis_url:
+            raise RuntimeError("cache_backend='redis' requires cache_redis_url")
+        return RedisCacheBackend(settings.cache_redis_url)
+    raise RuntimeError(f"Unknown cache_backend '{settings.cache_backend}'. Use memory, redis or none")
+
+
+response_cache = ResponseCache(build_cache_backend(), settings.cache_ttl_seconds)
+
+
+async def cached_json_response(
+    request: Request,
+    namespaces: Sequence[str],
+    loader: Callable[[], Awaitable[Any]],
+    response_model: Any = None,
+) -> Response:
+    """Read-through the shared response cache; see ResponseCache.respond."""
+    return await response_cache.respond(request, namespaces, loader, response_model)
+
+
+# ============ Invalidation on commit ============
+
+def _touch(session, tables: Iterable[str]) -> None:
+    touched: Set[str] = session.info.setdefault("cache_namespaces", set())
+    for table in tables:
+        touched.update(TABLE_NAMESPACES.get(table, ()))
+
+
+def _after_flush(session, flush_context) -> None:
+    _touch(session, (
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    ))
+
+
+def _do_orm_execute(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _touch(orm_execute_state.session, (table.name,))
+
+
+def _after_commit(session) -> None:
+    namespaces = session.info.pop("cache_namespaces", None)
+    if not namespaces:
+        return
+    if in_greenlet():
+        # AsyncSession commits run in a greenlet, so the backend can be awaited here
+        await_only(response_cache.invalidate(namespaces))
+        return
+    try:
+        asyncio.get_running_loop().create_task(response_cache.invalidate(namespaces))
+    except RuntimeError:
+        print(f"Response cache invalidation skipped outside an event loop: {sorted(namespaces)}")
+
+
+def _after_rollback(session) -> None:
+    session.info.pop("cache_namespaces", None)
+
+
+def track_invalidations(session_class: Any) -> None:
+    """Bump cache generations whenever a `session_class` session commits writes to cached tables."""
+    event.listen(session_class, "after_flush", _after_flush)
+    event.listen(session_class, "do_orm_execute", _do_orm_execute)
+    event.listen(session_class, "after_commit", _after_commit)
+    event.listen(session_class, "after_rollback", _after_rollback)
@@ -4,9 +4,54 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 256
+    db_pgbouncer_mode: Optional[bool] = None  # None: auto-detect the Supabase pooler port
     groq_api_key: Optional[str] = None
     groq_model: str = "llama-3.3-70b-versatile"
     groq_temperature: float = 0.3
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_max_entries: int = 512
+    llm_cache_sqlite_path: Optional[str] = None
+    job_workers: int = 4
+    llm_requests_per_minute: int = 30
+    llm_timeout_seconds: float = 60  # per call, retries and hedges included
+    llm_max_retries: int = 3
+    llm_retry_base_seconds: float = 0.5
+    llm_retry_max_seconds: float = 8
+    llm_hedge_enabled: bool = True
+    llm_hedge_min_delay_seconds: float = 1.0  # hedges fire after max(this, recent p95 latency)
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30
+    llm_max_connections: int = 20
+    status_bulk_concurrency: int = 8
+    job_stale_after_seconds: int = 900
+    job_stale_sweep_seconds: int = 60  # how often running jobs of dead processes are requeued (0 disables)
+    risk_trend_window_days: int = 30
+    risk_trend_refresh_interval_seconds: int = 3600
+    meeting_chunk_tokens: int = 3000
+    llm_context_budget_tokens: int = 6000  # project context in risk analysis and status report prompts
+    meeting_map_concurrency: int = 4
+    bulk_import_chunk_size: int = 1000
+    bulk_import_max_errors: int = 1000
+    resource_capacity_period_days: float = 365.25 / 12  # capacity_hours is per month
+    utilization_timeline_max_days: int = 1830
+    scenario_simulation_workers: Optional[int] = None  # None: one process per CPU
+    scenario_simulation_min_parallel: int = 8  # smaller batches are simulated inline
+    cache_backend: str = "memory"  # "memory" (single worker only: invalidation is per process), "redis" or "none"
+    cache_redis_url: Optional[str] = None
+    cache_ttl_seconds: int = 60
+    cache_max_entries: int = 1024
+    search_index_merge_threshold: int = 50000  # in-process search index (non-Postgres)
+    risk_dedup_threshold: float = 0.75  # cosine similarity for "same risk"; above 1 disables
+    single_flight_wait_seconds: float = 300  # how long another worker's identical LLM call is awaited (Postgres)
+    single_flight_poll_seconds: float = 0.5  # first poll interval while awaiting it; doubles up to 8x
+    single_flight_result_ttl_seconds: int = 3600
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,194 @@
+import threading
+import time
+import uuid
+from typing import Any, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import track_invalidations
 from app.core.config import settings
+from app.core.metrics import CallbackMetric, instrument_engine
+
+
+class PoolMetrics:
+    """Counters for connection checkouts, waits for a free connection, overflow and timeouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self, checked_out: int, pool_size: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if pool_size and checked_out > pool_size:
+                self.overflow_checkouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "waits": self.waits,
+                "invalidations": self.invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.waits, 6) if self.waits else 0.0,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts blocked waiting for a free connection."""
+
+    def _do_get(self):
+        # Checkouts served from an idle or new overflow connection never wait;
+        # timing them would fold connect time into the wait metrics
+        must_wait = self.checkedin() == 0 and 0 <= self._max_overflow <= self._overflow
+        if not must_wait:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _is_pgbouncer(url) -> bool:
+    if settings.db_pgbouncer_mode is not None:
+        return settings.db_pgbouncer_mode
+    # Supabase's transaction pooler listens on 6543
+    return url.port == 6543
+
+
+def build_engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Engine keyword arguments for `database_url`.
+    Postgres gets the configured pool sizing, pre-ping, recycle and asyncpg statement
+    caches; behind pgbouncer/Supabase's transaction pooler, prepared statements are
+    not cached and get unique names, since consecutive statements may hit different server connections.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"echo": False, "future": True}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        if _is_pgbouncer(url):
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            options["connect_args"] = {
+                "statement_cache_size": settings.db_statement_cache_size,
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+            }
+    return options
+
 
 engine = create_async_engine(
     settings.database_url,
-    echo=False,
-    future=True,
+    **build_engine_options(settings.database_url),
 )
 
+
+@event.listens_for(engine.sync_engine.pool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool = engine.sync_engine.pool
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    pool_size = pool.size() if hasattr(pool, "size") else 0
+    pool_metrics.record_checkout(checked_out, pool_size)
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.checkins += 1
+
+
+@event.listens_for(engine.sync_engine.pool, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.invalidations += 1
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Current pool occupancy plus the cumulative PoolMetrics counters."""
+    pool = engine.sync_engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if hasattr(pool, "size"):
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=getattr(pool, "_max_overflow", None),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    status.update(pool_metrics.snapshot())
+    return status
+
+
+instrument_engine(engine)
+
+for _key, _type, _doc in (
+    ("checked_out", "gauge", "Connections currently checked out of the pool."),
+    ("overflow", "gauge", "Connections open beyond pool_size."),
+    ("checkouts", "counter", "Connection checkouts."),
+    ("overflow_checkouts", "counter", "Checkouts served by an overflow connection."),
+    ("waits", "counter", "Checkouts that had to wait for a free connection."),
+    ("timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+    ("invalidations", "counter", "Connections invalidated (e.g. failed pre-ping)."),
+    ("wait_seconds_total", "counter", "Total time checkouts spent blocked waiting for a connection."),
+    ("wait_seconds_max", "gauge", "Longest wait for a free connection."),
+):
+    _name = f"db_pool_{_key}" if _type == "gauge" or _key.endswith("_total") else f"db_pool_{_key}_total"
+    CallbackMetric(_name, _doc, lambda key=_key: get_pool_status().get(key, 0), _type)
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -18,6 +199,9 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# AsyncSession runs on a sync Session; committed writes invalidate cached responses
+track_invalidations(Session)
+
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -25,4 +209,3 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
-
@@ -0,0 +1,263 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+Each uvicorn worker keeps its own registry; the HTTP middleware, the SQLAlchemy
+event hooks and the LLM client record into it and GET /metrics renders it.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+REGISTRY: List["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric family with fixed label names."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        for key, values in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, values[-2]
+            yield f"{self.name}_count", labels, values[-1]
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose value is read from `function` at scrape time."""
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float], type: str = "gauge"):
+        super().__init__(name, documentation)
+        self.type = type
+        self.function = function
+
+    def samples(self) -> Iterator[Sample]:
+        yield self.name, {}, self.function()
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries executed per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Database time per HTTP request.", ("method", "route")
+)
+HTTP_REQUEST_LLM_SECONDS = Histogram(
+    "http_request_llm_seconds", "LLM time per HTTP request.", ("method", "route")
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duration of individual database queries."
+)
+LLM_REQUESTS = Counter(
+    "llm_requests_total", "LLM requests by cache outcome.", ("cache",)
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Duration of LLM API calls (cache misses).", ("stream",)
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens used by LLM API calls.", ("type",)
+)
+
+
+class RequestStats:
+    """Per-request accumulator for database and LLM time; nested trackers also feed their parent."""
+
+    __slots__ = ("db_queries", "db_seconds", "llm_seconds", "parent")
+
+    def __init__(self, parent: Optional["RequestStats"] = None):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.parent = parent
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+@contextlib.contextmanager
+def track_request_stats() -> Iterator[RequestStats]:
+    """Collect query count, DB time and LLM time for the code run inside the block."""
+    stats = RequestStats(parent=_request_stats.get())
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def record_query(seconds: float) -> None:
+    """Record one database query."""
+    DB_QUERY_DURATION.observe(seconds)
+    stats = _request_stats.get()
+    while stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+        stats = stats.parent
+
+
+def record_llm_call(seconds: float, stream: bool = False, usage: Any = None) -> None:
+    """Record one LLM API call and its token usage (an OpenAI-style `usage` object)."""
+    LLM_REQUESTS.inc(cache="miss")
+    LLM_REQUEST_DURATION.observe(seconds, stream=str(stream).lower())
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, type="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, type="completion")
+    stats = _request_stats.get()
+    while stats is not None:
+        stats.llm_seconds += seconds
+        stats = stats.parent
+
+
+def record_llm_cache_hit() -> None:
+    LLM_REQUESTS.inc(cache="hit")
+
+
+def instrument_engine(engine) -> None:
+    """Time every query executed through `engine` (an AsyncEngine or Engine)."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("query_start_times")
+        if start_times:
+            record_query(time.perf_counter() - start_times.pop())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, query count, DB time and LLM time per route.
+    Timing ends when the response body is complete, so streamed responses are covered.
+    Requests that match no route are grouped under "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_request_stats() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._observe(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def _observe(scope, stats: RequestStats, status_code: int, seconds: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope.get("method", "")
+        HTTP_REQUEST_DURATION.observe(seconds, method=method, route=route_path, status=status_code)
+        HTTP_REQUEST_DB_QUERIES.observe(stats.db_queries, method=method, route=route_path)
+        HTTP_REQUEST_DB_SECONDS.observe(stats.db_seconds, method=method, route=route_path)
+        if stats.llm_seconds:
+            HTTP_REQUEST_LLM_SECONDS.observe(stats.llm_seconds, method=method, route=route_path)
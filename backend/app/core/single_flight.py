@@ -0,0 +1,215 @@
+"""
+Single-flight coalescing for slow, LLM-backed operations.
+
+Concurrent calls with the same (operation, scope, input) share one computation:
+the first caller in a process starts it, later callers await the same task and
+every caller gets the same result (or the same exception). The computation runs
+in its own session and task, so a caller disconnecting does not cancel it for
+the others.
+
+On Postgres, the leader also claims the key in single_flight_results (a short
+INSERT ... ON CONFLICT that commits immediately), computes without any lock or
+transaction held on the claim, and then stores the result on it. A leader in
+another uvicorn worker that finds a running claim polls the row (every
+`single_flight_poll_seconds`, backing off) and returns the stored result instead
+of calling the LLM again. If the claim fails, disappears or is older than
+`single_flight_wait_seconds` (its worker died), the waiter claims the key and
+computes itself. Every statement is its own short transaction, so this works
+behind pgbouncer's transaction pooling. Other databases only coalesce within a
+process.
+"""
+
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import Counter
+from app.models.single_flight import SingleFlightResult
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total",
+    "Coalesced operation calls by role: leader (computed), follower (shared an in-process call) "
+    "or remote (used another worker's result).",
+    ("operation", "role"),
+)
+
+# Runs the operation in the given session and returns its result
+Compute = Callable[[AsyncSession], Awaitable[Any]]
+# Turns the result into JSON-compatible data, which is what every caller receives
+Serialize = Callable[[Any], Any]
+
+
+def flight_key(operation: str, scope: Any, payload: Any = None) -> str:
+    """`operation:scope:digest`, where digest hashes the canonical JSON of `payload`."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(encoded.encode()).hexdigest()[:32]
+    return f"{operation}:{scope}:{digest}"
+
+
+class SingleFlight:
+    """In-flight computations by key, plus the cross-worker claim protocol on Postgres."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self,
+        operation: str,
+        scope: Any,
+        payload: Any,
+        compute: Compute,
+        serialize: Serialize,
+    ) -> Any:
+        """Serialized result of `compute`, shared with every concurrent identical call."""
+        key = flight_key(operation, scope, payload)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._lead(operation, key, compute, serialize))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            SINGLE_FLIGHT_REQUESTS.inc(operation=operation, role="follower")
+        # A cancelled caller must not cancel the computation the others are waiting on
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieved here so a result nobody awaits anymore is not logged as unhandled
+            task.exception()
+
+    async def _compute(self, operation: str, compute: Compute, serialize: Serialize) -> Any:
+        SINGLE_FLIGHT_REQUESTS.inc(operation=operation, role="leader")
+        async with AsyncSessionLocal() as db:
+            return serialize(await compute(db))
+
+    async def _claim(self, key: str) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        (owner token, None) if this worker now owns `key`, else (None, start of
+        the running claim). Finished, failed and stale claims are taken over.
+        """
+        owner = uuid.uuid4().hex
+        claim = {
+            "status": "running",
+            "owner": owner,
+            "started_at": func.clock_timestamp(),
+            "result": None,
+            "error": None,
+            "finished_at": None,
+        }
+        stale = func.clock_timestamp() - timedelta(seconds=settings.single_flight_wait_seconds)
+        async with engine.begin() as conn:
+            claimed = (await conn.execute(
+                pg_insert(SingleFlightResult)
+                .values(key=key, **claim)
+                .on_conflict_do_update(
+                    index_elements=[SingleFlightResult.key],
+                    set_=claim,
+                    where=or_(SingleFlightResult.status != "running", SingleFlightResult.started_at < stale),
+                )
+                .returning(SingleFlightResult.owner)
+            )).scalar_one_or_none()
+            if claimed == owner:
+                return owner, None
+            started_at = (await conn.execute(
+                select(SingleFlightResult.started_at).where(SingleFlightResult.key == key)
+            )).scalar_one_or_none()
+        return None, started_at
+
+    async def _finish(self, key: str, owner: str, result: Any = None, error: Optional[str] = None) -> None:
+        """Store the outcome on this worker's claim (unless it was taken over) and drop expired rows."""
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    update(SingleFlightResult)
+                    .where(SingleFlightResult.key == key, SingleFlightResult.owner == owner)
+                    .values(
+                        status="failed" if error is not None else "succeeded",
+                        result=result,
+                        error=error,
+                        finished_at=func.clock_timestamp(),
+                    )
+                )
+                expired = func.now() - timedelta(seconds=settings.single_flight_result_ttl_seconds)
+                await conn.execute(
+                    delete(SingleFlightResult).where(or_(
+                        and_(SingleFlightResult.status != "running", SingleFlightResult.finished_at < expired),
+                        SingleFlightResult.started_at < expired,
+                    ))
+                )
+        except Exception as e:
+            # Waiters in other workers will see the claim go stale and compute again
+            print(f"Single-flight outcome for {key} not stored: {str(e)}")
+
+    async def _await_remote(self, key: str, started_at: datetime, deadline: float) -> Tuple[bool, Any]:
+        """(True, result) once a claim started at or after `started_at` succeeds; (False, None) if it will not."""
+        loop = asyncio.get_running_loop()
+        delay = settings.single_flight_poll_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
+            delay = min(delay * 2, settings.single_flight_poll_seconds * 8)
+            async with engine.connect() as conn:
+                row = (await conn.execute(
+                    select(SingleFlightResult.status, SingleFlightResult.result, SingleFlightResult.started_at)
+                    .where(SingleFlightResult.key == key)
+                )).first()
+            if row is None or row.started_at < started_at or row.status == "failed":
+                return False, None
+            if row.status == "succeeded":
+                return True, row.result
+        return False, None
+
+    async def _lead(self, operation: str, key: str, compute: Compute, serialize: Serialize) -> Any:
+        if engine.dialect.name != "postgresql":
+            return await self._compute(operation, compute, serialize)
+
+        deadline = asyncio.get_running_loop().time() + settings.single_flight_wait_seconds
+        while asyncio.get_running_loop().time() < deadline:
+            try:
+                owner, started_at = await self._claim(key)
+            except Exception as e:
+                print(f"Single-flight claim for {key} failed, computing locally: {str(e)}")
+                break
+            if owner is not None:
+                try:
+                    result = await self._compute(operation, compute, serialize)
+                except BaseException as e:
+                    await asyncio.shield(self._finish(key, owner, error=f"{type(e).__name__}: {str(e)[:500]}"))
+                    raise
+                await asyncio.shield(self._finish(key, owner, result=result))
+                return result
+            if started_at is None:
+                # The claim vanished between the insert and the read; try again
+                continue
+            # Another worker is computing the same thing
+            found, result = await self._await_remote(key, started_at, deadline)
+            if found:
+                SINGLE_FLIGHT_REQUESTS.inc(operation=operation, role="remote")
+                return result
+            # It failed or went away; claim the key for this worker
+        return await self._compute(operation, compute, serialize)
+
+
+single_flight = SingleFlight()
+
+
+async def coalesce(
+    operation: str,
+    scope: Any,
+    payload: Any,
+    compute: Compute,
+    serialize: Serialize,
+) -> Any:
+    """Run `compute` once for all concurrent identical calls; see SingleFlight.run."""
+    return await single_flight.run(operation, scope, payload, compute, serialize)
@@ -1,12 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import project, meeting, risk, resource, status
+from app.api import project, meeting, risk, resource, status, job, search
+from app.ai.llm_cache import llm_cache
+from app.ai.llm_client import close_client as close_llm_client
+from app.ai.llm_gateway import llm_gateway
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_pool_status
+from app.core.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.services.job_service import job_queue
+from app.services.scenario_simulation_service import shutdown_simulation_pool
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    job_queue.schedule("risk_trend_refresh", {}, settings.risk_trend_refresh_interval_seconds)
+    yield
+    await job_queue.stop()
+    shutdown_simulation_pool()
+    await close_llm_client()
+
+
 app = FastAPI(
     title="PMO Intelligence Platform",
     description="Production-ready FastAPI backend for PMO Intelligence Platform",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS with environment-aware origins
@@ -33,11 +56,15 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(project.router)
 app.include_router(meeting.router)
 app.include_router(risk.router)
 app.include_router(resource.router)
 app.include_router(status.router)
+app.include_router(job.router)
+app.include_router(search.router)
 
 
 @app.get("/")
@@ -49,3 +76,28 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/health/llm-cache")
+async def llm_cache_stats():
+    return llm_cache.stats()
+
+
+@app.get("/health/llm")
+async def llm_gateway_stats():
+    return llm_gateway.stats()
+
+
+@app.get("/health/cache")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/health/db-pool")
+async def db_pool_status():
+    return get_pool_status()
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -7,6 +7,9 @@ from app.models.resource_skill import ResourceSkill
 from app.models.project_requirement import ProjectRequirement
 from app.models.allocation_scenario import AllocationScenario
 from app.models.status_report import StatusReport
+from app.models.job import Job
+from app.models.risk_aggregate import RiskAggregate
+from app.models.single_flight import SingleFlightResult
 
 __all__ = [
     "Project",
@@ -20,5 +23,8 @@ __all__ = [
     "ProjectRequirement",
     "AllocationScenario",
     "StatusReport",
+    "Job",
+    "RiskAggregate",
+    "SingleFlightResult",
 ]
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Job(Base):
+    """Background job for slow (LLM-backed) operations."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    params = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -13,6 +13,8 @@ class Resource(Base):
     role = Column(String(100), nullable=False)
     capacity_hours = Column(Numeric(10, 2), nullable=False)
     availability_hours = Column(Numeric(10, 2), nullable=False)
+    # Sum of this resource's allocations, kept in step by every allocation write
+    allocated_hours = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
     department = Column(String(100), nullable=True)
     location = Column(String(100), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RiskAggregate(Base):
+    """Materialized per-project risk counters, kept current by every risk write."""
+    __tablename__ = "risk_aggregates"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    total_risks = Column(Integer, nullable=False, default=0)
+    high_severity_count = Column(Integer, nullable=False, default=0)
+    escalated_count = Column(Integer, nullable=False, default=0)
+    approval_pending = Column(Integer, nullable=False, default=0)
+    risk_score_sum = Column(Float, nullable=False, default=0.0)
+    risks_by_category = Column(JSON, nullable=False, default=dict)
+    risks_by_severity = Column(JSON, nullable=False, default=dict)
+    risks_by_status = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
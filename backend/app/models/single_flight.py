@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SingleFlightResult(Base):
+    """Claim on a coalesced computation and, once it finishes, its result for workers that waited on it."""
+    __tablename__ = "single_flight_results"
+
+    key = Column(String(128), primary_key=True)
+    status = Column(String(16), nullable=False, server_default="running")  # running, succeeded, failed
+    owner = Column(String(32), nullable=True)  # token of the claiming leader
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    finished_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
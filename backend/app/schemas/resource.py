@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
 
@@ -9,6 +9,10 @@ class ResourceSkillCreate(BaseModel):
     proficiency_level: int  # 1-5
 
 
+class ResourceSkillImport(ResourceSkillCreate):
+    resource_id: int
+
+
 class ResourceSkillResponse(BaseModel):
     id: int
     resource_id: int
@@ -101,6 +105,31 @@ class ResourceUtilizationResponse(BaseModel):
     allocations: List[Dict[str, Any]]
 
 
+class UtilizationTimelineBucket(BaseModel):
+    start: date
+    end: date  # inclusive
+    days: int
+
+
+class ResourceUtilizationTimeline(BaseModel):
+    resource_id: int
+    resource_name: str
+    capacity_hours: Decimal  # per capacity period (see resource_capacity_period_days)
+    allocated_hours: List[float]  # one value per bucket
+    utilization_percentage: List[float]  # one value per bucket
+    peak_utilization_percentage: float
+    over_utilized_buckets: int
+    undated_hours: float  # allocations without dates cannot be placed on the timeline
+
+
+class UtilizationTimelineResponse(BaseModel):
+    granularity: str  # "day", "week" or "month"
+    start: date
+    end: date  # inclusive
+    buckets: List[UtilizationTimelineBucket]
+    resources: List[ResourceUtilizationTimeline]
+
+
 class SchedulingConflict(BaseModel):
     resource_id: int
     resource_name: str
@@ -109,6 +138,7 @@ class SchedulingConflict(BaseModel):
     affected_projects: List[int]
     severity: str  # "low", "medium", "high"
     suggested_resolution: Optional[str]
+    peak_concurrent_hours: Optional[float] = None  # date-overlap clusters only
 
 
 class ResourceRecommendation(BaseModel):
@@ -154,3 +184,64 @@ class ScenarioComparisonResponse(BaseModel):
     recommendations: str
 
 
+class ScenarioSimulationResult(BaseModel):
+    name: str
+    total_allocated_hours: float
+    resources_involved: int
+    projects_involved: int
+    conflicts: List[SchedulingConflict]  # on the resources the scenario touches
+    new_conflicts: int  # relative to the live allocations
+    new_high_severity_conflicts: int
+    utilization: Dict[str, Any]  # distribution over all resources after the overlay
+    skill_coverage: Dict[str, Any]  # requirements of the scenario's projects
+    warnings: List[str] = []
+
+
+class ScenarioSimulationResponse(BaseModel):
+    results: List[ScenarioSimulationResult]
+    ranking: List[int]  # indices into results, best first
+    recommendations: str
+
+
+
+
+class PortfolioOptimizationRequest(BaseModel):
+    project_ids: Optional[List[int]] = None  # defaults to all active projects
+    time_budget_seconds: float = 10.0
+    skill_weight: float = 0.7
+    availability_weight: float = 0.3
+
+
+class PortfolioAssignment(BaseModel):
+    resource_id: int
+    resource_name: str
+    project_id: int
+    project_name: str
+    skill_name: str
+    allocated_hours: float
+    match_score: float  # 0-100
+
+
+class PortfolioOptimizationResponse(BaseModel):
+    assignments: List[PortfolioAssignment]
+    unfilled_requirements: List[Dict[str, Any]]
+    objective: float
+    solver: str  # "hungarian" or "greedy"
+    rounds_completed: int
+    timed_out: bool
+    elapsed_ms: float
+
+
+class BulkImportError(BaseModel):
+    row: int  # 1-based, excluding the CSV header
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    kind: str  # "resources", "skills" or "allocations"
+    dry_run: bool
+    total_rows: int
+    accepted: int  # rows that passed validation (and were written unless dry_run)
+    failed: int
+    errors: List[BulkImportError]
+    errors_truncated: bool = False
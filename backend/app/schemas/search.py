@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchHit(BaseModel):
+    type: str  # meeting, action_item or risk
+    id: int
+    project_id: int
+    meeting_id: Optional[int] = None  # the meeting itself, or the meeting of an action item
+    title: str
+    snippet: str  # matching terms wrapped in <b></b>
+    rank: float
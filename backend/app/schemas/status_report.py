@@ -1,5 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional, List
+from app.core.config import settings
 
 
 class StatusReportResponse(BaseModel):
@@ -14,3 +16,15 @@ class StatusReportResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class BulkStatusReportRequest(BaseModel):
+    project_ids: Optional[List[int]] = None  # defaults to all active projects
+    # Can only lower the server-side limits, never raise or disable them
+    max_concurrency: Optional[int] = Field(None, ge=1, le=settings.status_bulk_concurrency)
+    requests_per_minute: Optional[int] = Field(None, ge=1)
+
+
+class BulkStatusReportResponse(BaseModel):
+    reports: List[StatusReportResponse]
+    failed: List[dict]
@@ -5,9 +5,12 @@ Provides intelligent resource allocation, conflict detection, utilization analys
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import aliased
 from typing import List, Dict, Any, Tuple, Optional
 from decimal import Decimal
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+from app.core.config import settings
 from app.models.resource import Resource, Allocation
 from app.models.resource_skill import ResourceSkill
 from app.models.project_requirement import ProjectRequirement
@@ -15,92 +18,400 @@ from app.models.allocation_scenario import AllocationScenario
 from app.models.project import Project
 from app.schemas.resource import (
     ResourceUtilizationResponse,
+    UtilizationTimelineBucket,
+    ResourceUtilizationTimeline,
+    UtilizationTimelineResponse,
     SchedulingConflict,
     ResourceRecommendation,
     AllocationOptimizationResponse,
     ScenarioCreate,
     ScenarioResponse,
-    ScenarioComparisonResponse
+    ScenarioComparisonResponse,
+    ScenarioSimulationResult,
+    ScenarioSimulationResponse
 )
 
 
+# Number of resources loaded per grouped utilization query.
+UTILIZATION_BATCH_SIZE = 500
+
+
+def _utilization_status(utilization_pct: float) -> str:
+    """Classify a utilization percentage as under-utilized, optimal or over-utilized."""
+    if utilization_pct < 60:
+        return "under-utilized"
+    elif utilization_pct <= 90:
+        return "optimal"
+    else:
+        return "over-utilized"
+
+
+def _utilization_rows_query(resource_filter) -> Any:
+    """
+    Build the grouped utilization query.
+    Returns one row per allocation (or one row for a resource without allocations),
+    carrying the resource's capacity, its windowed allocated total and the project name.
+    """
+    total_allocated = func.sum(Allocation.allocated_hours).over(partition_by=Resource.id)
+    
+    return (
+        select(
+            Resource.id.label("resource_id"),
+            Resource.name.label("resource_name"),
+            Resource.capacity_hours,
+            total_allocated.label("total_allocated"),
+            Allocation.id.label("allocation_id"),
+            Allocation.project_id,
+            Allocation.allocated_hours,
+            Allocation.start_date,
+            Allocation.end_date,
+            Project.name.label("project_name"),
+        )
+        .outerjoin(Allocation, Allocation.resource_id == Resource.id)
+        .outerjoin(Project, Project.id == Allocation.project_id)
+        .where(resource_filter)
+        .order_by(Resource.id, Allocation.id)
+    )
+
+
+def _build_utilization_responses(rows) -> List[ResourceUtilizationResponse]:
+    """Fold grouped utilization rows (ordered by resource) into responses."""
+    grouped: Dict[int, Tuple[Any, List[Dict[str, Any]]]] = {}
+    
+    for row in rows:
+        if row.resource_id not in grouped:
+            grouped[row.resource_id] = (row, [])
+        if row.allocation_id is None:
+            continue
+        
+        grouped[row.resource_id][1].append({
+            "project_id": row.project_id,
+            "project_name": row.project_name or "Unknown",
+            "allocated_hours": float(row.allocated_hours),
+            "start_date": row.start_date.isoformat() if row.start_date else None,
+            "end_date": row.end_date.isoformat() if row.end_date else None,
+        })
+    
+    utilization_data = []
+    for resource_row, allocation_details in grouped.values():
+        total_allocated = resource_row.total_allocated or Decimal("0")
+        capacity_hours = resource_row.capacity_hours
+        
+        # Calculate available hours
+        available_hours = capacity_hours - total_allocated
+        
+        # Calculate utilization percentage
+        utilization_pct = float((total_allocated / capacity_hours) * 100) if capacity_hours > 0 else 0
+        
+        utilization_data.append(ResourceUtilizationResponse(
+            resource_id=resource_row.resource_id,
+            resource_name=resource_row.resource_name,
+            capacity_hours=capacity_hours,
+            allocated_hours=total_allocated,
+            available_hours=available_hours,
+            utilization_percentage=round(utilization_pct, 2),
+            status=_utilization_status(utilization_pct),
+            allocations=allocation_details
+        ))
+    
+    return utilization_data
+
+
 async def get_resource_utilization(
     db: AsyncSession,
-    resource_id: Optional[int] = None
+    resource_id: Optional[int] = None,
+    batch_size: int = UTILIZATION_BATCH_SIZE
 ) -> List[ResourceUtilizationResponse]:
     """
     Calculate utilization for all resources or a specific resource.
     Identifies over-utilized and under-utilized resources.
+    
+    Capacity, allocated totals and per-project breakdowns come from one grouped
+    query per batch of `batch_size` resources (keyset-paged on resource id);
+    responses are then built in memory.
     """
     if resource_id:
-        resource_result = await db.execute(
-            select(Resource).where(Resource.id == resource_id)
-        )
-        resources = [resource_result.scalar_one_or_none()]
-        if not resources[0]:
-            return []
-    else:
-        resource_result = await db.execute(select(Resource))
-        resources = list(resource_result.scalars().all())
+        result = await db.execute(_utilization_rows_query(Resource.id == resource_id))
+        return _build_utilization_responses(result.all())
     
     utilization_data = []
+    last_resource_id = 0
     
-    for resource in resources:
-        # Calculate total allocated hours
-        allocation_result = await db.execute(
-            select(func.sum(Allocation.allocated_hours))
-            .where(Allocation.resource_id == resource.id)
+    while True:
+        batch_ids = (
+            select(Resource.id)
+            .where(Resource.id > last_resource_id)
+            .order_by(Resource.id)
+            .limit(batch_size)
+            .scalar_subquery()
         )
-        total_allocated = allocation_result.scalar() or Decimal("0")
+        result = await db.execute(_utilization_rows_query(Resource.id.in_(batch_ids)))
+        batch = _build_utilization_responses(result.all())
+        if not batch:
+            break
         
-        # Get all allocations
-        allocations_result = await db.execute(
-            select(Allocation).where(Allocation.resource_id == resource.id)
+        utilization_data.extend(batch)
+        last_resource_id = batch[-1].resource_id
+        if len(batch) < batch_size:
+            break
+    
+    return utilization_data
+
+
+TIMELINE_GRANULARITIES = ("day", "week", "month")
+
+
+def timeline_buckets(
+    start: date,
+    end: date,
+    granularity: str
+) -> Tuple[date, np.ndarray, np.ndarray]:
+    """
+    Align [start, end] to whole buckets (weeks start on Monday, months on the 1st).
+    Returns the aligned window start, each bucket's start offset in days from it,
+    and each bucket's length in days.
+    """
+    if granularity == "day":
+        window_start, window_end = start, end + timedelta(days=1)
+        offsets = np.arange((window_end - window_start).days)
+    elif granularity == "week":
+        window_start = start - timedelta(days=start.weekday())
+        window_end = end + timedelta(days=7 - end.weekday())
+        offsets = np.arange(0, (window_end - window_start).days, 7)
+    elif granularity == "month":
+        months = np.arange(
+            np.datetime64(start, "M"), np.datetime64(end, "M") + 2, dtype="datetime64[M]"
+        ).astype("datetime64[D]")
+        window_start = months[0].astype(date)
+        offsets = (months - months[0]).astype(np.int64)
+        lengths = np.diff(offsets)
+        return window_start, offsets[:-1], lengths
+    else:
+        raise ValueError(f"Unsupported granularity '{granularity}'. Use one of: {', '.join(TIMELINE_GRANULARITIES)}")
+    
+    lengths = np.diff(np.append(offsets, (window_end - window_start).days))
+    return window_start, offsets, lengths
+
+
+async def get_utilization_timeline(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    granularity: str = "week",
+    project_id: Optional[int] = None,
+    department: Optional[str] = None
+) -> UtilizationTimelineResponse:
+    """
+    Utilization per resource per day, week or month between `start` and `end`.
+    
+    Each dated allocation is spread evenly over the days from its start to its
+    end date, and `capacity_hours` is treated as capacity per
+    `resource_capacity_period_days`. Daily load is built for all resources at
+    once with a difference array (+rate on the first day, -rate after the last)
+    and a cumulative sum, then summed per bucket with np.add.reduceat, so the
+    cost is O(allocations + resources x days) with no per-bucket Python loops.
+    Allocations without dates are reported separately as `undated_hours`.
+    """
+    window_start, offsets, lengths = timeline_buckets(start, end, granularity)
+    days = int(offsets[-1] + lengths[-1])
+    if days > settings.utilization_timeline_max_days:
+        raise ValueError(f"Date range too long: at most {settings.utilization_timeline_max_days} days")
+    window_end = window_start + timedelta(days=days)  # exclusive
+    
+    resource_filters = []
+    if project_id is not None:
+        resource_filters.append(Resource.project_id == project_id)
+    if department is not None:
+        resource_filters.append(Resource.department == department)
+    
+    resource_result = await db.execute(
+        select(Resource.id, Resource.name, Resource.capacity_hours)
+        .where(*resource_filters)
+        .order_by(Resource.id)
+    )
+    resources = resource_result.all()
+    
+    window_start_at = datetime.combine(window_start, datetime.min.time(), tzinfo=timezone.utc)
+    window_end_at = datetime.combine(window_end, datetime.min.time(), tzinfo=timezone.utc)
+    allocation_result = await db.execute(
+        select(Allocation.resource_id, Allocation.allocated_hours, Allocation.start_date, Allocation.end_date)
+        .join(Resource, Resource.id == Allocation.resource_id)
+        .where(*resource_filters)
+        .where(or_(
+            Allocation.start_date.is_(None),
+            Allocation.end_date.is_(None),
+            and_(Allocation.start_date < window_end_at, Allocation.end_date >= window_start_at),
+        ))
+    )
+    
+    index = {row.id: i for i, row in enumerate(resources)}
+    undated = np.zeros(len(resources))
+    rows, first_days, last_days, hours = [], [], [], []
+    for resource_id, allocated_hours, start_date, end_date in allocation_result.all():
+        if start_date is None or end_date is None:
+            undated[index[resource_id]] += float(allocated_hours)
+            continue
+        rows.append(index[resource_id])
+        first_days.append(start_date.date().toordinal())
+        last_days.append(end_date.date().toordinal())
+        hours.append(float(allocated_hours))
+    
+    # Difference array over the window; one extra column absorbs ends past the window
+    load = np.zeros((len(resources), days + 1))
+    if rows:
+        rows = np.asarray(rows)
+        first = np.asarray(first_days, dtype=np.int64)
+        last = np.maximum(np.asarray(last_days, dtype=np.int64), first)
+        rate = np.asarray(hours) / (last - first + 1)
+        origin = window_start.toordinal()
+        first_offset = np.clip(first - origin, 0, days)
+        end_offset = np.clip(last - origin + 1, 0, days)
+        np.add.at(load, (rows, first_offset), rate)
+        np.add.at(load, (rows, end_offset), -rate)
+    daily_load = np.cumsum(load[:, :days], axis=1)
+    
+    allocated = np.add.reduceat(daily_load, offsets, axis=1) if len(resources) else np.zeros((0, len(offsets)))
+    capacity_per_day = np.array([float(row.capacity_hours) for row in resources]) / settings.resource_capacity_period_days
+    capacity = capacity_per_day[:, None] * lengths[None, :]
+    utilization = np.divide(allocated * 100, capacity, out=np.zeros_like(allocated), where=capacity > 0)
+    
+    allocated = np.round(allocated, 2)
+    utilization = np.round(utilization, 2)
+    over_utilized = (utilization > 90).sum(axis=1)
+    
+    bucket_starts = [window_start + timedelta(days=int(offset)) for offset in offsets]
+    return UtilizationTimelineResponse(
+        granularity=granularity,
+        start=window_start,
+        end=window_end - timedelta(days=1),
+        buckets=[
+            UtilizationTimelineBucket(start=bucket_start, end=bucket_start + timedelta(days=int(length) - 1), days=int(length))
+            for bucket_start, length in zip(bucket_starts, lengths)
+        ],
+        resources=[
+            ResourceUtilizationTimeline(
+                resource_id=row.id,
+                resource_name=row.name,
+                capacity_hours=row.capacity_hours,
+                allocated_hours=allocated[i].tolist(),
+                utilization_percentage=utilization[i].tolist(),
+                peak_utilization_percentage=float(utilization[i].max()) if utilization.shape[1] else 0.0,
+                over_utilized_buckets=int(over_utilized[i]),
+                undated_hours=round(float(undated[i]), 2),
+            )
+            for i, row in enumerate(resources)
+        ],
+    )
+
+
+def find_overlap_clusters(
+    intervals: List[Tuple[datetime, datetime, float, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Group (start, end, hours, payload) intervals into maximal overlapping clusters.
+    
+    Intervals are sorted once and swept left to right; an interval joins the
+    current cluster when it starts on or before the cluster's furthest end
+    (ranges are inclusive). For every cluster of two or more intervals the
+    peak concurrent hours are computed with a start/end event sweep.
+    """
+    ordered = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+    clusters = []
+    current: List[Tuple[datetime, datetime, float, Any]] = []
+    current_end = None
+    
+    def close_cluster():
+        if len(current) < 2:
+            return
+        # Starts sort before ends at the same instant so touching ranges count as concurrent
+        events = sorted(
+            [(start, 0, hours) for start, _, hours, _ in current]
+            + [(end, 1, -hours) for _, end, hours, _ in current]
         )
-        allocations = list(allocations_result.scalars().all())
-        
-        # Calculate available hours
-        available_hours = resource.capacity_hours - total_allocated
-        
-        # Calculate utilization percentage
-        utilization_pct = float((total_allocated / resource.capacity_hours) * 100) if resource.capacity_hours > 0 else 0
-        
-        # Determine status
-        if utilization_pct < 60:
-            status = "under-utilized"
-        elif utilization_pct <= 90:
-            status = "optimal"
+        running = peak = 0.0
+        for _, _, delta in events:
+            running += delta
+            peak = max(peak, running)
+        clusters.append({
+            "start": current[0][0],
+            "end": current_end,
+            "peak_hours": round(peak, 2),
+            "members": [interval[3] for interval in current],
+        })
+    
+    for interval in ordered:
+        if current and interval[0] <= current_end:
+            current.append(interval)
+            current_end = max(current_end, interval[1])
         else:
-            status = "over-utilized"
+            close_cluster()
+            current = [interval]
+            current_end = interval[1]
+    close_cluster()
+    
+    return clusters
+
+
+def build_resource_conflicts(
+    resource_id: int,
+    resource_name: str,
+    capacity_hours: Decimal,
+    allocations: List[Any],
+    project_id: Optional[int] = None
+) -> List[SchedulingConflict]:
+    """
+    Over-allocation and date-overlap conflicts for one resource's allocations
+    (objects with project_id, allocated_hours, start_date and end_date). With
+    `project_id`, only overlap clusters involving that project are reported.
+    """
+    conflicts = []
+    
+    # Check over-allocation
+    total_allocated = sum((alloc.allocated_hours for alloc in allocations), Decimal("0"))
+    
+    if total_allocated > capacity_hours:
+        affected_projects = [alloc.project_id for alloc in allocations]
         
-        # Prepare allocation details
-        allocation_details = []
-        for alloc in allocations:
-            project_result = await db.execute(
-                select(Project).where(Project.id == alloc.project_id)
-            )
-            project = project_result.scalar_one_or_none()
-            
-            allocation_details.append({
-                "project_id": alloc.project_id,
-                "project_name": project.name if project else "Unknown",
-                "allocated_hours": float(alloc.allocated_hours),
-                "start_date": alloc.start_date.isoformat() if alloc.start_date else None,
-                "end_date": alloc.end_date.isoformat() if alloc.end_date else None,
-            })
+        over_allocated_hours = float(total_allocated - capacity_hours)
         
-        utilization_data.append(ResourceUtilizationResponse(
-            resource_id=resource.id,
-            resource_name=resource.name,
-            capacity_hours=resource.capacity_hours,
-            allocated_hours=total_allocated,
-            available_hours=available_hours,
-            utilization_percentage=round(utilization_pct, 2),
-            status=status,
-            allocations=allocation_details
+        conflicts.append(SchedulingConflict(
+            resource_id=resource_id,
+            resource_name=resource_name,
+            conflict_type="over-allocation",
+            description=f"Resource is over-allocated by {over_allocated_hours} hours",
+            affected_projects=affected_projects,
+            severity="high",
+            suggested_resolution=f"Reduce allocation or increase capacity by {over_allocated_hours} hours"
         ))
     
-    return utilization_data
+    # Check date overlaps
+    intervals = [
+        (alloc.start_date, alloc.end_date, float(alloc.allocated_hours), alloc.project_id)
+        for alloc in allocations
+        if alloc.start_date is not None and alloc.end_date is not None
+    ]
+    
+    for cluster in find_overlap_clusters(intervals):
+        cluster_projects = list(dict.fromkeys(cluster["members"]))
+        if project_id is not None and project_id not in cluster_projects:
+            continue
+        
+        conflicts.append(SchedulingConflict(
+            resource_id=resource_id,
+            resource_name=resource_name,
+            conflict_type="date-overlap",
+            description=(
+                f"{len(cluster['members'])} overlapping allocations from "
+                f"{cluster['start'].date()} to {cluster['end'].date()} "
+                f"(peak {cluster['peak_hours']}h concurrent)"
+            ),
+            affected_projects=cluster_projects,
+            severity="medium",
+            suggested_resolution="Adjust project timelines or assign additional resources",
+            peak_concurrent_hours=cluster["peak_hours"]
+        ))
+    
+    return conflicts
 
 
 async def detect_scheduling_conflicts(
@@ -112,69 +423,49 @@ async def detect_scheduling_conflicts(
     - Over-allocation (resource capacity exceeded)
     - Date overlaps (same resource on multiple projects in same timeframe)
     - Skill mismatches
-    """
-    conflicts = []
-    
-    # Get all resources
-    resource_result = await db.execute(select(Resource))
-    resources = list(resource_result.scalars().all())
     
-    for resource in resources:
-        # Check over-allocation
-        allocation_result = await db.execute(
-            select(func.sum(Allocation.allocated_hours))
-            .where(Allocation.resource_id == resource.id)
+    All allocations are loaded in one query (restricted in SQL to resources
+    working on `project_id` when given). Date overlaps are reported once per
+    maximal overlapping cluster, found with a sweep line, together with the
+    cluster's peak concurrent hours.
+    """
+    query = (
+        select(
+            Allocation.resource_id,
+            Allocation.project_id,
+            Allocation.allocated_hours,
+            Allocation.start_date,
+            Allocation.end_date,
+            Resource.name.label("resource_name"),
+            Resource.capacity_hours,
         )
-        total_allocated = allocation_result.scalar() or Decimal("0")
-        
-        if total_allocated > resource.capacity_hours:
-            allocations_result = await db.execute(
-                select(Allocation).where(Allocation.resource_id == resource.id)
-            )
-            allocations = list(allocations_result.scalars().all())
-            affected_projects = [alloc.project_id for alloc in allocations]
-            
-            over_allocated_hours = float(total_allocated - resource.capacity_hours)
-            
-            conflicts.append(SchedulingConflict(
-                resource_id=resource.id,
-                resource_name=resource.name,
-                conflict_type="over-allocation",
-                description=f"Resource is over-allocated by {over_allocated_hours} hours",
-                affected_projects=affected_projects,
-                severity="high",
-                suggested_resolution=f"Reduce allocation or increase capacity by {over_allocated_hours} hours"
-            ))
-        
-        # Check date overlaps
-        allocations_result = await db.execute(
-            select(Allocation)
-            .where(
-                and_(
-                    Allocation.resource_id == resource.id,
-                    Allocation.start_date.isnot(None),
-                    Allocation.end_date.isnot(None)
-                )
+        .join(Resource, Resource.id == Allocation.resource_id)
+        .order_by(Allocation.resource_id, Allocation.id)
+    )
+    if project_id is not None:
+        project_allocation = aliased(Allocation)
+        query = query.where(
+            Allocation.resource_id.in_(
+                select(project_allocation.resource_id)
+                .where(project_allocation.project_id == project_id)
             )
-            .order_by(Allocation.start_date)
         )
-        allocations = list(allocations_result.scalars().all())
-        
-        for i in range(len(allocations)):
-            for j in range(i + 1, len(allocations)):
-                alloc1, alloc2 = allocations[i], allocations[j]
-                
-                # Check if date ranges overlap
-                if alloc1.end_date >= alloc2.start_date and alloc2.end_date >= alloc1.start_date:
-                    conflicts.append(SchedulingConflict(
-                        resource_id=resource.id,
-                        resource_name=resource.name,
-                        conflict_type="date-overlap",
-                        description=f"Overlapping allocations from {alloc1.start_date.date()} to {alloc2.end_date.date()}",
-                        affected_projects=[alloc1.project_id, alloc2.project_id],
-                        severity="medium",
-                        suggested_resolution="Adjust project timelines or assign additional resources"
-                    ))
+    
+    result = await db.execute(query)
+    
+    allocations_by_resource: Dict[int, List[Any]] = {}
+    for row in result.all():
+        allocations_by_resource.setdefault(row.resource_id, []).append(row)
+    
+    conflicts = []
+    for resource_id, allocations in allocations_by_resource.items():
+        conflicts.extend(build_resource_conflicts(
+            resource_id,
+            allocations[0].resource_name,
+            allocations[0].capacity_hours,
+            allocations,
+            project_id
+        ))
     
     return conflicts
 
@@ -235,6 +526,72 @@ async def calculate_skill_match_score(
     return round(overall_score, 2), skill_details
 
 
+async def load_resource_totals(db: AsyncSession) -> List[Any]:
+    """Load every resource's id, name, capacity and allocated total in one grouped query."""
+    result = await db.execute(
+        select(
+            Resource.id,
+            Resource.name,
+            Resource.capacity_hours,
+            func.coalesce(func.sum(Allocation.allocated_hours), 0).label("total_allocated"),
+        )
+        .outerjoin(Allocation, Allocation.resource_id == Resource.id)
+        .group_by(Resource.id, Resource.name, Resource.capacity_hours)
+        .order_by(Resource.id)
+    )
+    return list(result.all())
+
+
+def build_proficiency_matrix(
+    resource_ids: List[int],
+    skill_names: List[str],
+    skill_rows
+) -> np.ndarray:
+    """
+    Build a dense resource x skill proficiency matrix (0 where a skill is missing).
+    Rows follow `resource_ids`, columns follow `skill_names`; later rows win for duplicate skills.
+    """
+    resource_index = {resource_id: i for i, resource_id in enumerate(resource_ids)}
+    skill_index = {skill_name: j for j, skill_name in enumerate(skill_names)}
+    matrix = np.zeros((len(resource_ids), len(skill_names)), dtype=np.int64)
+    
+    for row in skill_rows:
+        i = resource_index.get(row.resource_id)
+        j = skill_index.get(row.skill_name)
+        if i is not None and j is not None:
+            matrix[i, j] = row.proficiency_level
+    
+    return matrix
+
+
+def score_skill_matrix(actual: np.ndarray, required: np.ndarray) -> np.ndarray:
+    """
+    Score every (resource, requirement) pair with the calculate_skill_match_score rules:
+    100 when proficiency meets the requirement, (actual / required) * 80 for a partial
+    match and 0 when the skill is missing.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        partial = (actual / required) * 80
+    return np.where(actual >= required, 100.0, np.where(actual > 0, partial, 0.0))
+
+
+def _skill_match_details(
+    requirements: List[ProjectRequirement],
+    actual: np.ndarray,
+    scores: np.ndarray
+) -> Dict[str, Any]:
+    """Build the per-skill comparison returned with a recommendation."""
+    skill_details = {}
+    for req, resource_proficiency, score in zip(requirements, actual.tolist(), scores.tolist()):
+        skill_details[req.skill_name] = {
+            "required": req.required_proficiency,
+            "actual": resource_proficiency,
+            "match": "excellent" if score == 100 else "partial" if score > 0 else "none",
+            "score": round(score, 2) if 0 < score < 100 else int(score)
+        }
+    return skill_details
+
+
 async def recommend_optimal_allocation(
     db: AsyncSession,
     project_id: int
@@ -245,6 +602,9 @@ async def recommend_optimal_allocation(
     - Availability
     - Current utilization
     - Development opportunities
+    
+    Skill scores for all candidates are computed in one vectorized NumPy pass over a
+    dense resource x skill proficiency matrix, using the calculate_skill_match_score formula.
     """
     # Get project details
     project_result = await db.execute(
@@ -255,27 +615,68 @@ async def recommend_optimal_allocation(
     if not project:
         raise ValueError(f"Project {project_id} not found")
     
-    # Get all available resources
-    resources_result = await db.execute(select(Resource))
-    resources = list(resources_result.scalars().all())
+    # Get project requirements
+    requirements_result = await db.execute(
+        select(ProjectRequirement)
+        .where(ProjectRequirement.project_id == project_id)
+        .order_by(ProjectRequirement.id)
+    )
+    requirements = list(requirements_result.scalars().all())
     
-    recommendations = []
+    # Get all available resources with their allocated totals in one grouped query
+    resources = await load_resource_totals(db)
     
-    for resource in resources:
-        # Calculate skill match
-        skill_score, skill_match = await calculate_skill_match_score(db, resource.id, project_id)
-        
-        # Calculate availability
-        allocation_result = await db.execute(
-            select(func.sum(Allocation.allocated_hours))
-            .where(Allocation.resource_id == resource.id)
+    # Calculate skill match for every resource in one vectorized pass
+    if requirements:
+        skill_names = list(dict.fromkeys(req.skill_name for req in requirements))
+        skills_result = await db.execute(
+            select(ResourceSkill.resource_id, ResourceSkill.skill_name, ResourceSkill.proficiency_level)
+            .where(ResourceSkill.skill_name.in_(skill_names))
+            .order_by(ResourceSkill.id)
+        )
+        proficiency = build_proficiency_matrix(
+            [resource.id for resource in resources],
+            skill_names,
+            skills_result.all()
         )
-        total_allocated = allocation_result.scalar() or Decimal("0")
-        available_hours = resource.capacity_hours - total_allocated
-        availability_score = min(100, float(available_hours / resource.capacity_hours * 100))
+        skill_columns = [skill_names.index(req.skill_name) for req in requirements]
+        required = np.array([req.required_proficiency for req in requirements], dtype=np.int64)
+        actual = proficiency[:, skill_columns]
+        requirement_scores = score_skill_matrix(actual, required)
+        overall_scores = requirement_scores.sum(axis=1) / (100 * len(requirements)) * 100
+        skill_scores = [round(score, 2) for score in overall_scores.tolist()]
+    else:
+        skill_scores = [50.0] * len(resources)
+    
+    # Calculate availability (Decimal arithmetic, as stored)
+    availability_scores = np.array([
+        min(100, float((resource.capacity_hours - resource.total_allocated) / resource.capacity_hours * 100))
+        if resource.capacity_hours > 0 else 0.0
+        for resource in resources
+    ], dtype=np.float64)
+    
+    # Calculate overall match score (weighted average)
+    match_scores = (np.array(skill_scores, dtype=np.float64) * 0.7) + (availability_scores * 0.3)
+    
+    # Only recommend if reasonable match; rank by rounded score, keeping resource order on ties
+    candidates = [
+        (round(match_score, 2), index)
+        for index, match_score in enumerate(match_scores.tolist())
+        if match_score >= 60
+    ]
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    
+    recommendations = []
+    
+    for match_score, index in candidates[:10]:
+        resource = resources[index]
+        skill_score = skill_scores[index]
+        availability_score = float(availability_scores[index])
         
-        # Calculate overall match score (weighted average)
-        match_score = (skill_score * 0.7) + (availability_score * 0.3)
+        if requirements:
+            skill_match = _skill_match_details(requirements, actual[index], requirement_scores[index])
+        else:
+            skill_match = {"message": "No specific requirements defined"}
         
         # Generate reasoning
         reasoning_parts = []
@@ -287,24 +688,20 @@ async def recommend_optimal_allocation(
             reasoning_parts.append("Skills need development")
         
         if availability_score >= 50:
-            reasoning_parts.append(f"{float(available_hours)}h available")
+            reasoning_parts.append(f"{float(resource.capacity_hours - resource.total_allocated)}h available")
         else:
             reasoning_parts.append("Limited availability")
         
-        if match_score >= 60:  # Only recommend if reasonable match
-            recommendations.append(ResourceRecommendation(
-                resource_id=resource.id,
-                resource_name=resource.name,
-                project_id=project_id,
-                project_name=project.name,
-                match_score=round(match_score, 2),
-                skill_match=skill_match,
-                availability_score=round(availability_score, 2),
-                reasoning="; ".join(reasoning_parts)
-            ))
-    
-    # Sort by match score
-    recommendations.sort(key=lambda x: x.match_score, reverse=True)
+        recommendations.append(ResourceRecommendation(
+            resource_id=resource.id,
+            resource_name=resource.name,
+            project_id=project_id,
+            project_name=project.name,
+            match_score=match_score,
+            skill_match=skill_match,
+            availability_score=round(availability_score, 2),
+            reasoning="; ".join(reasoning_parts)
+        ))
     
     # Get conflicts
     conflicts = await detect_scheduling_conflicts(db, project_id)
@@ -328,7 +725,7 @@ async def recommend_optimal_allocation(
     optimization_score = max(0, optimization_score)
     
     return AllocationOptimizationResponse(
-        recommendations=recommendations[:10],  # Top 10
+        recommendations=recommendations,  # Top 10
         conflicts=conflicts,
         utilization_summary=utilization_summary,
         optimization_score=optimization_score
@@ -341,7 +738,11 @@ async def create_allocation_scenario(
 ) -> ScenarioResponse:
     """
     Create a what-if scenario for resource allocation analysis.
+    The scenario is simulated against the live allocations (nothing is written
+    besides the scenario itself) and the result is stored under metrics["simulation"].
     """
+    from app.services.scenario_simulation_service import load_simulation_baseline, simulate_scenario
+    
     # Calculate metrics for this scenario
     total_hours = sum([alloc.allocated_hours for alloc in scenario_data.allocations])
     unique_resources = len(set([alloc.resource_id for alloc in scenario_data.allocations]))
@@ -368,6 +769,9 @@ async def create_allocation_scenario(
         ]
     }
     
+    baseline = await load_simulation_baseline(db)
+    metrics["simulation"] = simulate_scenario(baseline, scenario_json["allocations"])
+    
     scenario = AllocationScenario(
         name=scenario_data.name,
         description=scenario_data.description,
@@ -388,31 +792,50 @@ async def compare_scenarios(
 ) -> ScenarioComparisonResponse:
     """
     Compare multiple allocation scenarios and provide recommendations.
+    Every scenario is re-simulated against the current live allocations (in
+    parallel for large batches) and ranked by new conflicts, skill coverage,
+    over-utilization and finally total hours.
     """
-    scenarios = []
+    from app.services.scenario_simulation_service import (
+        load_simulation_baseline, simulate_scenarios, rank_simulations, describe_best
+    )
     
-    for scenario_id in scenario_ids:
-        result = await db.execute(
-            select(AllocationScenario).where(AllocationScenario.id == scenario_id)
-        )
-        scenario = result.scalar_one_or_none()
-        if scenario:
-            scenarios.append(ScenarioResponse.from_orm(scenario))
+    result = await db.execute(
+        select(AllocationScenario).where(AllocationScenario.id.in_(scenario_ids))
+    )
+    found = {scenario.id: scenario for scenario in result.scalars().all()}
+    scenarios = [
+        ScenarioResponse.from_orm(found[scenario_id])
+        for scenario_id in dict.fromkeys(scenario_ids)
+        if scenario_id in found
+    ]
     
     if not scenarios:
         raise ValueError("No valid scenarios found")
     
+    baseline = await load_simulation_baseline(db)
+    simulations = await simulate_scenarios(
+        baseline, [s.scenario_data.get("allocations", []) for s in scenarios]
+    )
+    for scenario, simulation in zip(scenarios, simulations):
+        scenario.metrics = {**(scenario.metrics or {}), "simulation": simulation}
+    
     # Compare metrics
     comparison_metrics = {
         "total_hours": [s.metrics.get("total_allocated_hours", 0) for s in scenarios],
         "resources_used": [s.metrics.get("resources_involved", 0) for s in scenarios],
         "projects_covered": [s.metrics.get("projects_involved", 0) for s in scenarios],
-        "allocations_count": [s.metrics.get("allocations_count", 0) for s in scenarios]
+        "allocations_count": [s.metrics.get("allocations_count", 0) for s in scenarios],
+        "new_conflicts": [sim["new_conflicts"] for sim in simulations],
+        "new_high_severity_conflicts": [sim["new_high_severity_conflicts"] for sim in simulations],
+        "over_utilized_resources": [sim["utilization"]["over-utilized"] for sim in simulations],
+        "skill_coverage_percentage": [sim["skill_coverage"]["coverage_percentage"] for sim in simulations],
     }
     
     # Generate recommendations
-    best_scenario_idx = comparison_metrics["total_hours"].index(min(comparison_metrics["total_hours"]))
-    recommendations = f"Scenario '{scenarios[best_scenario_idx].name}' appears most efficient with {comparison_metrics['total_hours'][best_scenario_idx]} total hours allocated."
+    ranking = rank_simulations(simulations)
+    comparison_metrics["ranking"] = [scenarios[i].id for i in ranking]
+    recommendations = describe_best(scenarios[ranking[0]].name, simulations[ranking[0]])
     
     return ScenarioComparisonResponse(
         scenarios=scenarios,
@@ -421,4 +844,29 @@ async def compare_scenarios(
     )
 
 
-from typing import Optional
+async def simulate_allocation_scenarios(
+    db: AsyncSession,
+    scenarios: List[ScenarioCreate]
+) -> ScenarioSimulationResponse:
+    """Simulate unsaved scenarios against the live allocations and rank them."""
+    from app.services.scenario_simulation_service import (
+        load_simulation_baseline, simulate_scenarios, rank_simulations, describe_best
+    )
+    
+    if not scenarios:
+        raise ValueError("No scenarios given")
+    
+    baseline = await load_simulation_baseline(db)
+    simulations = await simulate_scenarios(
+        baseline, [[alloc.model_dump() for alloc in scenario.allocations] for scenario in scenarios]
+    )
+    ranking = rank_simulations(simulations)
+    
+    return ScenarioSimulationResponse(
+        results=[
+            ScenarioSimulationResult(name=scenario.name, **simulation)
+            for scenario, simulation in zip(scenarios, simulations)
+        ],
+        ranking=ranking,
+        recommendations=describe_best(scenarios[ranking[0]].name, simulations[ranking[0]])
+    )
@@ -0,0 +1,258 @@
+"""
+Background Job Service
+Runs slow, LLM-backed operations on an asyncio worker pool so HTTP requests and
+their database sessions are released immediately. Job state lives in the jobs table.
+"""
+
+import asyncio
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import select, update, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job
+from app.schemas.meeting import MeetingUpload, MeetingResponse
+from app.schemas.risk import RiskAnalyze
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Register a coroutine as the handler for `job_type`. Its return value must be JSON-serializable."""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return register
+
+
+@job_handler("meeting_upload")
+async def _run_meeting_upload(db: AsyncSession, params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.meeting_service import create_meeting_from_text
+    meeting = await create_meeting_from_text(db, MeetingUpload(**params))
+    return MeetingResponse.model_validate(meeting).model_dump(mode="json")
+
+
+@job_handler("risk_analyze")
+async def _run_risk_analyze(db: AsyncSession, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from app.services.risk_service import analyze_risks_from_text_coalesced
+    return await analyze_risks_from_text_coalesced(RiskAnalyze(**params))
+
+
+@job_handler("risk_analyze_project")
+async def _run_risk_analyze_project(db: AsyncSession, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from app.services.risk_service import analyze_project_documentation_coalesced
+    return await analyze_project_documentation_coalesced(params["project_id"])
+
+
+@job_handler("status_generate")
+async def _run_status_generate(db: AsyncSession, params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.status_service import generate_status_report_coalesced
+    return await generate_status_report_coalesced(params["project_id"])
+
+
+@job_handler("risk_trend_refresh")
+async def _run_risk_trend_refresh(db: AsyncSession, params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.risk_analytics_service import refresh_risk_trends
+    return await refresh_risk_trends(
+        db, params.get("project_id"), params.get("days", settings.risk_trend_window_days)
+    )
+
+
+async def run_job(job_id: int, running: Optional[Set[int]] = None) -> None:
+    """
+    Claim a queued job and run its handler in a fresh session.
+    The claim is a conditional UPDATE, so a job is only ever run by one worker
+    even when several processes hold its id. `running`, if given, contains the
+    id from the claim until the job's outcome is stored.
+    """
+    async with AsyncSessionLocal() as db:
+        claim = await db.execute(
+            update(Job)
+            .where(and_(Job.id == job_id, Job.status == "queued"))
+            .values(status="running", started_at=func.now(), attempts=Job.attempts + 1)
+        )
+        await db.commit()
+        if claim.rowcount != 1:
+            return
+        if running is not None:
+            running.add(job_id)
+
+        job = await db.get(Job, job_id)
+        job_type, params = job.job_type, job.params
+        handler = JOB_HANDLERS.get(job_type)
+        result, error = None, None
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type '{job_type}'")
+            result = await handler(db, params)
+            status = "succeeded"
+        except Exception as e:
+            await db.rollback()
+            print(f"Job {job_id} ({job_type}) failed: {str(e)}")
+            print(traceback.format_exc())
+            status, error = "failed", str(e)
+
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status=status, result=result, error=error, finished_at=func.now())
+        )
+        await db.commit()
+        if running is not None:
+            running.discard(job_id)
+
+
+class JobQueue:
+    """In-process asyncio worker pool; `workers` bounds concurrent jobs per uvicorn worker."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._schedules: List[asyncio.Task] = []
+        # Jobs this process has claimed and not finished
+        self._running: Set[int] = set()
+
+    def _ensure_started(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await run_job(job_id, self._running)
+            except Exception as e:
+                print(f"Job worker error on job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, job_id: int) -> None:
+        """Hand a queued job id to the worker pool."""
+        self._ensure_started()
+        self._queue.put_nowait(job_id)
+
+    async def _requeue_stale(self, all_queued: bool) -> None:
+        """
+        Requeue jobs left running by a process that died (started over
+        `job_stale_after_seconds` ago and not running here) and submit them, plus
+        queued jobs: all of them at startup, otherwise those waiting just as long.
+        """
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.job_stale_after_seconds)
+        async with AsyncSessionLocal() as db:
+            conditions = [Job.status == "running", Job.started_at < stale_before]
+            if self._running:
+                conditions.append(Job.id.notin_(self._running))
+            stale = list((await db.execute(select(Job.id).where(and_(*conditions)))).scalars().all())
+            if stale:
+                await db.execute(
+                    update(Job).where(and_(Job.id.in_(stale), Job.status == "running")).values(status="queued")
+                )
+                await db.commit()
+                print(f"Requeued {len(stale)} stale running job(s)")
+            queued = select(Job.id).where(Job.status == "queued").order_by(Job.id)
+            if not all_queued:
+                queued = queued.where(Job.created_at < stale_before)
+            job_ids = dict.fromkeys(stale + list((await db.execute(queued)).scalars().all()))
+        # Claims are conditional, so submitting a job another process also holds is harmless
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+
+    async def start(self) -> None:
+        """Start the workers, pick up queued or stale running jobs, and keep sweeping for stale ones."""
+        self._ensure_started()
+        await self._requeue_stale(all_queued=True)
+        if settings.job_stale_sweep_seconds > 0:
+            self._schedules.append(asyncio.create_task(self._sweep_every(settings.job_stale_sweep_seconds)))
+
+    async def _sweep_every(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self._requeue_stale(all_queued=False)
+            except Exception as e:
+                print(f"Stale job sweep failed: {str(e)}")
+
+    def schedule(self, job_type: str, params: Dict[str, Any], interval_seconds: float) -> None:
+        """Enqueue `job_type` every `interval_seconds` (0 or less disables the schedule)."""
+        if interval_seconds and interval_seconds > 0:
+            self._schedules.append(asyncio.create_task(self._every(job_type, params, interval_seconds)))
+
+    async def _every(self, job_type: str, params: Dict[str, Any], interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with AsyncSessionLocal() as db:
+                    # Another process may already have queued this run
+                    pending = await db.execute(
+                        select(Job.id)
+                        .where(and_(Job.job_type == job_type, Job.status.in_(["queued", "running"])))
+                        .limit(1)
+                    )
+                    if pending.scalar_one_or_none() is None:
+                        await enqueue_job(db, job_type, params)
+            except Exception as e:
+                print(f"Scheduled job {job_type} could not be enqueued: {str(e)}")
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers and schedules. Jobs they were running go back to
+        queued, so the next start (or another process's sweep) runs them again.
+        """
+        tasks = self._schedules + self._tasks
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._schedules = []
+        self._queue = None
+
+        interrupted, self._running = list(self._running), set()
+        if interrupted:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Job)
+                        .where(and_(Job.id.in_(interrupted), Job.status == "running"))
+                        .values(status="queued")
+                    )
+                    await db.commit()
+                print(f"Requeued {len(interrupted)} interrupted job(s) on shutdown")
+            except Exception as e:
+                print(f"Interrupted jobs {interrupted} could not be requeued: {str(e)}")
+
+
+job_queue = JobQueue(workers=settings.job_workers)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    params: Dict[str, Any]
+) -> Job:
+    """Persist a new job and hand it to the worker pool."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type '{job_type}'")
+
+    job = Job(job_type=job_type, status="queued", params=params, attempts=0)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    job_queue.submit(job.id)
+    return job
+
+
+async def get_job(
+    db: AsyncSession,
+    job_id: int
+) -> Optional[Job]:
+    """Get a job by ID."""
+    result = await db.execute(select(Job).where(Job.id == job_id))
+    return result.scalar_one_or_none()
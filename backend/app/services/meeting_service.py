@@ -1,25 +1,95 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Dict, Any, Optional, AsyncIterator
+from app.core.database import AsyncSessionLocal
 from app.models.meeting import Meeting, ActionItem
-from app.schemas.meeting import MeetingUpload
-from app.ai.llm_client import call_llm
+from app.schemas.meeting import MeetingUpload, MeetingResponse
+from app.ai.llm_client import call_llm, stream_llm
+from app.ai.chunking import split_transcript
+from app.core.config import settings
 from app.utils.file_utils import load_prompt
 from datetime import datetime
+import asyncio
+import json
 
+MEETING_SYSTEM_PROMPT = "You are an expert meeting analyst. Always return valid JSON."
 
-async def create_meeting_from_text(
-    db: AsyncSession,
-    meeting_data: MeetingUpload
-) -> Meeting:
-    """Process meeting text through LLM and create meeting record."""
-    prompt_template = load_prompt("meeting_prompt")
-    prompt = prompt_template.format(meeting_text=meeting_data.raw_text)
+
+def _start_chunk_analysis(chunks: List[str], max_concurrency: Optional[int]) -> List[asyncio.Task]:
+    """Start the map step: one LLM task per chunk, at most `max_concurrency` running at once."""
+    chunk_template = load_prompt("meeting_chunk_prompt")
+    semaphore = asyncio.Semaphore(max_concurrency or settings.meeting_map_concurrency)
     
-    system_prompt = "You are an expert meeting analyst. Always return valid JSON."
+    async def analyze_chunk(part: int, chunk: str) -> Dict[str, Any]:
+        prompt = chunk_template.format(part=part, total_parts=len(chunks), meeting_text=chunk)
+        async with semaphore:
+            return await call_llm(prompt, system_prompt=MEETING_SYSTEM_PROMPT)
     
-    llm_response = await call_llm(prompt, system_prompt=system_prompt)
+    return [
+        asyncio.create_task(analyze_chunk(part, chunk))
+        for part, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def _build_reduce_prompt(partials: List[Dict[str, Any]]) -> tuple:
+    """Return the reduce prompt and the normalized partial results it was built from."""
+    partial_results = [
+        {
+            "part": part,
+            "summary": partial.get("summary"),
+            "decisions": partial.get("decisions"),
+            "open_questions": partial.get("open_questions"),
+            "action_items": partial.get("action_items", []),
+        }
+        for part, partial in enumerate(partials, start=1)
+    ]
+    prompt = load_prompt("meeting_reduce_prompt").format(
+        partial_results=json.dumps(partial_results, indent=2)
+    )
+    return prompt, partial_results
+
+
+def _complete_merge(merged: Dict[str, Any], partial_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Keep the extracted action items if the merge step dropped them
+    if not isinstance(merged.get("action_items"), list):
+        merged["action_items"] = [item for partial in partial_results for item in partial["action_items"]]
+    return merged
+
+
+async def summarize_meeting_text(
+    raw_text: str,
+    chunk_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Extract summary, decisions, open questions and action items from a transcript.
+    Transcripts that fit in `chunk_tokens` take one LLM call; longer ones are split
+    on paragraph and speaker boundaries, the chunks are analyzed concurrently
+    (at most `max_concurrency` at a time) and the partial results merged in one reduce call.
+    """
+    chunks = split_transcript(raw_text, chunk_tokens or settings.meeting_chunk_tokens)
+    if len(chunks) == 1:
+        prompt = load_prompt("meeting_prompt").format(meeting_text=raw_text)
+        return await call_llm(prompt, system_prompt=MEETING_SYSTEM_PROMPT)
+    
+    tasks = _start_chunk_analysis(chunks, max_concurrency)
+    try:
+        partials = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
     
+    reduce_prompt, partial_results = _build_reduce_prompt(partials)
+    merged = await call_llm(reduce_prompt, system_prompt=MEETING_SYSTEM_PROMPT)
+    return _complete_merge(merged, partial_results)
+
+
+async def save_meeting_analysis(
+    db: AsyncSession,
+    meeting_data: MeetingUpload,
+    llm_response: Dict[str, Any]
+) -> Meeting:
+    """Create the meeting record and its action items from an LLM analysis."""
     meeting = Meeting(
         project_id=meeting_data.project_id,
         title=meeting_data.title,
@@ -56,6 +126,53 @@ async def create_meeting_from_text(
     return meeting
 
 
+async def create_meeting_from_text(
+    db: AsyncSession,
+    meeting_data: MeetingUpload
+) -> Meeting:
+    """Process meeting text through LLM and create meeting record."""
+    llm_response = await summarize_meeting_text(meeting_data.raw_text)
+    return await save_meeting_analysis(db, meeting_data, llm_response)
+
+
+async def stream_meeting_from_text(
+    meeting_data: MeetingUpload
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of create_meeting_from_text.
+    Yields "progress" events for the chunk analyses of long transcripts, stream_llm
+    events for the final (or only) call, and a "done" event with the saved meeting.
+    The meeting is saved in its own session once the stream completes.
+    """
+    chunks = split_transcript(meeting_data.raw_text, settings.meeting_chunk_tokens)
+    partial_results = None
+    if len(chunks) == 1:
+        prompt = load_prompt("meeting_prompt").format(meeting_text=meeting_data.raw_text)
+    else:
+        tasks = _start_chunk_analysis(chunks, None)
+        try:
+            for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+                await task
+                yield {"event": "progress", "completed": completed, "total": len(chunks)}
+        finally:
+            for task in tasks:
+                task.cancel()
+        prompt, partial_results = _build_reduce_prompt([task.result() for task in tasks])
+    
+    llm_response = None
+    async for event in stream_llm(prompt, system_prompt=MEETING_SYSTEM_PROMPT):
+        if event["event"] == "result":
+            llm_response = event["value"]
+        else:
+            yield event
+    if partial_results is not None:
+        llm_response = _complete_merge(llm_response, partial_results)
+    
+    async with AsyncSessionLocal() as db:
+        meeting = await save_meeting_analysis(db, meeting_data, llm_response)
+        yield {"event": "done", "record": MeetingResponse.model_validate(meeting).model_dump(mode="json")}
+
+
 async def get_meetings_by_project(
     db: AsyncSession,
     project_id: int
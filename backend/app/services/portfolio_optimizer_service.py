@@ -0,0 +1,394 @@
+"""
+Portfolio Allocation Optimizer Service
+Assigns resources to the skill requirements of many projects at once, under capacity
+and date constraints, with a time-bounded assignment solver.
+"""
+
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from app.models.resource import Allocation
+from app.models.resource_skill import ResourceSkill
+from app.models.project_requirement import ProjectRequirement
+from app.models.project import Project
+from app.schemas.resource import (
+    PortfolioOptimizationRequest,
+    PortfolioAssignment,
+    PortfolioOptimizationResponse
+)
+from app.services.allocation_optimizer_service import (
+    load_resource_totals,
+    build_proficiency_matrix,
+    score_skill_matrix
+)
+
+# Best candidates per requirement considered by the greedy pass.
+GREEDY_CANDIDATES_PER_REQUIREMENT = 25
+
+# Allocations compared against project windows per vectorized block.
+DATE_CHECK_BLOCK_SIZE = 4096
+
+# Upper bounds on one Hungarian round (its cost grows with slots^2 x resources):
+# the most valuable open slots, and each slot's best candidates when there are too many resources.
+HUNGARIAN_ROUND_SLOTS = 256
+HUNGARIAN_ROUND_RESOURCES = 2048
+HUNGARIAN_CANDIDATES_PER_SLOT = HUNGARIAN_ROUND_RESOURCES // HUNGARIAN_ROUND_SLOTS
+
+
+class PortfolioProblem:
+    """
+    Dense arrays describing one portfolio planning run.
+    Each project requirement is a slot that needs `required_hours` of one skill.
+    """
+
+    def __init__(self, projects, requirements, resources, skill_scores, date_ok, project_overlap):
+        self.projects = projects
+        self.requirements = requirements
+        self.resources = resources
+        self.project_index = {project.id: i for i, project in enumerate(projects)}
+        self.slot_project = np.array(
+            [self.project_index[req.project_id] for req in requirements], dtype=np.int64
+        )
+        self.slot_hours = np.array([float(req.required_hours) for req in requirements], dtype=np.float64)
+        self.capacity = np.array([float(r.capacity_hours) for r in resources], dtype=np.float64)
+        self.available = np.array(
+            [float(r.capacity_hours - r.total_allocated) for r in resources], dtype=np.float64
+        )
+        self.priority = np.array([(project.priority or 5) / 10 for project in projects], dtype=np.float64)
+        self.skill_scores = skill_scores  # slots x resources, per-requirement skill score 0-100
+        self.date_ok = date_ok  # projects x resources, no overlap with existing allocations
+        self.project_overlap = project_overlap  # projects x projects, date windows overlap
+
+
+class PortfolioPlan:
+    """Mutable assignment state: remaining hours per slot and resource, plus date blocks."""
+
+    def __init__(self, problem: PortfolioProblem):
+        self.slot_remaining = problem.slot_hours.copy()
+        self.resource_remaining = problem.available.copy()
+        self.blocked = np.zeros_like(problem.date_ok)
+        self.assignments: List[Tuple[int, int, float, float]] = []  # slot, resource, hours, match
+        self.objective = 0.0
+
+    def assign(self, problem: PortfolioProblem, slot: int, resource: int, match: float) -> None:
+        hours = min(self.slot_remaining[slot], self.resource_remaining[resource])
+        project = problem.slot_project[slot]
+        self.slot_remaining[slot] -= hours
+        self.resource_remaining[resource] -= hours
+        # The resource may not also join a project whose dates overlap this one
+        self.blocked[:, resource] |= problem.project_overlap[project]
+        self.assignments.append((slot, resource, hours, match))
+        self.objective += match * problem.priority[project] * hours
+
+
+def _feasible_pairs(problem: PortfolioProblem, plan: PortfolioPlan) -> np.ndarray:
+    """Slots x resources mask of assignments allowed by skills, capacity and dates."""
+    date_allowed = problem.date_ok & ~plan.blocked
+    return (
+        (plan.slot_remaining > 0)[:, None]
+        & (plan.resource_remaining > 0)[None, :]
+        & (problem.skill_scores > 0)
+        & date_allowed[problem.slot_project]
+    )
+
+
+def _match_scores(
+    problem: PortfolioProblem,
+    plan: PortfolioPlan,
+    request: PortfolioOptimizationRequest
+) -> np.ndarray:
+    """Weighted skill/availability match score (0-100) for every slot x resource pair."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        availability = np.where(
+            problem.capacity > 0,
+            np.minimum(100, plan.resource_remaining / problem.capacity * 100),
+            0.0
+        )
+    return (problem.skill_scores * request.skill_weight) + (availability[None, :] * request.availability_weight)
+
+
+def _pair_values(
+    problem: PortfolioProblem,
+    plan: PortfolioPlan,
+    match: np.ndarray,
+    feasible: np.ndarray
+) -> np.ndarray:
+    """Objective contribution of each pair: match x project priority x assignable hours."""
+    hours = np.minimum(plan.slot_remaining[:, None], plan.resource_remaining[None, :])
+    values = match * problem.priority[problem.slot_project][:, None] * hours
+    return np.where(feasible, values, 0.0)
+
+
+def greedy_fill(
+    problem: PortfolioProblem,
+    plan: PortfolioPlan,
+    request: PortfolioOptimizationRequest,
+    deadline: Optional[float] = None
+) -> bool:
+    """
+    Fill remaining slots greedily from the best-valued candidate pairs.
+    Each pass keeps the top candidates per slot; passes repeat until nothing more fits
+    or, after the first pass, the deadline has passed. Returns whether the deadline stopped it.
+    """
+    passes = 0
+    while True:
+        if passes and deadline is not None and time.monotonic() >= deadline:
+            return True
+        passes += 1
+        feasible = _feasible_pairs(problem, plan)
+        if not feasible.any():
+            return False
+
+        match = _match_scores(problem, plan, request)
+        values = _pair_values(problem, plan, match, feasible)
+
+        top_k = min(GREEDY_CANDIDATES_PER_REQUIREMENT, values.shape[1])
+        candidate_cols = np.argpartition(-values, top_k - 1, axis=1)[:, :top_k]
+        candidate_rows = np.repeat(np.arange(values.shape[0]), top_k)
+        candidate_cols = candidate_cols.ravel()
+        keep = feasible[candidate_rows, candidate_cols]
+        candidate_rows, candidate_cols = candidate_rows[keep], candidate_cols[keep]
+        order = np.argsort(-values[candidate_rows, candidate_cols], kind="stable")
+
+        assigned = 0
+        for slot, resource in zip(candidate_rows[order].tolist(), candidate_cols[order].tolist()):
+            project = problem.slot_project[slot]
+            if plan.slot_remaining[slot] <= 0 or plan.resource_remaining[resource] <= 0:
+                continue
+            if plan.blocked[project, resource]:
+                continue
+            plan.assign(problem, slot, resource, float(match[slot, resource]))
+            assigned += 1
+
+        if not assigned:
+            return False
+
+
+def hungarian_rounds(
+    problem: PortfolioProblem,
+    plan: PortfolioPlan,
+    request: PortfolioOptimizationRequest,
+    deadline: float
+) -> Tuple[bool, int]:
+    """
+    Solve successive maximum-value assignment rounds (Hungarian method) on the residual problem.
+    Every round gives each open slot at most one resource and each resource at most one slot;
+    capacity, date blocks and availability scores are refreshed between rounds.
+    A round covers at most HUNGARIAN_ROUND_SLOTS slots and HUNGARIAN_ROUND_RESOURCES resources,
+    and is not started if the previous one would not fit in the time left.
+    Returns whether the deadline stopped the rounds early and the number of rounds run.
+    """
+    rounds = 0
+    last_round_seconds = 0.0
+    while True:
+        feasible = _feasible_pairs(problem, plan)
+        rows = np.flatnonzero(feasible.any(axis=1))
+        if rows.size == 0:
+            return False, rounds
+        round_started = time.monotonic()
+        if round_started + last_round_seconds >= deadline:
+            return True, rounds
+
+        match = _match_scores(problem, plan, request)
+        pair_values = _pair_values(problem, plan, match, feasible)
+        if rows.size > HUNGARIAN_ROUND_SLOTS:
+            best = pair_values[rows].max(axis=1)
+            rows = rows[np.argsort(-best, kind="stable")[:HUNGARIAN_ROUND_SLOTS]]
+        cols = np.flatnonzero(feasible[rows].any(axis=0))
+        if cols.size > HUNGARIAN_ROUND_RESOURCES:
+            top_k = min(HUNGARIAN_CANDIDATES_PER_SLOT, pair_values.shape[1])
+            candidates = np.argpartition(-pair_values[rows], top_k - 1, axis=1)[:, :top_k]
+            cols = np.unique(candidates[feasible[rows[:, None], candidates]])
+        sub_feasible = feasible[np.ix_(rows, cols)]
+        values = np.where(sub_feasible, pair_values[np.ix_(rows, cols)], -1.0)
+
+        assigned = 0
+        assigned_rows, assigned_cols = linear_sum_assignment(values, maximize=True)
+        for i, j in zip(assigned_rows.tolist(), assigned_cols.tolist()):
+            if not sub_feasible[i, j]:
+                continue
+            slot, resource = int(rows[i]), int(cols[j])
+            if plan.blocked[problem.slot_project[slot], resource]:
+                continue
+            plan.assign(problem, slot, resource, float(match[slot, resource]))
+            assigned += 1
+        rounds += 1
+        last_round_seconds = time.monotonic() - round_started
+
+        if not assigned:
+            return False, rounds
+
+
+def _date_window(project: Project) -> Optional[Tuple[float, float]]:
+    """Return a project's (start, deadline) as timestamps, or None when it is open-ended."""
+    if project.start_date is None or project.deadline is None:
+        return None
+    return project.start_date.timestamp(), project.deadline.timestamp()
+
+
+async def load_portfolio_problem(
+    db: AsyncSession,
+    project_ids: Optional[List[int]] = None
+) -> PortfolioProblem:
+    """Load projects, requirements, resources, skills and dated allocations into dense arrays."""
+    project_query = select(Project).order_by(Project.id)
+    if project_ids:
+        project_query = project_query.where(Project.id.in_(project_ids))
+    else:
+        project_query = project_query.where(Project.status == "active")
+    projects = list((await db.execute(project_query)).scalars().all())
+
+    requirements = []
+    if projects:
+        requirements_result = await db.execute(
+            select(ProjectRequirement)
+            .where(ProjectRequirement.project_id.in_([project.id for project in projects]))
+            .order_by(ProjectRequirement.id)
+        )
+        requirements = list(requirements_result.scalars().all())
+
+    resources = await load_resource_totals(db) if requirements else []
+    resource_index = {resource.id: i for i, resource in enumerate(resources)}
+
+    # Skill score of every resource against every requirement
+    skill_names = list(dict.fromkeys(req.skill_name for req in requirements))
+    skill_rows = []
+    if skill_names and resources:
+        skills_result = await db.execute(
+            select(ResourceSkill.resource_id, ResourceSkill.skill_name, ResourceSkill.proficiency_level)
+            .where(ResourceSkill.skill_name.in_(skill_names))
+            .order_by(ResourceSkill.id)
+        )
+        skill_rows = skills_result.all()
+    proficiency = build_proficiency_matrix([r.id for r in resources], skill_names, skill_rows)
+    skill_columns = [skill_names.index(req.skill_name) for req in requirements]
+    required = np.array([req.required_proficiency for req in requirements], dtype=np.int64)
+    skill_scores = score_skill_matrix(proficiency[:, skill_columns], required).T
+
+    # Project date windows; open-ended projects never conflict
+    windows = [_date_window(project) for project in projects]
+    has_window = np.array([window is not None for window in windows], dtype=bool)
+    window_start = np.array([window[0] if window else 0.0 for window in windows], dtype=np.float64)
+    window_end = np.array([window[1] if window else 0.0 for window in windows], dtype=np.float64)
+
+    project_overlap = (
+        (window_start[:, None] <= window_end[None, :])
+        & (window_start[None, :] <= window_end[:, None])
+        & has_window[:, None]
+        & has_window[None, :]
+    )
+    np.fill_diagonal(project_overlap, False)
+
+    # Existing dated allocations that overlap a project window rule the resource out
+    date_ok = np.ones((len(projects), len(resources)), dtype=bool)
+    if resources and has_window.any():
+        allocations_result = await db.execute(
+            select(Allocation.resource_id, Allocation.start_date, Allocation.end_date)
+            .where(and_(Allocation.start_date.isnot(None), Allocation.end_date.isnot(None)))
+        )
+        allocations = allocations_result.all()
+        alloc_resource = np.array([resource_index[a.resource_id] for a in allocations], dtype=np.int64)
+        alloc_start = np.array([a.start_date.timestamp() for a in allocations], dtype=np.float64)
+        alloc_end = np.array([a.end_date.timestamp() for a in allocations], dtype=np.float64)
+
+        conflicts = np.zeros((len(resources), len(projects)), dtype=bool)
+        for offset in range(0, len(allocations), DATE_CHECK_BLOCK_SIZE):
+            block = slice(offset, offset + DATE_CHECK_BLOCK_SIZE)
+            overlaps = (
+                (alloc_start[block, None] <= window_end[None, :])
+                & (window_start[None, :] <= alloc_end[block, None])
+                & has_window[None, :]
+            )
+            np.logical_or.at(conflicts, alloc_resource[block], overlaps)
+        date_ok = ~conflicts.T
+
+    return PortfolioProblem(projects, requirements, resources, skill_scores, date_ok, project_overlap)
+
+
+def _build_response(
+    problem: PortfolioProblem,
+    plan: PortfolioPlan,
+    solver: str,
+    rounds: int,
+    timed_out: bool,
+    started: float
+) -> PortfolioOptimizationResponse:
+    """Convert a plan into the API response."""
+    assignments = []
+    for slot, resource_idx, hours, match in plan.assignments:
+        requirement = problem.requirements[slot]
+        project = problem.projects[problem.slot_project[slot]]
+        resource = problem.resources[resource_idx]
+        assignments.append(PortfolioAssignment(
+            resource_id=resource.id,
+            resource_name=resource.name,
+            project_id=project.id,
+            project_name=project.name,
+            skill_name=requirement.skill_name,
+            allocated_hours=round(float(hours), 2),
+            match_score=round(match, 2)
+        ))
+
+    unfilled_requirements = []
+    for slot in np.flatnonzero(plan.slot_remaining > 0).tolist():
+        requirement = problem.requirements[slot]
+        project = problem.projects[problem.slot_project[slot]]
+        unfilled_requirements.append({
+            "requirement_id": requirement.id,
+            "project_id": project.id,
+            "project_name": project.name,
+            "skill_name": requirement.skill_name,
+            "required_hours": float(requirement.required_hours),
+            "unfilled_hours": round(float(plan.slot_remaining[slot]), 2),
+        })
+
+    return PortfolioOptimizationResponse(
+        assignments=assignments,
+        unfilled_requirements=unfilled_requirements,
+        objective=round(plan.objective, 2),
+        solver=solver,
+        rounds_completed=rounds,
+        timed_out=timed_out,
+        elapsed_ms=round((time.monotonic() - started) * 1000, 2)
+    )
+
+
+async def optimize_portfolio_allocation(
+    db: AsyncSession,
+    request: PortfolioOptimizationRequest
+) -> PortfolioOptimizationResponse:
+    """
+    Assign resources to the requirements of all active projects (or `request.project_ids`) at once.
+
+    Constraints:
+    - A resource is never booked beyond its remaining capacity
+    - A resource is not assigned to a project whose dates overlap one of its existing
+      dated allocations, nor to two planned projects with overlapping dates
+
+    A greedy solution is built first, then Hungarian assignment rounds build a second plan
+    until it is complete or the time budget runs out. Whatever the rounds leave open is filled
+    greedily unless the budget is already spent, and the plan with the higher objective is
+    returned. Greedy passes after the first and Hungarian rounds stop at the deadline, and
+    rounds are size-capped, so the budget is overrun by at most about one pass or round.
+    """
+    started = time.monotonic()
+    deadline = started + request.time_budget_seconds
+
+    problem = await load_portfolio_problem(db, request.project_ids)
+
+    greedy_plan = PortfolioPlan(problem)
+    timed_out = greedy_fill(problem, greedy_plan, request, deadline)
+
+    hungarian_plan = PortfolioPlan(problem)
+    rounds = 0
+    if not timed_out:
+        timed_out, rounds = hungarian_rounds(problem, hungarian_plan, request, deadline)
+    if not timed_out:
+        timed_out = greedy_fill(problem, hungarian_plan, request, deadline)
+
+    if hungarian_plan.objective > greedy_plan.objective:
+        return _build_response(problem, hungarian_plan, "hungarian", rounds, timed_out, started)
+    return _build_response(problem, greedy_plan, "greedy", rounds, timed_out, started)
@@ -0,0 +1,295 @@
+"""
+Bulk import of resources, resource skills and allocations.
+Rows are validated as they stream in and written in chunks: one multi-row INSERT
+and one commit per chunk instead of a round trip per row. Allocation capacity
+is checked in memory against the resources' allocated-hours counters, read
+with one locking query per chunk, so a chunk never needs a query per row.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.project import Project
+from app.models.resource import Resource, Allocation
+from app.models.resource_skill import ResourceSkill
+from app.schemas.resource import ResourceCreate, ResourceSkillImport, AllocationCreate
+from app.utils.record_stream import Record
+
+IMPORT_SCHEMAS = {
+    "resources": ResourceCreate,
+    "skills": ResourceSkillImport,
+    "allocations": AllocationCreate,
+}
+
+ValidRow = Tuple[int, BaseModel]
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    dry_run: bool
+    max_errors: int
+    total_rows: int = 0
+    accepted: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def fail(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": error})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "dry_run": self.dry_run,
+            "total_rows": self.total_rows,
+            "accepted": self.accepted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+@dataclass
+class ImportState:
+    """Lookups shared across chunks; existence checks query each id once."""
+    projects: Set[int] = field(default_factory=set)
+    missing_projects: Set[int] = field(default_factory=set)
+    resources: Set[int] = field(default_factory=set)
+    missing_resources: Set[int] = field(default_factory=set)
+    # resource_id -> [capacity_hours, allocated_hours]
+    capacity: Dict[int, List[Decimal]] = field(default_factory=dict)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _parse_skills(value: str) -> List[Dict[str, Any]]:
+    """CSV skills cell: "Python:4;SQL:3"."""
+    skills = []
+    for entry in filter(None, (part.strip() for part in value.split(";"))):
+        name, _, level = entry.rpartition(":")
+        if not name or not level.strip().isdigit():
+            raise ValueError(f"skills: expected 'name:level' entries separated by ';', got '{entry}'")
+        skills.append({"skill_name": name.strip(), "proficiency_level": int(level)})
+    return skills
+
+
+def _validate_row(kind: str, data: Dict[str, Any]) -> BaseModel:
+    if kind == "resources" and isinstance(data.get("skills"), str):
+        data = {**data, "skills": _parse_skills(data["skills"])}
+    return IMPORT_SCHEMAS[kind].model_validate(data)
+
+
+async def _load_projects(db: AsyncSession, state: ImportState, project_ids: Set[int]) -> None:
+    unknown = project_ids - state.projects - state.missing_projects
+    if not unknown:
+        return
+    result = await db.execute(select(Project.id).where(Project.id.in_(unknown)))
+    found = set(result.scalars().all())
+    state.projects |= found
+    state.missing_projects |= unknown - found
+
+
+async def _load_resources(db: AsyncSession, state: ImportState, resource_ids: Set[int]) -> None:
+    unknown = resource_ids - state.resources - state.missing_resources
+    if not unknown:
+        return
+    result = await db.execute(select(Resource.id).where(Resource.id.in_(unknown)))
+    found = set(result.scalars().all())
+    state.resources |= found
+    state.missing_resources |= unknown - found
+
+
+async def _load_capacity(db: AsyncSession, state: ImportState, resource_ids: Set[int], lock: bool) -> None:
+    """
+    Capacity and allocated-hours counters for resources not loaded yet. With `lock`,
+    the rows are locked (in id order) until the chunk commits.
+    """
+    unknown = resource_ids - set(state.capacity) - state.missing_resources
+    if not unknown:
+        return
+    query = (
+        select(Resource.id, Resource.capacity_hours, Resource.allocated_hours)
+        .where(Resource.id.in_(unknown))
+        .order_by(Resource.id)
+    )
+    if lock:
+        query = query.with_for_update()
+    result = await db.execute(query)
+    for resource_id, capacity_hours, allocated_hours in result.all():
+        state.capacity[resource_id] = [Decimal(capacity_hours), Decimal(allocated_hours)]
+    state.resources |= set(state.capacity) & unknown
+    state.missing_resources |= unknown - set(state.capacity)
+
+
+async def _check_resources(
+    db: AsyncSession, state: ImportState, rows: List[ValidRow], report: ImportReport
+) -> List[ValidRow]:
+    await _load_projects(db, state, {item.project_id for _, item in rows if item.project_id is not None})
+    accepted = []
+    for row, item in rows:
+        if item.project_id is not None and item.project_id in state.missing_projects:
+            report.fail(row, f"Project {item.project_id} not found")
+        else:
+            accepted.append((row, item))
+    return accepted
+
+
+async def _check_skills(
+    db: AsyncSession, state: ImportState, rows: List[ValidRow], report: ImportReport
+) -> List[ValidRow]:
+    await _load_resources(db, state, {item.resource_id for _, item in rows})
+    accepted = []
+    for row, item in rows:
+        if item.resource_id in state.missing_resources:
+            report.fail(row, f"Resource {item.resource_id} not found")
+        else:
+            accepted.append((row, item))
+    return accepted
+
+
+async def _check_allocations(
+    db: AsyncSession, state: ImportState, rows: List[ValidRow], report: ImportReport
+) -> List[ValidRow]:
+    """
+    Same rules as allocate_resource, checked against the in-memory totals. When
+    writing, counters are re-read under lock for every chunk; a dry run keeps its
+    running totals across chunks instead, since nothing is written.
+    """
+    if not report.dry_run:
+        state.capacity.clear()
+    await _load_capacity(db, state, {item.resource_id for _, item in rows}, lock=not report.dry_run)
+    await _load_projects(db, state, {item.project_id for _, item in rows})
+    accepted = []
+    for row, item in rows:
+        if item.resource_id in state.missing_resources:
+            report.fail(row, f"Resource {item.resource_id} not found")
+            continue
+        if item.project_id in state.missing_projects:
+            report.fail(row, f"Project {item.project_id} not found")
+            continue
+        if item.start_date and item.end_date and item.end_date < item.start_date:
+            report.fail(row, "end_date is before start_date")
+            continue
+        totals = state.capacity[item.resource_id]
+        new_total = totals[1] + item.allocated_hours
+        if new_total > totals[0]:
+            report.fail(
+                row,
+                f"Allocation exceeds capacity. "
+                f"Current: {totals[1]}, Requested: {item.allocated_hours}, "
+                f"Capacity: {totals[0]}"
+            )
+            continue
+        totals[1] = new_total
+        accepted.append((row, item))
+    return accepted
+
+
+async def _write_chunk(db: AsyncSession, kind: str, rows: List[ValidRow], state: ImportState) -> None:
+    if kind == "resources":
+        resource_ids = (await db.execute(
+            insert(Resource).returning(Resource.id, sort_by_parameter_order=True),
+            [item.model_dump(exclude={"skills"}) for _, item in rows],
+        )).scalars().all()
+        skill_rows = [
+            {"resource_id": resource_id, **skill.model_dump()}
+            for resource_id, (_, item) in zip(resource_ids, rows)
+            for skill in item.skills or []
+        ]
+        if skill_rows:
+            await db.execute(insert(ResourceSkill), skill_rows)
+    elif kind == "skills":
+        await db.execute(insert(ResourceSkill), [item.model_dump() for _, item in rows])
+    else:
+        await db.execute(insert(Allocation), [item.model_dump() for _, item in rows])
+        # The resources are locked, so the new totals can be written as absolute values
+        resource_ids = {item.resource_id for _, item in rows}
+        await db.execute(
+            update(Resource),
+            [{"id": resource_id, "allocated_hours": state.capacity[resource_id][1]} for resource_id in resource_ids],
+        )
+    await db.commit()
+
+
+CHUNK_CHECKS = {
+    "resources": _check_resources,
+    "skills": _check_skills,
+    "allocations": _check_allocations,
+}
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    kind: str,
+    rows: List[ValidRow],
+    state: ImportState,
+    report: ImportReport
+) -> None:
+    accepted = await CHUNK_CHECKS[kind](db, state, rows, report)
+    if report.dry_run or not accepted:
+        # Nothing to write; end the transaction so any row locks are released
+        await db.rollback()
+        report.accepted += len(accepted)
+        return
+
+    try:
+        await _write_chunk(db, kind, accepted, state)
+        report.accepted += len(accepted)
+    except Exception as e:
+        # Only this chunk is lost; earlier chunks are already committed
+        await db.rollback()
+        print(f"Bulk import chunk failed: {str(e)}")
+        for row, _ in accepted:
+            report.fail(row, f"Chunk write failed: {str(e)}")
+
+
+async def bulk_import(
+    db: AsyncSession,
+    kind: str,
+    records: AsyncIterator[Record],
+    dry_run: bool = False,
+    chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Validate and insert `records` (from app.utils.record_stream) as `kind` rows.
+    Every chunk of valid rows is committed on its own; invalid rows are reported
+    with their row number and never block the rest of the import.
+    """
+    if kind not in IMPORT_SCHEMAS:
+        raise ValueError(f"Unsupported kind '{kind}'. Use one of: {', '.join(IMPORT_SCHEMAS)}")
+    chunk_size = chunk_size or settings.bulk_import_chunk_size
+    report = ImportReport(kind=kind, dry_run=dry_run, max_errors=settings.bulk_import_max_errors)
+    state = ImportState()
+
+    batch: List[ValidRow] = []
+    async for row, data, error in records:
+        report.total_rows += 1
+        if error:
+            report.fail(row, error)
+            continue
+        try:
+            batch.append((row, _validate_row(kind, data)))
+        except ValidationError as e:
+            report.fail(row, _validation_message(e))
+            continue
+        except ValueError as e:
+            report.fail(row, str(e))
+            continue
+        if len(batch) >= chunk_size:
+            await _import_chunk(db, kind, batch, state, report)
+            batch = []
+    if batch:
+        await _import_chunk(db, kind, batch, state, report)
+
+    return report.to_dict()
@@ -1,8 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, insert, delete
 from sqlalchemy.orm import selectinload
-from typing import List
-from decimal import Decimal
+from typing import List, Optional
 from app.models.resource import Resource, Allocation
 from app.models.resource_skill import ResourceSkill
 from app.schemas.resource import ResourceCreate, AllocationCreate
@@ -54,45 +53,101 @@ async def allocate_resource(
     db: AsyncSession,
     allocation_data: AllocationCreate
 ) -> Allocation:
-    """Allocate a resource to a project with rule-based logic."""
-    resource_result = await db.execute(
-        select(Resource).where(Resource.id == allocation_data.resource_id)
+    """
+    Allocate a resource to a project if it stays within capacity.
+    The capacity check and the allocated-hours counter increment are a single
+    conditional UPDATE, which row-locks the resource until commit, so concurrent
+    allocations cannot over-commit it.
+    """
+    hours = allocation_data.allocated_hours
+    reserved = await db.execute(
+        update(Resource)
+        .where(Resource.id == allocation_data.resource_id)
+        .where(Resource.allocated_hours + hours <= Resource.capacity_hours)
+        .values(allocated_hours=Resource.allocated_hours + hours)
+        .returning(Resource.id)
+        .execution_options(synchronize_session=False)
     )
-    resource = resource_result.scalar_one_or_none()
     
-    if not resource:
-        raise ValueError(f"Resource {allocation_data.resource_id} not found")
-    
-    existing_allocations_result = await db.execute(
-        select(func.sum(Allocation.allocated_hours))
-        .where(Allocation.resource_id == allocation_data.resource_id)
-    )
-    total_allocated = existing_allocations_result.scalar() or Decimal("0")
-    
-    new_total = total_allocated + allocation_data.allocated_hours
-    
-    if new_total > resource.capacity_hours:
+    if reserved.scalar_one_or_none() is None:
+        await db.rollback()
+        resource_result = await db.execute(
+            select(Resource.capacity_hours, Resource.allocated_hours)
+            .where(Resource.id == allocation_data.resource_id)
+        )
+        resource = resource_result.one_or_none()
+        if not resource:
+            raise ValueError(f"Resource {allocation_data.resource_id} not found")
         raise ValueError(
             f"Allocation exceeds capacity. "
-            f"Current: {total_allocated}, Requested: {allocation_data.allocated_hours}, "
+            f"Current: {resource.allocated_hours}, Requested: {hours}, "
             f"Capacity: {resource.capacity_hours}"
         )
     
-    allocation = Allocation(
-        resource_id=allocation_data.resource_id,
-        project_id=allocation_data.project_id,
-        allocated_hours=allocation_data.allocated_hours,
-        start_date=allocation_data.start_date,
-        end_date=allocation_data.end_date,
+    result = await db.execute(
+        insert(Allocation)
+        .values(
+            resource_id=allocation_data.resource_id,
+            project_id=allocation_data.project_id,
+            allocated_hours=hours,
+            start_date=allocation_data.start_date,
+            end_date=allocation_data.end_date,
+        )
+        .returning(Allocation)
     )
-    
-    db.add(allocation)
+    allocation = result.scalar_one()
     await db.commit()
-    await db.refresh(allocation)
     
     return allocation
 
 
+async def release_project_allocations(
+    db: AsyncSession,
+    project_id: int
+) -> None:
+    """
+    Delete a project's allocations and give their hours back to the resources'
+    allocated-hours counters. Call before deleting the project; does not commit.
+    """
+    released = (
+        select(func.coalesce(func.sum(Allocation.allocated_hours), 0))
+        .where(Allocation.resource_id == Resource.id)
+        .where(Allocation.project_id == project_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Resource)
+        .where(Resource.id.in_(select(Allocation.resource_id).where(Allocation.project_id == project_id)))
+        .values(allocated_hours=Resource.allocated_hours - released)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(Allocation)
+        .where(Allocation.project_id == project_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def refresh_allocated_hours(
+    db: AsyncSession,
+    resource_ids: Optional[List[int]] = None
+) -> None:
+    """
+    Recompute the allocated-hours counters from the allocations table (all
+    resources, or just `resource_ids`). Flushes but does not commit.
+    """
+    total = (
+        select(func.coalesce(func.sum(Allocation.allocated_hours), 0))
+        .where(Allocation.resource_id == Resource.id)
+        .scalar_subquery()
+    )
+    statement = update(Resource).values(allocated_hours=total)
+    if resource_ids is not None:
+        statement = statement.where(Resource.id.in_(resource_ids))
+    await db.execute(statement.execution_options(synchronize_session=False))
+    await db.flush()
+
+
 async def get_resources_by_project(
     db: AsyncSession,
     project_id: int
@@ -1,9 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, func, and_, case
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 from app.models.risk import Risk
 from app.models.risk_metric import RiskMetric
+from app.models.risk_aggregate import RiskAggregate
 from app.schemas.risk import RiskAnalyticsResponse
 
 
@@ -32,96 +36,289 @@ async def record_risk_metric(
     await db.flush()
 
 
-async def calculate_trend(
+TREND_CHANGE_PERCENT = 10
+
+
+def classify_trend(first_score: float, last_score: float, slope: float) -> str:
+    """
+    Classify a score history: the first-to-last change must exceed
+    TREND_CHANGE_PERCENT and the least-squares slope must point the same way.
+    """
+    diff_percent = ((last_score - first_score) / first_score * 100) if first_score > 0 else 0
+    
+    if diff_percent > TREND_CHANGE_PERCENT and slope > 0:
+        return "increasing"
+    elif diff_percent < -TREND_CHANGE_PERCENT and slope < 0:
+        return "decreasing"
+    else:
+        return "stable"
+
+
+async def compute_risk_trends(
     db: AsyncSession,
-    risk_id: int,
+    project_id: Optional[int] = None,
+    risk_ids: Optional[List[int]] = None,
     days: int = 30
-) -> str:
-    """Calculate risk trend based on historical metrics."""
+) -> Dict[int, Dict]:
+    """
+    Compute trends for many risks in one windowed query over their metric history.
+    Per risk: sample count, first and last score in the window, and the
+    least-squares slope of score against snapshot sequence (1..n).
+    Risks with fewer than two snapshots in the window are omitted.
+    """
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
+    sequence = func.row_number().over(
+        partition_by=RiskMetric.risk_id,
+        order_by=(RiskMetric.recorded_at, RiskMetric.id)
+    ).label("seq")
+    samples = func.count().over(partition_by=RiskMetric.risk_id).label("samples")
+    windowed = (
+        select(RiskMetric.risk_id, RiskMetric.risk_score.label("score"), sequence, samples)
+        .where(RiskMetric.recorded_at >= cutoff_date)
+    )
+    if project_id is not None:
+        windowed = windowed.join(Risk, Risk.id == RiskMetric.risk_id).where(Risk.project_id == project_id)
+    if risk_ids is not None:
+        windowed = windowed.where(RiskMetric.risk_id.in_(risk_ids))
+    windowed = windowed.subquery()
+    
     result = await db.execute(
-        select(RiskMetric)
-        .where(
-            and_(
-                RiskMetric.risk_id == risk_id,
-                RiskMetric.recorded_at >= cutoff_date
-            )
+        select(
+            windowed.c.risk_id,
+            func.max(windowed.c.samples).label("samples"),
+            func.max(case((windowed.c.seq == 1, windowed.c.score))).label("first_score"),
+            func.max(case((windowed.c.seq == windowed.c.samples, windowed.c.score))).label("last_score"),
+            func.sum(windowed.c.score).label("sum_y"),
+            func.sum(windowed.c.seq * windowed.c.score).label("sum_xy"),
         )
-        .order_by(RiskMetric.recorded_at)
+        .where(windowed.c.samples >= 2)
+        .group_by(windowed.c.risk_id)
     )
-    metrics = list(result.scalars().all())
     
-    if len(metrics) < 2:
-        return "stable"
+    trends = {}
+    for row in result.all():
+        n = row.samples
+        # x = 1..n, so sum(x) and the slope denominator have closed forms
+        sum_x = n * (n + 1) / 2
+        denominator = n * n * (n * n - 1) / 12
+        slope = (n * float(row.sum_xy) - sum_x * float(row.sum_y)) / denominator
+        trends[row.risk_id] = {
+            "samples": n,
+            "first_score": row.first_score,
+            "last_score": row.last_score,
+            "slope": round(slope, 4),
+            "trend": classify_trend(row.first_score, row.last_score, slope),
+        }
+    return trends
+
+
+async def calculate_trend(
+    db: AsyncSession,
+    risk_id: int,
+    days: int = 30
+) -> str:
+    """Calculate risk trend based on historical metrics."""
+    trends = await compute_risk_trends(db, risk_ids=[risk_id], days=days)
+    return trends[risk_id]["trend"] if risk_id in trends else "stable"
+
+
+async def refresh_risk_trends(
+    db: AsyncSession,
+    project_id: Optional[int] = None,
+    days: int = 30
+) -> Dict:
+    """
+    Recompute Risk.trend for all risks of a project (or of every project) and
+    write back only the changed values with one bulk UPDATE.
+    """
+    trends = await compute_risk_trends(db, project_id=project_id, days=days)
     
-    # Compare first and last risk scores
-    first_score = metrics[0].risk_score
-    last_score = metrics[-1].risk_score
+    current_query = select(Risk.id, Risk.trend)
+    if project_id is not None:
+        current_query = current_query.where(Risk.project_id == project_id)
+    current = (await db.execute(current_query)).all()
     
-    diff_percent = ((last_score - first_score) / first_score * 100) if first_score > 0 else 0
+    changes = []
+    trend_counts: Dict[str, int] = {}
+    for risk_id, trend in current:
+        new_trend = trends[risk_id]["trend"] if risk_id in trends else "stable"
+        trend_counts[new_trend] = trend_counts.get(new_trend, 0) + 1
+        if new_trend != trend:
+            changes.append({"id": risk_id, "trend": new_trend})
     
-    if diff_percent > 10:
-        return "increasing"
-    elif diff_percent < -10:
-        return "decreasing"
-    else:
-        return "stable"
+    if changes:
+        await db.execute(update(Risk), changes)
+    await db.commit()
+    
+    return {
+        "project_id": project_id,
+        "risks_evaluated": len(current),
+        "risks_updated": len(changes),
+        "trends": trend_counts,
+    }
 
 
-async def get_risk_analytics(
+def risk_snapshot(risk: Risk) -> Dict:
+    """Capture the fields of a risk that feed the materialized aggregates."""
+    return {
+        "category": risk.category,
+        "severity": risk.severity,
+        "status": risk.status,
+        "approval_status": risk.approval_status,
+        "is_escalated": risk.is_escalated,
+        "risk_score": risk.risk_score,
+    }
+
+
+def _apply_snapshot(aggregate: RiskAggregate, snapshot: Dict, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one risk's contribution to an aggregate row."""
+    aggregate.total_risks += sign
+    if snapshot["severity"] == "high":
+        aggregate.high_severity_count += sign
+    if snapshot["is_escalated"]:
+        aggregate.escalated_count += sign
+    if snapshot["approval_status"] == "pending":
+        aggregate.approval_pending += sign
+    aggregate.risk_score_sum += sign * (snapshot["risk_score"] or 0)
+    
+    # Reassign the JSON columns so the change is detected
+    for column, key in (
+        ("risks_by_category", "category"),
+        ("risks_by_severity", "severity"),
+        ("risks_by_status", "status"),
+    ):
+        counts = dict(getattr(aggregate, column) or {})
+        value = snapshot[key]
+        counts[value] = counts.get(value, 0) + sign
+        if counts[value] <= 0:
+            del counts[value]
+        setattr(aggregate, column, counts)
+
+
+async def _lock_aggregate_row(db: AsyncSession, project_id: int) -> RiskAggregate:
+    """
+    Create the project's aggregate row if it is missing and lock it (SELECT ... FOR UPDATE).
+    The INSERT ... ON CONFLICT DO NOTHING means concurrent first writers or readers
+    never both insert; the loser waits for the winner's row instead.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        await db.execute(
+            insert(RiskAggregate)
+            .values(project_id=project_id, risks_by_category={}, risks_by_severity={}, risks_by_status={})
+            .on_conflict_do_nothing(index_elements=[RiskAggregate.project_id])
+        )
+    elif await db.get(RiskAggregate, project_id) is None:
+        try:
+            async with db.begin_nested():
+                db.add(RiskAggregate(project_id=project_id))
+        except IntegrityError:
+            pass
+    return await db.get(RiskAggregate, project_id, with_for_update=True, populate_existing=True)
+
+
+async def refresh_risk_aggregate(
     db: AsyncSession,
     project_id: int
-) -> RiskAnalyticsResponse:
-    """Get comprehensive risk analytics for a project."""
-    result = await db.execute(
-        select(Risk).where(Risk.project_id == project_id)
-    )
-    risks = list(result.scalars().all())
+) -> RiskAggregate:
+    """
+    Rebuild a project's aggregate row from the risks table with one GROUP BY
+    (category, severity, status) rollup. The row is created if needed and locked
+    before the rollup runs, so the rollup sees every committed risk write.
+    Flushes but does not commit.
+    """
+    aggregate = await _lock_aggregate_row(db, project_id)
     
-    if not risks:
-        return RiskAnalyticsResponse(
-            total_risks=0,
-            high_severity_count=0,
-            escalated_count=0,
-            approval_pending=0,
-            average_risk_score=0,
-            risks_by_category={},
-            risks_by_severity={},
-            risks_by_status={},
+    result = await db.execute(
+        select(
+            Risk.category,
+            Risk.severity,
+            Risk.status,
+            func.count(Risk.id),
+            func.sum(case((and_(Risk.is_escalated.isnot(None), Risk.is_escalated != 0), 1), else_=0)),
+            func.sum(case((Risk.approval_status == "pending", 1), else_=0)),
+            func.sum(func.coalesce(Risk.risk_score, 0)),
         )
+        .where(Risk.project_id == project_id)
+        .group_by(Risk.category, Risk.severity, Risk.status)
+    )
     
-    # Calculate metrics
-    high_severity = len([r for r in risks if r.severity == "high"])
-    escalated = len([r for r in risks if r.is_escalated])
-    pending_approval = len([r for r in risks if r.approval_status == "pending"])
+    aggregate.total_risks = 0
+    aggregate.high_severity_count = 0
+    aggregate.escalated_count = 0
+    aggregate.approval_pending = 0
+    aggregate.risk_score_sum = 0.0
+    category_counts, severity_counts, status_counts = {}, {}, {}
     
-    avg_score = sum([r.risk_score or 0 for r in risks]) / len(risks)
+    for category, severity, status, count, escalated, pending, score_sum in result.all():
+        aggregate.total_risks += count
+        if severity == "high":
+            aggregate.high_severity_count += count
+        aggregate.escalated_count += escalated or 0
+        aggregate.approval_pending += pending or 0
+        aggregate.risk_score_sum += float(score_sum or 0)
+        category_counts[category] = category_counts.get(category, 0) + count
+        severity_counts[severity] = severity_counts.get(severity, 0) + count
+        status_counts[status] = status_counts.get(status, 0) + count
     
-    # Group by category
-    category_counts = {}
-    for risk in risks:
-        category_counts[risk.category] = category_counts.get(risk.category, 0) + 1
+    aggregate.risks_by_category = category_counts
+    aggregate.risks_by_severity = severity_counts
+    aggregate.risks_by_status = status_counts
+    await db.flush()
+    return aggregate
+
+
+async def update_risk_aggregate(
+    db: AsyncSession,
+    project_id: int,
+    removed: Optional[List[Dict]] = None,
+    added: Optional[List[Dict]] = None
+) -> None:
+    """
+    Apply risk changes to the project's aggregate row inside the caller's transaction.
+    `removed` and `added` are risk_snapshot() values; an update is one of each.
+    The row is locked (SELECT ... FOR UPDATE) so concurrent writers serialize.
+    Call after the risk change is flushed: a missing row is rebuilt from the table instead.
+    """
+    aggregate = await db.get(RiskAggregate, project_id, with_for_update=True)
+    if aggregate is None:
+        await refresh_risk_aggregate(db, project_id)
+        return
     
-    # Group by severity
-    severity_counts = {}
-    for risk in risks:
-        severity_counts[risk.severity] = severity_counts.get(risk.severity, 0) + 1
+    for snapshot in removed or []:
+        _apply_snapshot(aggregate, snapshot, -1)
+    for snapshot in added or []:
+        _apply_snapshot(aggregate, snapshot, 1)
+    await db.flush()
+
+
+async def get_risk_analytics(
+    db: AsyncSession,
+    project_id: int
+) -> RiskAnalyticsResponse:
+    """
+    Get comprehensive risk analytics for a project.
+    Reads the materialized aggregate row; it is built on first use.
+    """
+    aggregate = await db.get(RiskAggregate, project_id)
+    if aggregate is None:
+        aggregate = await refresh_risk_aggregate(db, project_id)
+        await db.commit()
     
-    # Group by status
-    status_counts = {}
-    for risk in risks:
-        status_counts[risk.status] = status_counts.get(risk.status, 0) + 1
+    total = aggregate.total_risks
+    avg_score = aggregate.risk_score_sum / total if total else 0
     
     return RiskAnalyticsResponse(
-        total_risks=len(risks),
-        high_severity_count=high_severity,
-        escalated_count=escalated,
-        approval_pending=pending_approval,
+        total_risks=total,
+        high_severity_count=aggregate.high_severity_count,
+        escalated_count=aggregate.escalated_count,
+        approval_pending=aggregate.approval_pending,
         average_risk_score=round(avg_score, 2),
-        risks_by_category=category_counts,
-        risks_by_severity=severity_counts,
-        risks_by_status=status_counts,
+        risks_by_category=dict(aggregate.risks_by_category or {}),
+        risks_by_severity=dict(aggregate.risks_by_severity or {}),
+        risks_by_status=dict(aggregate.risks_by_status or {}),
     )
 
 
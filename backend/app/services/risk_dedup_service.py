@@ -0,0 +1,145 @@
+"""
+Near-duplicate detection for LLM-identified risks.
+
+Each project gets a TF-IDF index over its risks' titles and descriptions. The
+title counts double. A candidate risk is compared by cosine similarity
+against every existing risk with one sparse matrix-vector product. Risks
+added since the index was built sit in a short pending list and are compared
+directly. Indexes are cached per project and rebuilt when the project's risks
+change outside this process (count, highest id or latest update differ).
+Writers add to a copy of the cached index and cache it only after their commit.
+"""
+
+import copy
+import math
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.risk import Risk
+from app.utils.text_index import term_weights
+
+MAX_CACHED_PROJECTS = 128
+TITLE_WEIGHT = 2.0
+
+
+def _risk_terms(title: Optional[str], description: Optional[str]) -> Dict[str, float]:
+    return term_weights([(title, TITLE_WEIGHT), (description, 1.0)])
+
+
+class RiskSimilarityIndex:
+    """TF-IDF vectors (L2-normalized) of one project's risks."""
+
+    def __init__(self, risks: Sequence[Tuple[int, Optional[str], Optional[str]]]):
+        documents = [(risk_id, _risk_terms(title, description)) for risk_id, title, description in risks]
+        document_frequency = Counter(term for _, terms in documents for term in terms)
+        count = len(documents)
+        self._vocabulary = {term: column for column, term in enumerate(document_frequency)}
+        # Smoothed IDF, so terms shared by every risk still carry some weight
+        self._idf = {term: math.log((1 + count) / (1 + df)) + 1.0 for term, df in document_frequency.items()}
+        self._unseen_idf = math.log(1 + count) + 1.0
+
+        self.ids: List[int] = []
+        indptr, indices, data = [0], [], []
+        for risk_id, terms in documents:
+            vector = self._vector(terms)
+            self.ids.append(risk_id)
+            indices.extend(self._vocabulary[term] for term in vector)
+            data.extend(vector.values())
+            indptr.append(len(indices))
+        self._matrix = csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(documents), max(len(self._vocabulary), 1)),
+        )
+        # Risks added after the build: (risk_id, vector)
+        self._pending: List[Tuple[int, Dict[str, float]]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self._pending)
+
+    def _vector(self, terms: Dict[str, float]) -> Dict[str, float]:
+        vector = {term: weight * self._idf.get(term, self._unseen_idf) for term, weight in terms.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {term: value / norm for term, value in vector.items()} if norm else {}
+
+    def find(self, title: Optional[str], description: Optional[str], threshold: float) -> Optional[Tuple[int, float]]:
+        """(risk_id, cosine similarity) of the closest risk at or above `threshold`, if any."""
+        vector = self._vector(_risk_terms(title, description))
+        if not vector:
+            return None
+        best_id, best_score = None, threshold
+
+        if self.ids:
+            query = np.zeros(self._matrix.shape[1], dtype=np.float32)
+            for term, value in vector.items():
+                column = self._vocabulary.get(term)
+                if column is not None:
+                    query[column] = value
+            scores = self._matrix @ query
+            row = int(np.argmax(scores))
+            if scores[row] >= best_score:
+                best_id, best_score = self.ids[row], float(scores[row])
+
+        for risk_id, other in self._pending:
+            score = sum(value * other.get(term, 0.0) for term, value in vector.items())
+            if score >= best_score:
+                best_id, best_score = risk_id, score
+        return (best_id, min(best_score, 1.0)) if best_id is not None else None
+
+    def copy(self) -> "RiskSimilarityIndex":
+        """An index sharing this one's built matrix, with its own pending list."""
+        clone = copy.copy(self)
+        clone._pending = list(self._pending)
+        return clone
+
+    def add(self, risk_id: int, title: Optional[str], description: Optional[str]) -> None:
+        """Make a newly inserted risk visible to later lookups."""
+        vector = self._vector(_risk_terms(title, description))
+        if vector:
+            self._pending.append((risk_id, vector))
+
+
+# project_id -> (fingerprint, index), least recently used first
+_indexes: "OrderedDict[int, Tuple[tuple, RiskSimilarityIndex]]" = OrderedDict()
+
+
+async def _fingerprint(db: AsyncSession, project_id: int) -> tuple:
+    result = await db.execute(
+        select(func.count(Risk.id), func.max(Risk.id), func.max(Risk.updated_at))
+        .where(Risk.project_id == project_id)
+    )
+    return tuple(result.one())
+
+
+async def get_similarity_index(db: AsyncSession, project_id: int) -> RiskSimilarityIndex:
+    """The project's index, rebuilt with one query if its risks changed since it was cached."""
+    fingerprint = await _fingerprint(db, project_id)
+    cached = _indexes.get(project_id)
+    if cached and cached[0] == fingerprint:
+        _indexes.move_to_end(project_id)
+        return cached[1]
+
+    result = await db.execute(
+        select(Risk.id, Risk.title, Risk.description)
+        .where(Risk.project_id == project_id)
+        .order_by(Risk.id)
+    )
+    index = RiskSimilarityIndex(result.all())
+    _indexes[project_id] = (fingerprint, index)
+    _indexes.move_to_end(project_id)
+    while len(_indexes) > MAX_CACHED_PROJECTS:
+        _indexes.popitem(last=False)
+    return index
+
+
+async def remember_similarity_index(db: AsyncSession, project_id: int, index: RiskSimilarityIndex) -> None:
+    """After committing this process's own changes, cache `index` for the new table state."""
+    _indexes[project_id] = (await _fingerprint(db, project_id), index)
+    _indexes.move_to_end(project_id)
+
+
+def forget_similarity_index(project_id: int) -> None:
+    """Drop the project's cached index, e.g. after a write that did not commit."""
+    _indexes.pop(project_id, None)
@@ -1,11 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, func
+from typing import Any, Dict, List
+from app.core.config import settings
+from app.core.single_flight import coalesce
 from app.models.risk import Risk
-from app.schemas.risk import RiskAnalyze
+from app.schemas.risk import RiskAnalyze, RiskResponse
+from app.ai.chunking import estimate_tokens
+from app.ai.context_builder import ContextBuilder, truncate_to_tokens
 from app.ai.llm_client import call_llm
 from app.utils.file_utils import load_prompt
-from app.services.risk_analytics_service import calculate_risk_score, record_risk_metric
+from app.services.risk_analytics_service import (
+    calculate_risk_score,
+    calculate_trend,
+    record_risk_metric,
+    risk_snapshot,
+    update_risk_aggregate
+)
+from app.services.risk_dedup_service import forget_similarity_index, get_similarity_index, remember_similarity_index
+
+# Most recent status reports considered by analyze_project_documentation
+MAX_STATUS_REPORTS = 5
 
 
 def calculate_severity(probability: int, impact: int) -> str:
@@ -19,6 +33,179 @@ def calculate_severity(probability: int, impact: int) -> str:
         return "high"
 
 
+def _llm_risk_fields(risk_data_item: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated column values for one risk from the LLM response."""
+    category_str = risk_data_item.get("category", "external").lower()
+    # Validate category is one of the allowed values
+    valid_categories = ["schedule", "budget", "resource", "technical", "external"]
+    category = category_str if category_str in valid_categories else "external"
+    
+    probability = int(risk_data_item.get("probability", 3))
+    impact = int(risk_data_item.get("impact", 3))
+    return {
+        "title": risk_data_item.get("title", "Unnamed Risk"),
+        "description": risk_data_item.get("description", ""),
+        "category": category,
+        "probability": probability,
+        "impact": impact,
+        "severity": risk_data_item.get("severity") or calculate_severity(probability, impact),
+        "risk_score": calculate_risk_score(probability, impact),
+        "mitigation_plan": risk_data_item.get("mitigation_plan"),
+    }
+
+
+def _refresh_assessment(risk: Risk, fields: Dict[str, Any]) -> bool:
+    """
+    Apply a repeated finding to an existing risk: the new assessment replaces the
+    old one, while title, description and workflow state are kept. Returns
+    whether probability or impact changed.
+    """
+    rescored = (risk.probability, risk.impact) != (fields["probability"], fields["impact"])
+    risk.category = fields["category"]
+    risk.probability = fields["probability"]
+    risk.impact = fields["impact"]
+    risk.severity = fields["severity"]
+    risk.risk_score = fields["risk_score"]
+    if fields["mitigation_plan"] and not risk.mitigation_plan:
+        risk.mitigation_plan = fields["mitigation_plan"]
+    return rescored
+
+
+async def save_analyzed_risks(
+    db: AsyncSession,
+    project_id: int,
+    risks_data: List[Dict[str, Any]]
+) -> List[Risk]:
+    """
+    Save LLM-identified risks for a project. A near-duplicate of an existing risk
+    (TF-IDF cosine >= risk_dedup_threshold) updates that risk instead of adding
+    a row, and the aggregate row is adjusted for both cases.
+    Returns the created and updated risks in LLM order.
+    """
+    # Additions go to a copy, which replaces the cached index only once they are committed
+    index = (await get_similarity_index(db, project_id)).copy()
+    results: List[Risk] = []
+    created: Dict[int, Risk] = {}
+    updated: Dict[int, Risk] = {}
+    before: Dict[int, Dict] = {}
+    rescored = set()
+    
+    for risk_data_item in risks_data:
+        fields = _llm_risk_fields(risk_data_item)
+        match = index.find(fields["title"], fields["description"], settings.risk_dedup_threshold)
+        # Locked so the "before" snapshot below matches what the aggregate delta removes
+        risk = await db.get(Risk, match[0], with_for_update=True) if match else None
+        
+        if risk is None or risk.project_id != project_id:
+            risk = Risk(
+                project_id=project_id,
+                trend="stable",
+                status="open",
+                approval_status="pending",
+                **fields,
+            )
+            db.add(risk)
+            await db.flush()
+            index.add(risk.id, risk.title, risk.description)
+            created[risk.id] = risk
+        elif risk.id not in created:
+            before.setdefault(risk.id, risk_snapshot(risk))
+            if _refresh_assessment(risk, fields):
+                rescored.add(risk.id)
+            updated[risk.id] = risk
+        else:
+            # Repeated within the same response
+            _refresh_assessment(risk, fields)
+        
+        if risk not in results:
+            results.append(risk)
+    
+    # Initial metric for new risks; a new data point and trend for re-scored ones
+    for risk in created.values():
+        await record_risk_metric(db, risk.id, risk.probability, risk.impact, risk.severity)
+    for risk_id in rescored:
+        risk = updated[risk_id]
+        await record_risk_metric(db, risk.id, risk.probability, risk.impact, risk.severity)
+        risk.trend = await calculate_trend(db, risk.id)
+    
+    await db.flush()
+    await update_risk_aggregate(
+        db,
+        project_id,
+        removed=list(before.values()),
+        added=[risk_snapshot(r) for r in (*created.values(), *updated.values())],
+    )
+    try:
+        await db.commit()
+    except Exception:
+        forget_similarity_index(project_id)
+        raise
+    await remember_similarity_index(db, project_id, index)
+    
+    for risk in results:
+        await db.refresh(risk)
+    
+    if updated:
+        print(f"Risk analysis for project {project_id}: {len(created)} new, {len(updated)} near-duplicates updated")
+    return results
+
+
+def build_project_documentation_context(
+    project: Any,
+    status_reports: List[Any],
+    allocations_by_resource: List[Any]
+) -> str:
+    """
+    Project documentation for the risk prompt, within llm_context_budget_tokens.
+    Status reports are kept newest first; allocations are aggregated to hours per
+    resource, largest first, and the tail is reduced to a total.
+    """
+    budget = settings.llm_context_budget_tokens
+    builder = ContextBuilder(budget)
+    builder.add_section("Project overview", [], summary="\n".join([
+        f"Name: {project.name}",
+        f"Description: {truncate_to_tokens(project.description or 'N/A', budget // 8)}",
+        f"Status: {project.status}",
+    ]))
+    
+    report_blocks = []
+    for sr in status_reports:
+        lines = [f"Generated At: {sr.generated_at}", f"Executive Summary: {sr.executive_summary}"]
+        if sr.risks_summary:
+            lines.append(f"Risks: {sr.risks_summary}")
+        if sr.meetings_summary:
+            lines.append(f"Meetings: {sr.meetings_summary}")
+        if sr.resources_summary:
+            lines.append(f"Resources: {sr.resources_summary}")
+        report_blocks.append("\n".join(lines))
+    builder.add_section(
+        "Status reports (newest first)",
+        report_blocks,
+        weight=2.0,
+        omitted=lambda count: f"... {count} older status reports not shown",
+        empty="No status reports available.",
+    )
+    
+    hours = [float(row.hours or 0) for row in allocations_by_resource]
+    builder.add_section(
+        "Resource allocations (hours per resource)",
+        [
+            f"Resource: {row.name or 'Unknown'} ({row.role or 'N/A'}), "
+            f"Allocated Hours: {float(row.hours or 0):g}h over {row.allocations} allocation(s), "
+            f"Period: {row.start_date} to {row.end_date}"
+            for row in allocations_by_resource
+        ],
+        summary=(
+            f"Total: {sum(hours):g}h across {sum(row.allocations for row in allocations_by_resource)} "
+            f"allocations and {len(allocations_by_resource)} resources"
+        ) if allocations_by_resource else None,
+        weight=1.0,
+        omitted=lambda count: f"... {count} more resources with {sum(hours[-count:]):g}h allocated",
+        empty="No resource allocations available.",
+    )
+    return builder.build()
+
+
 async def analyze_risks_from_text(
     db: AsyncSession,
     risk_data: RiskAnalyze
@@ -31,46 +218,7 @@ async def analyze_risks_from_text(
     
     llm_response = await call_llm(prompt, system_prompt=system_prompt)
     
-    risks_data = llm_response.get("risks", [])
-    created_risks = []
-    
-    for risk_data_item in risks_data:
-        category_str = risk_data_item.get("category", "external").lower()
-        # Validate category is one of the allowed values
-        valid_categories = ["schedule", "budget", "resource", "technical", "external"]
-        category = category_str if category_str in valid_categories else "external"
-        
-        probability = int(risk_data_item.get("probability", 3))
-        impact = int(risk_data_item.get("impact", 3))
-        severity = risk_data_item.get("severity") or calculate_severity(probability, impact)
-        risk_score = calculate_risk_score(probability, impact)
-        
-        risk = Risk(
-            project_id=risk_data.project_id,
-            title=risk_data_item.get("title", "Unnamed Risk"),
-            description=risk_data_item.get("description", ""),
-            category=category,
-            probability=probability,
-            impact=impact,
-            severity=severity,
-            risk_score=risk_score,
-            trend="stable",
-            mitigation_plan=risk_data_item.get("mitigation_plan"),
-            status="open",
-            approval_status="pending",
-        )
-        
-        db.add(risk)
-        created_risks.append(risk)
-    
-    await db.commit()
-    
-    for risk in created_risks:
-        await db.refresh(risk)
-        # Record initial metric
-        await record_risk_metric(db, risk.id, risk.probability, risk.impact, risk.severity)
-    
-    return created_risks
+    return await save_analyzed_risks(db, risk_data.project_id, llm_response.get("risks", []))
 
 
 async def analyze_project_documentation(
@@ -96,64 +244,45 @@ async def analyze_project_documentation(
             select(StatusReport)
             .where(StatusReport.project_id == project_id)
             .order_by(StatusReport.generated_at.desc())
+            .limit(MAX_STATUS_REPORTS)
         )
         status_reports = list(status_result.scalars().all())
         
-        resource_result = await db.execute(
-            select(Resource).where(Resource.project_id == project_id)
-        )
-        resources = list(resource_result.scalars().all())
+        resource_count = (await db.execute(
+            select(func.count(Resource.id)).where(Resource.project_id == project_id)
+        )).scalar_one()
         
+        # Allocations are summarized per resource rather than listed one by one
         allocation_result = await db.execute(
-            select(Allocation).where(Allocation.project_id == project_id)
+            select(
+                Resource.name,
+                Resource.role,
+                func.count(Allocation.id).label("allocations"),
+                func.sum(Allocation.allocated_hours).label("hours"),
+                func.min(Allocation.start_date).label("start_date"),
+                func.max(Allocation.end_date).label("end_date"),
+            )
+            .select_from(Allocation)
+            .outerjoin(Resource, Resource.id == Allocation.resource_id)
+            .where(Allocation.project_id == project_id)
+            .group_by(Allocation.resource_id, Resource.name, Resource.role)
+            .order_by(func.sum(Allocation.allocated_hours).desc())
         )
-        allocations = list(allocation_result.scalars().all())
+        allocations_by_resource = allocation_result.all()
         
         # Check if there's any data to analyze
-        if not status_reports and not resources and not allocations:
+        if not status_reports and not resource_count and not allocations_by_resource:
             raise ValueError(
                 f"No data available to analyze for project '{project.name}'. "
                 "Please add status reports, team members, or resource allocations before using AI analysis."
             )
         
-        doc_parts = [
-            f"PROJECT OVERVIEW:",
-            f"Name: {project.name}",
-            f"Description: {project.description or 'N/A'}",
-            f"Status: {project.status}",
-            f"\n--- STATUS REPORTS ---"
-        ]
+        project_text = build_project_documentation_context(project, status_reports, allocations_by_resource)
         
-        if status_reports:
-            for sr in status_reports[:5]:  # Last 5 reports
-                doc_parts.append(f"\nGenerated At: {sr.generated_at}")
-                doc_parts.append(f"Executive Summary: {sr.executive_summary}")
-                if sr.risks_summary:
-                    doc_parts.append(f"Risks: {sr.risks_summary}")
-                if sr.meetings_summary:
-                    doc_parts.append(f"Meetings: {sr.meetings_summary}")
-                if sr.resources_summary:
-                    doc_parts.append(f"Resources: {sr.resources_summary}")
-        else:
-            doc_parts.append("No status reports available.")
-        
-        doc_parts.append("\n--- RESOURCE ALLOCATIONS ---")
-        if allocations:
-            for alloc in allocations:
-                # Find resource name
-                resource = next((r for r in resources if r.id == alloc.resource_id), None)
-                resource_name = resource.name if resource else "Unknown"
-                doc_parts.append(
-                    f"Resource: {resource_name}, "
-                    f"Allocated Hours: {alloc.allocated_hours}h, "
-                    f"Period: {alloc.start_date} to {alloc.end_date}"
-                )
-        else:
-            doc_parts.append("No resource allocations available.")
-        
-        project_text = "\n".join(doc_parts)
-        
-        print(f"Analyzing project {project_id} with {len(status_reports)} reports, {len(resources)} resources")
+        print(
+            f"Analyzing project {project_id} with {len(status_reports)} reports, {resource_count} resources "
+            f"(~{estimate_tokens(project_text)} context tokens)"
+        )
         
         # Analyze with LLM
         prompt_template = load_prompt("risk_prompt")
@@ -169,48 +298,10 @@ async def analyze_project_documentation(
             print("Warning: LLM returned no risks")
             return []
         
-        created_risks = []
-        
-        for risk_data_item in risks_data:
-            category_str = risk_data_item.get("category", "external").lower()
-            valid_categories = ["schedule", "budget", "resource", "technical", "external"]
-            category = category_str if category_str in valid_categories else "external"
-            
-            probability = int(risk_data_item.get("probability", 3))
-            impact = int(risk_data_item.get("impact", 3))
-            severity = risk_data_item.get("severity") or calculate_severity(probability, impact)
-            risk_score = calculate_risk_score(probability, impact)
-            
-            risk = Risk(
-                project_id=project_id,
-                title=risk_data_item.get("title", "Unnamed Risk"),
-                description=risk_data_item.get("description", ""),
-                category=category,
-                probability=probability,
-                impact=impact,
-                severity=severity,
-                risk_score=risk_score,
-                trend="stable",
-                mitigation_plan=risk_data_item.get("mitigation_plan"),
-                status="open",
-                approval_status="pending",
-            )
-            
-            db.add(risk)
-            created_risks.append(risk)
-        
-        await db.commit()
-        
-        # Refresh to get IDs
-        for risk in created_risks:
-            await db.refresh(risk)
-            # Record initial metric
-            await record_risk_metric(db, risk.id, risk.probability, risk.impact, risk.severity)
+        risks = await save_analyzed_risks(db, project_id, risks_data)
         
-        await db.commit()
-        
-        print(f"Successfully created {len(created_risks)} risks for project {project_id}")
-        return created_risks
+        print(f"Saved {len(risks)} risks for project {project_id}")
+        return risks
         
     except ValueError:
         # Re-raise validation errors as-is
@@ -222,6 +313,32 @@ async def analyze_project_documentation(
         raise
 
 
+def _serialize_risks(risks: List[Risk]) -> List[Dict[str, Any]]:
+    return [RiskResponse.model_validate(risk).model_dump(mode="json") for risk in risks]
+
+
+async def analyze_risks_from_text_coalesced(risk_data: RiskAnalyze) -> List[Dict[str, Any]]:
+    """
+    analyze_risks_from_text, shared by concurrent requests for the same project and text.
+    Returns the risks serialized as RiskResponse dicts.
+    """
+    return await coalesce(
+        "risk_analyze", risk_data.project_id, risk_data.project_text,
+        lambda db: analyze_risks_from_text(db, risk_data), _serialize_risks
+    )
+
+
+async def analyze_project_documentation_coalesced(project_id: int) -> List[Dict[str, Any]]:
+    """
+    analyze_project_documentation, shared by concurrent requests for the same project.
+    Returns the risks serialized as RiskResponse dicts.
+    """
+    return await coalesce(
+        "risk_analyze_project", project_id, None,
+        lambda db: analyze_project_documentation(db, project_id), _serialize_risks
+    )
+
+
 async def get_risks_by_project(
     db: AsyncSession,
     project_id: int
@@ -0,0 +1,323 @@
+"""
+Scenario simulation: what-if allocations overlaid on the live allocation set.
+The live state is loaded once into a picklable SimulationBaseline; each scenario
+is then evaluated in memory (conflicts, utilization distribution and skill
+coverage) without writing to the database. Batches of scenarios are spread over
+a process pool so evaluation is not bound by a single core.
+"""
+
+import asyncio
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.resource import Resource, Allocation
+from app.models.resource_skill import ResourceSkill
+from app.models.project_requirement import ProjectRequirement
+from app.services.allocation_optimizer_service import (
+    _utilization_status,
+    build_resource_conflicts,
+    build_proficiency_matrix,
+)
+
+SimAllocation = namedtuple("SimAllocation", ["project_id", "allocated_hours", "start_date", "end_date"])
+
+
+@dataclass
+class SimulationBaseline:
+    """Live allocation state as plain data, safe to send to worker processes."""
+    resource_ids: List[int]
+    resource_index: Dict[int, int]  # resource_id -> row in allocated_hours / proficiency
+    resource_names: Dict[int, str]
+    capacity_hours: Dict[int, Decimal]
+    allocations: Dict[int, List[SimAllocation]]  # resource_id -> live allocations
+    allocated_hours: np.ndarray  # live total per resource
+    project_resources: Dict[int, Set[int]]  # project_id -> resources allocated to it
+    requirements: Dict[int, List[Tuple[str, int]]]  # project_id -> (skill_name, required_proficiency)
+    skill_names: List[str]
+    proficiency: np.ndarray  # resource x skill, rows follow resource_ids
+    # resource_id -> (conflicts, high-severity conflicts) before any scenario; filled lazily
+    live_conflict_counts: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    def live_conflicts(self, resource_id: int) -> Tuple[int, int]:
+        if resource_id not in self.live_conflict_counts:
+            conflicts = build_resource_conflicts(
+                resource_id,
+                self.resource_names[resource_id],
+                self.capacity_hours[resource_id],
+                self.allocations.get(resource_id, []),
+            )
+            self.live_conflict_counts[resource_id] = (
+                len(conflicts), sum(1 for conflict in conflicts if conflict.severity == "high")
+            )
+        return self.live_conflict_counts[resource_id]
+
+
+def _naive_utc(value: Optional[Any]) -> Optional[datetime]:
+    """Datetimes (or ISO strings) as naive UTC so live and proposed dates compare."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def load_simulation_baseline(db: AsyncSession) -> SimulationBaseline:
+    """Load resources, allocations, skills and requirements with one query each."""
+    resources = (await db.execute(
+        select(Resource.id, Resource.name, Resource.capacity_hours).order_by(Resource.id)
+    )).all()
+    allocation_rows = (await db.execute(
+        select(
+            Allocation.resource_id,
+            Allocation.project_id,
+            Allocation.allocated_hours,
+            Allocation.start_date,
+            Allocation.end_date,
+        ).order_by(Allocation.resource_id, Allocation.id)
+    )).all()
+    skill_rows = (await db.execute(
+        select(ResourceSkill.resource_id, ResourceSkill.skill_name, ResourceSkill.proficiency_level)
+    )).all()
+    requirement_rows = (await db.execute(
+        select(ProjectRequirement.project_id, ProjectRequirement.skill_name, ProjectRequirement.required_proficiency)
+        .order_by(ProjectRequirement.project_id, ProjectRequirement.id)
+    )).all()
+
+    allocations: Dict[int, List[SimAllocation]] = {}
+    project_resources: Dict[int, Set[int]] = {}
+    for row in allocation_rows:
+        allocations.setdefault(row.resource_id, []).append(SimAllocation(
+            row.project_id, Decimal(row.allocated_hours), _naive_utc(row.start_date), _naive_utc(row.end_date)
+        ))
+        project_resources.setdefault(row.project_id, set()).add(row.resource_id)
+
+    requirements: Dict[int, List[Tuple[str, int]]] = {}
+    for row in requirement_rows:
+        requirements.setdefault(row.project_id, []).append((row.skill_name, row.required_proficiency))
+
+    resource_ids = [row.id for row in resources]
+    allocated_hours = np.array([
+        float(sum((alloc.allocated_hours for alloc in allocations.get(resource_id, [])), Decimal("0")))
+        for resource_id in resource_ids
+    ])
+    skill_names = sorted({skill for rows in requirements.values() for skill, _ in rows})
+    return SimulationBaseline(
+        resource_ids=resource_ids,
+        resource_index={resource_id: i for i, resource_id in enumerate(resource_ids)},
+        resource_names={row.id: row.name for row in resources},
+        capacity_hours={row.id: Decimal(row.capacity_hours) for row in resources},
+        allocations=allocations,
+        allocated_hours=allocated_hours,
+        project_resources=project_resources,
+        requirements=requirements,
+        skill_names=skill_names,
+        proficiency=build_proficiency_matrix(resource_ids, skill_names, skill_rows),
+    )
+
+
+def _utilization_distribution(baseline: SimulationBaseline, overlay: Dict[int, List[SimAllocation]]) -> Dict[str, Any]:
+    """Utilization percentage statistics over all resources after the overlay."""
+    capacity = np.array([float(baseline.capacity_hours[rid]) for rid in baseline.resource_ids])
+    allocated = baseline.allocated_hours.copy()
+    for resource_id, allocations in overlay.items():
+        allocated[baseline.resource_index[resource_id]] = float(sum((alloc.allocated_hours for alloc in allocations), Decimal("0")))
+    utilization = np.divide(allocated * 100, capacity, out=np.zeros_like(allocated), where=capacity > 0)
+
+    statuses = {"under-utilized": 0, "optimal": 0, "over-utilized": 0}
+    for value in utilization.tolist():
+        statuses[_utilization_status(value)] += 1
+
+    if not len(utilization):
+        return {"resources": 0, **statuses}
+    return {
+        "resources": len(utilization),
+        "mean": round(float(utilization.mean()), 2),
+        "median": round(float(np.median(utilization)), 2),
+        "p90": round(float(np.percentile(utilization, 90)), 2),
+        "max": round(float(utilization.max()), 2),
+        "std": round(float(utilization.std()), 2),
+        **statuses,
+    }
+
+
+def _skill_coverage(baseline: SimulationBaseline, added: Dict[int, Set[int]]) -> Dict[str, Any]:
+    """
+    For each requirement of the projects in `added` (project_id -> proposed
+    resource ids), the best proficiency among
+    the resources allocated to the project (live plus proposed): covered when it
+    meets the required level, partial when below it, missing when nobody has the skill.
+    """
+    skill_index = {name: j for j, name in enumerate(baseline.skill_names)}
+    totals = {"requirements": 0, "covered": 0, "partial": 0, "missing": 0}
+    by_project = {}
+
+    for project_id in sorted(added):
+        requirements = baseline.requirements.get(project_id)
+        if not requirements:
+            continue
+        members = baseline.project_resources.get(project_id, set()) | added.get(project_id, set())
+        rows = [baseline.resource_index[rid] for rid in members if rid in baseline.resource_index]
+        columns = [skill_index[skill] for skill, _ in requirements]
+        required = np.array([level for _, level in requirements])
+        best = baseline.proficiency[np.ix_(rows, columns)].max(axis=0) if rows else np.zeros(len(columns))
+
+        covered = int((best >= required).sum())
+        partial = int(((best > 0) & (best < required)).sum())
+        counts = {"requirements": len(requirements), "covered": covered, "partial": partial,
+                  "missing": len(requirements) - covered - partial}
+        by_project[project_id] = counts
+        for key, value in counts.items():
+            totals[key] += value
+
+    coverage = round(totals["covered"] / totals["requirements"] * 100, 2) if totals["requirements"] else None
+    return {**totals, "coverage_percentage": coverage, "by_project": by_project}
+
+
+def simulate_scenario(baseline: SimulationBaseline, allocations: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Overlay proposed `allocations` (resource_id, project_id, allocated_hours,
+    start_date, end_date) on the baseline and evaluate the result. Conflicts are
+    reported for the resources the scenario touches, with the count they had
+    before so new conflicts stand out.
+    """
+    overlay: Dict[int, List[SimAllocation]] = {}
+    added: Dict[int, Set[int]] = {}
+    warnings = []
+    total_hours = Decimal("0")
+
+    for alloc in allocations:
+        resource_id = alloc["resource_id"]
+        if resource_id not in baseline.capacity_hours:
+            warnings.append(f"Resource {resource_id} not found; allocation ignored")
+            continue
+        hours = Decimal(str(alloc["allocated_hours"]))
+        total_hours += hours
+        if resource_id not in overlay:
+            overlay[resource_id] = list(baseline.allocations.get(resource_id, []))
+        overlay[resource_id].append(SimAllocation(
+            alloc["project_id"], hours, _naive_utc(alloc.get("start_date")), _naive_utc(alloc.get("end_date"))
+        ))
+        added.setdefault(alloc["project_id"], set()).add(resource_id)
+
+    conflicts_before = conflicts_after = high_before = high_after = 0
+    conflicts = []
+    for resource_id, resource_allocations in overlay.items():
+        after = build_resource_conflicts(
+            resource_id,
+            baseline.resource_names[resource_id],
+            baseline.capacity_hours[resource_id],
+            resource_allocations,
+        )
+        conflicts.extend(after)
+        live_count, live_high = baseline.live_conflicts(resource_id)
+        conflicts_before += live_count
+        conflicts_after += len(after)
+        high_before += live_high
+        high_after += sum(1 for conflict in after if conflict.severity == "high")
+
+    return {
+        "total_allocated_hours": float(total_hours),
+        "resources_involved": len(overlay),
+        "projects_involved": len(added),
+        "conflicts": [conflict.model_dump() for conflict in conflicts],
+        "new_conflicts": conflicts_after - conflicts_before,
+        "new_high_severity_conflicts": high_after - high_before,
+        "utilization": _utilization_distribution(baseline, overlay),
+        "skill_coverage": _skill_coverage(baseline, added),
+        "warnings": warnings,
+    }
+
+
+def _simulate_batch(baseline: SimulationBaseline, batch: List[Sequence[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [simulate_scenario(baseline, allocations) for allocations in batch]
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_count() -> int:
+    return settings.scenario_simulation_workers or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn: forking a process that runs an event loop and worker threads is unsafe
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def shutdown_simulation_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+async def simulate_scenarios(
+    baseline: SimulationBaseline,
+    scenarios: List[Sequence[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Simulate every scenario (a list of allocation dicts) against `baseline`.
+    Large batches are split into one chunk per worker process, so the baseline
+    is pickled once per worker rather than once per scenario; small batches run
+    inline where process start-up and pickling would cost more than they save.
+    """
+    workers = _worker_count()
+    if workers <= 1 or len(scenarios) < settings.scenario_simulation_min_parallel:
+        return _simulate_batch(baseline, scenarios)
+
+    pool = _get_process_pool()
+    loop = asyncio.get_running_loop()
+    chunk_size = -(-len(scenarios) // workers)
+    chunks = [scenarios[start:start + chunk_size] for start in range(0, len(scenarios), chunk_size)]
+    results = await asyncio.gather(*[
+        loop.run_in_executor(pool, _simulate_batch, baseline, chunk) for chunk in chunks
+    ])
+    return [result for chunk_results in results for result in chunk_results]
+
+
+def rank_simulations(results: List[Dict[str, Any]]) -> List[int]:
+    """
+    Indices of `results`, best first: fewest new high-severity conflicts, then fewest
+    new conflicts, highest skill coverage, fewest over-utilized resources and
+    finally fewest hours.
+    """
+    def key(index: int) -> Tuple:
+        result = results[index]
+        coverage = result["skill_coverage"]["coverage_percentage"]
+        return (
+            result["new_high_severity_conflicts"],
+            result["new_conflicts"],
+            -(coverage if coverage is not None else 0),
+            result["utilization"]["over-utilized"],
+            result["total_allocated_hours"],
+        )
+    return sorted(range(len(results)), key=key)
+
+
+def describe_best(name: str, result: Dict[str, Any]) -> str:
+    """One-sentence recommendation for the top-ranked scenario."""
+    coverage = result["skill_coverage"]["coverage_percentage"]
+    coverage_text = f"{coverage}% skill coverage" if coverage is not None else "no skill requirements to cover"
+    return (
+        f"Scenario '{name}' is recommended: {result['new_conflicts']} new conflicts "
+        f"({result['new_high_severity_conflicts']} high severity), {coverage_text}, "
+        f"{result['utilization']['over-utilized']} over-utilized resources and "
+        f"{result['total_allocated_hours']} total hours allocated."
+    )
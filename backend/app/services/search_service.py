@@ -0,0 +1,317 @@
+"""
+Full-text search across meetings, action items and risks.
+
+On Postgres, each table has a generated, weighted `search_vector` tsvector
+column with a GIN index (migration 008). Matches are ranked with ts_rank_cd
+and highlighted with ts_headline. Only the rows on the requested page are
+highlighted.
+
+Other databases (SQLite in development) use an in-process inverted index from
+app.utils.text_index with the same field weights. The index is built on first
+use. Committed writes are then applied incrementally, and it only sees writes
+made by this process.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import event, func, inspect, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.meeting import Meeting, ActionItem
+from app.models.project import Project
+from app.models.risk import Risk
+from app.utils.text_index import InvertedIndex, highlight, parse_query, term_weights
+
+SEARCH_TYPES = ("meeting", "action_item", "risk")
+SEARCH_MODELS = {"meeting": Meeting, "action_item": ActionItem, "risk": Risk}
+TS_CONFIG = "english"
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=' ... '"
+
+# Searchable fields and their tsvector weight class; must match migration 008
+SEARCH_FIELDS = {
+    "meeting": ((Meeting.title, "A"), (Meeting.summary, "B"), (Meeting.decisions, "B"), (Meeting.raw_text, "C")),
+    "action_item": ((ActionItem.description, "A"),),
+    "risk": ((Risk.title, "A"), (Risk.description, "B"), (Risk.mitigation_plan, "C")),
+}
+# ts_rank_cd's default weights per class, reused by the in-process index
+WEIGHT_VALUES = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+
+def _columns(search_type: str) -> Dict[str, Any]:
+    """id, project_id, meeting_id, title and the text the snippet is cut from."""
+    if search_type == "meeting":
+        return {
+            "id": Meeting.id, "project_id": Meeting.project_id, "meeting_id": Meeting.id, "title": Meeting.title,
+            "snippet": (Meeting.summary, Meeting.decisions, Meeting.raw_text),
+        }
+    if search_type == "action_item":
+        return {
+            "id": ActionItem.id, "project_id": Meeting.project_id, "meeting_id": ActionItem.meeting_id,
+            "title": Meeting.title, "snippet": (ActionItem.description,),
+        }
+    return {
+        "id": Risk.id, "project_id": Risk.project_id, "meeting_id": literal(None), "title": Risk.title,
+        "snippet": (Risk.description, Risk.mitigation_plan),
+    }
+
+
+def _from(query, search_type: str):
+    if search_type == "action_item":
+        return query.select_from(ActionItem).join(Meeting, ActionItem.meeting_id == Meeting.id)
+    return query
+
+
+def _hit(search_type: str, row: Any, snippet: str, rank: float) -> Dict[str, Any]:
+    return {
+        "type": search_type,
+        "id": row.id,
+        "project_id": row.project_id,
+        "meeting_id": row.meeting_id,
+        "title": row.title,
+        "snippet": snippet,
+        "rank": round(rank, 6),
+    }
+
+
+# ============ Postgres ============
+
+async def _search_postgres(
+    db: AsyncSession, query: str, types: Sequence[str], project_id: Optional[int], offset: int, limit: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+    ranked = []
+    for search_type in types:
+        columns = _columns(search_type)
+        vector = literal_column(f"{SEARCH_MODELS[search_type].__tablename__}.search_vector")
+        part = _from(select(
+            literal(search_type).label("type"),
+            columns["id"].label("id"),
+            columns["project_id"].label("project_id"),
+            func.ts_rank_cd(vector, tsquery).label("rank"),
+        ), search_type).where(vector.op("@@")(tsquery))
+        if project_id is not None:
+            part = part.where(columns["project_id"] == project_id)
+        ranked.append(part)
+
+    hits = union_all(*ranked).subquery()
+    page = (await db.execute(
+        select(hits, func.count().over().label("total"))
+        .order_by(hits.c.rank.desc(), hits.c.type, hits.c.id)
+        .offset(offset)
+        .limit(limit)
+    )).all()
+    if not page:
+        return 0, []
+
+    # ts_headline re-parses the document, so only the page's rows are highlighted
+    details: Dict[Tuple[str, int], Any] = {}
+    for search_type in types:
+        ids = [row.id for row in page if row.type == search_type]
+        if not ids:
+            continue
+        columns = _columns(search_type)
+        text = func.concat_ws(" ", *columns["snippet"])
+        result = await db.execute(_from(select(
+            columns["id"].label("id"),
+            columns["project_id"].label("project_id"),
+            columns["meeting_id"].label("meeting_id"),
+            columns["title"].label("title"),
+            func.ts_headline(TS_CONFIG, text, tsquery, HEADLINE_OPTIONS).label("snippet"),
+        ), search_type).where(columns["id"].in_(ids)))
+        for row in result.all():
+            details[(search_type, row.id)] = row
+
+    items = [
+        _hit(row.type, details[(row.type, row.id)], details[(row.type, row.id)].snippet, row.rank)
+        for row in page if (row.type, row.id) in details
+    ]
+    return page[0].total, items
+
+
+# ============ In-process fallback ============
+
+class FallbackSearchIndex:
+    """InvertedIndex over the searchable tables, kept in step with committed writes."""
+
+    def __init__(self):
+        self.index = InvertedIndex(merge_threshold=settings.search_index_merge_threshold)
+        self.built = False
+        self._lock = asyncio.Lock()
+        # search type -> changed ids, or None to reload the whole table
+        self._pending: Dict[str, Optional[Set[int]]] = {}
+        self._deleted_projects: Set[int] = set()
+
+    def record(self, changes: Dict[str, Optional[Set[int]]], deleted_projects: Set[int]) -> None:
+        """Queue committed changes; they are applied before the next search."""
+        if not self.built:
+            return
+        for search_type, ids in changes.items():
+            if ids is None or self._pending.get(search_type, set()) is None:
+                self._pending[search_type] = None
+            else:
+                self._pending.setdefault(search_type, set()).update(ids)
+        self._deleted_projects |= deleted_projects
+
+    def _documents(self, search_type: str, rows: Iterable[Any]):
+        kind = SEARCH_TYPES.index(search_type)
+        weights = [WEIGHT_VALUES[weight] for _, weight in SEARCH_FIELDS[search_type]]
+        for row in rows:
+            yield (search_type, row[0]), kind, row[1], term_weights(zip(row[2:], weights))
+
+    def _source_query(self, search_type: str):
+        columns = _columns(search_type)
+        return _from(select(
+            columns["id"], columns["project_id"], *[column for column, _ in SEARCH_FIELDS[search_type]]
+        ), search_type)
+
+    async def _load(self, db: AsyncSession, search_type: str, ids: Optional[Set[int]] = None) -> None:
+        query = self._source_query(search_type)
+        if ids is None:
+            result = await db.stream(query.execution_options(yield_per=5000))
+            async for rows in result.partitions():
+                self.index.extend(self._documents(search_type, rows))
+            return
+        id_column = _columns(search_type)["id"]
+        for start in range(0, len(ids), 500):
+            batch = sorted(ids)[start:start + 500]
+            rows = (await db.execute(query.where(id_column.in_(batch)))).all()
+            self.index.extend(self._documents(search_type, rows))
+            for missing in set(batch) - {row[0] for row in rows}:
+                self.index.remove((search_type, missing))
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Build the index on first use, then apply queued changes."""
+        async with self._lock:
+            if not self.built:
+                for search_type in SEARCH_TYPES:
+                    await self._load(db, search_type)
+                self.index.merge()
+                self.built = True
+                return
+            if not self._pending and not self._deleted_projects:
+                return
+            pending, self._pending = self._pending, {}
+            deleted_projects, self._deleted_projects = self._deleted_projects, set()
+            for project_id in deleted_projects:
+                self.index.remove_where(scope=project_id)
+            for search_type, ids in pending.items():
+                if ids is None:
+                    self.index.remove_where(kind=SEARCH_TYPES.index(search_type))
+                await self._load(db, search_type, ids)
+            self.index.merge()
+
+    async def search(
+        self, db: AsyncSession, query: str, types: Sequence[str], project_id: Optional[int], offset: int, limit: int
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        await self.sync(db)
+        required, excluded = parse_query(query)
+        total, page = self.index.search(
+            required, excluded, kinds=[SEARCH_TYPES.index(t) for t in types], scope=project_id,
+            offset=offset, limit=limit,
+        )
+        if not page:
+            return total, []
+
+        terms = set(required)
+        details: Dict[Tuple[str, int], Any] = {}
+        for search_type in types:
+            ids = [key[1] for key, _ in page if key[0] == search_type]
+            if not ids:
+                continue
+            columns = _columns(search_type)
+            result = await db.execute(_from(select(
+                columns["id"].label("id"),
+                columns["project_id"].label("project_id"),
+                columns["meeting_id"].label("meeting_id"),
+                columns["title"].label("title"),
+                *columns["snippet"],
+            ), search_type).where(columns["id"].in_(ids)))
+            for row in result.all():
+                details[(search_type, row.id)] = row
+
+        items = []
+        for key, score in page:
+            row = details.get(key)
+            if row is not None:
+                text = " ".join(part for part in row[4:] if part)
+                items.append(_hit(key[0], row, highlight(text, terms), score))
+        return total, items
+
+
+fallback_index = FallbackSearchIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_search_flush(session, flush_context):
+    if not fallback_index.built:
+        return
+    changes = session.info.setdefault("search_changes", {})
+    deleted_projects = session.info.setdefault("search_deleted_projects", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        search_type = next((t for t, model in SEARCH_MODELS.items() if isinstance(obj, model)), None)
+        identity = inspect(obj).identity
+        if search_type and identity:
+            ids = changes.setdefault(search_type, set())
+            if ids is not None:
+                ids.add(identity[0])
+        elif isinstance(obj, Project) and obj in session.deleted and identity:
+            deleted_projects.add(identity[0])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_search_statements(orm_execute_state):
+    if not fallback_index.built:
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        tables = {model.__tablename__: t for t, model in SEARCH_MODELS.items()}
+        if table is not None and table.name in tables:
+            orm_execute_state.session.info.setdefault("search_changes", {})[tables[table.name]] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_changes(session):
+    changes = session.info.pop("search_changes", None)
+    deleted_projects = session.info.pop("search_deleted_projects", None)
+    if changes or deleted_projects:
+        fallback_index.record(changes or {}, deleted_projects or set())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_changes(session):
+    session.info.pop("search_changes", None)
+    session.info.pop("search_deleted_projects", None)
+
+
+# ============ Entry point ============
+
+def parse_search_types(types: Optional[str]) -> List[str]:
+    """Comma-separated `types` parameter; all types when empty."""
+    if not types:
+        return list(SEARCH_TYPES)
+    requested = list(dict.fromkeys(t.strip() for t in types.split(",") if t.strip()))
+    unknown = [t for t in requested if t not in SEARCH_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown types: {', '.join(unknown)}. Use: {', '.join(SEARCH_TYPES)}")
+    return requested
+
+
+async def search(
+    db: AsyncSession,
+    query: str,
+    types: Optional[Sequence[str]] = None,
+    project_id: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 20
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Ranked, highlighted matches for `query` across `types`.
+    Returns (total matches, hits for the requested page).
+    """
+    if not query.strip():
+        raise ValueError("Query must not be empty")
+    types = [t for t in SEARCH_TYPES if t in (types or SEARCH_TYPES)]
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_postgres(db, query, types, project_id, offset, limit)
+    return await fallback_index.search(db, query, types, project_id, offset, limit)
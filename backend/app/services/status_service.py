@@ -1,21 +1,136 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List
+from typing import List, Dict, Any, Optional, AsyncIterator
+from app.core.database import AsyncSessionLocal
 from app.models.status_report import StatusReport
 from app.models.project import Project
 from app.models.risk import Risk
 from app.models.meeting import Meeting
 from app.models.resource import Resource, Allocation
-from app.ai.llm_client import call_llm
+from app.ai.context_builder import ContextBuilder, truncate_to_tokens
+from app.ai.llm_client import call_llm, stream_llm
+from app.ai.rate_limiter import RateLimiter
+from app.core.config import settings
+from app.core.single_flight import coalesce
 from app.utils.file_utils import load_prompt
-import json
+from app.schemas.status_report import StatusReportResponse, BulkStatusReportResponse
+import asyncio
 
+STATUS_SYSTEM_PROMPT = "You are an executive assistant. Always return valid JSON."
 
-async def generate_status_report(
+
+SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+def _counts(values: List[Any]) -> str:
+    counts: Dict[str, int] = {}
+    for value in values:
+        counts[value or "unknown"] = counts.get(value or "unknown", 0) + 1
+    return ", ".join(f"{key} {count}" for key, count in sorted(counts.items(), key=lambda kv: -kv[1]))
+
+
+def build_status_context(
+    project: Project,
+    risks: List[Any],
+    meetings: List[Any],
+    resources: List[Any],
+    total_allocated: float
+) -> str:
+    """
+    Project information for the status report prompt, within llm_context_budget_tokens.
+    Risks are ranked by severity and resources by capacity; whatever does not fit
+    is reduced to the section totals.
+    """
+    budget = settings.llm_context_budget_tokens
+    builder = ContextBuilder(budget)
+    builder.add_section("Project", [], summary="\n".join([
+        f"Name: {project.name}",
+        f"Description: {truncate_to_tokens(project.description or 'N/A', budget // 8)}",
+        f"Status: {project.status}",
+    ]))
+
+    ranked_risks = sorted(risks, key=lambda risk: SEVERITY_RANK.get(risk.severity, len(SEVERITY_RANK)))
+    builder.add_section(
+        "Risks",
+        [f"- [{risk.severity}] {risk.title} ({risk.category}, {risk.status})" for risk in ranked_risks],
+        summary=(
+            f"Total risks: {len(risks)}. By severity: {_counts([r.severity for r in risks])}. "
+            f"By category: {_counts([r.category for r in risks])}"
+        ) if risks else None,
+        weight=1.0,
+        omitted=lambda count: f"... {count} lower-severity risks not listed",
+        empty="No risks recorded.",
+    )
+
+    builder.add_section(
+        "Recent meetings (newest first)",
+        [
+            f"- {meeting.title}: {meeting.summary or 'No summary'}"
+            + (f" Decisions: {meeting.decisions}" if meeting.decisions else "")
+            for meeting in meetings
+        ],
+        weight=2.0,
+        omitted=lambda count: f"... {count} older meetings not shown",
+        empty="No meetings recorded.",
+    )
+
+    ranked_resources = sorted(resources, key=lambda resource: -float(resource.capacity_hours))
+    builder.add_section(
+        "Resources",
+        [
+            f"- {resource.name} ({resource.role}): capacity {float(resource.capacity_hours):g}h, "
+            f"available {float(resource.availability_hours):g}h"
+            for resource in ranked_resources
+        ],
+        summary=(
+            f"Resources: {len(resources)}, total capacity {sum(float(r.capacity_hours) for r in resources):g}h, "
+            f"total availability {sum(float(r.availability_hours) for r in resources):g}h, "
+            f"total allocated hours {total_allocated:g}h"
+        ),
+        weight=1.0,
+        omitted=lambda count: (
+            f"... {count} more resources with "
+            f"{sum(float(r.capacity_hours) for r in ranked_resources[-count:]):g}h capacity"
+        ),
+    )
+    return builder.build()
+
+
+def build_status_report(
+    project_id: int,
+    llm_response: Dict[str, Any],
+    risks: List[Any],
+    meetings: List[Any],
+    resources: List[Any],
+    total_allocated: float
+) -> StatusReport:
+    """Create (unsaved) StatusReport from the LLM summary and the aggregated data."""
+    risks_summary = f"Total risks: {len(risks)}. "
+    if risks:
+        high_risks = [r for r in risks if r.severity == "high"]
+        risks_summary += f"High severity: {len(high_risks)}. "
+    
+    meetings_summary = f"Total meetings: {len(meetings)}"
+    if meetings:
+        latest = meetings[0]
+        meetings_summary += f". Latest: {latest.title}"
+    
+    resources_summary = f"Resources: {len(resources)}, Total allocated hours: {total_allocated}"
+    
+    return StatusReport(
+        project_id=project_id,
+        executive_summary=llm_response.get("executive_summary", ""),
+        risks_summary=risks_summary,
+        meetings_summary=meetings_summary,
+        resources_summary=resources_summary,
+    )
+
+
+async def load_status_project_data(
     db: AsyncSession,
     project_id: int
-) -> StatusReport:
-    """Generate status report by aggregating project data and using LLM."""
+) -> Dict[str, Any]:
+    """Load the project, risks, latest meetings, resources and allocated hours for one report."""
     project_result = await db.execute(
         select(Project).where(Project.id == project_id)
     )
@@ -48,64 +163,35 @@ async def generate_status_report(
     
     total_allocated = sum(float(alloc.allocated_hours) for alloc in allocations)
     
-    project_info = {
-        "project_name": project.name,
-        "project_description": project.description or "",
-        "project_status": project.status,
-        "risks": [
-            {
-                "title": risk.title,
-                "category": risk.category.value,
-                "severity": risk.severity,
-                "status": risk.status,
-            }
-            for risk in risks
-        ],
-        "recent_meetings": [
-            {
-                "title": meeting.title,
-                "summary": meeting.summary or "",
-                "decisions": meeting.decisions or "",
-            }
-            for meeting in meetings
-        ],
-        "resources": [
-            {
-                "name": resource.name,
-                "role": resource.role,
-                "capacity_hours": float(resource.capacity_hours),
-                "availability_hours": float(resource.availability_hours),
-            }
-            for resource in resources
-        ],
-        "total_allocated_hours": total_allocated,
+    return {
+        "project": project,
+        "risks": risks,
+        "meetings": meetings,
+        "resources": resources,
+        "total_allocated": total_allocated,
     }
+
+
+def build_status_prompt(data: Dict[str, Any], prompt_template: Optional[str] = None) -> str:
+    """Render the status prompt for data from load_status_project_data or load_status_inputs."""
+    project_info = build_status_context(
+        data["project"], data["risks"], data["meetings"], data["resources"], data["total_allocated"]
+    )
+    return (prompt_template or load_prompt("status_prompt")).format(project_info=project_info)
+
+
+async def generate_status_report(
+    db: AsyncSession,
+    project_id: int
+) -> StatusReport:
+    """Generate status report by aggregating project data and using LLM."""
+    data = await load_status_project_data(db, project_id)
+    prompt = build_status_prompt(data)
     
-    prompt_template = load_prompt("status_prompt")
-    prompt = prompt_template.format(project_info=json.dumps(project_info, indent=2))
-    
-    system_prompt = "You are an executive assistant. Always return valid JSON."
-    
-    llm_response = await call_llm(prompt, system_prompt=system_prompt)
-    
-    risks_summary = f"Total risks: {len(risks)}. "
-    if risks:
-        high_risks = [r for r in risks if r.severity == "high"]
-        risks_summary += f"High severity: {len(high_risks)}. "
-    
-    meetings_summary = f"Total meetings: {len(meetings)}"
-    if meetings:
-        latest = meetings[0]
-        meetings_summary += f". Latest: {latest.title}"
-    
-    resources_summary = f"Resources: {len(resources)}, Total allocated hours: {total_allocated}"
+    llm_response = await call_llm(prompt, system_prompt=STATUS_SYSTEM_PROMPT)
     
-    status_report = StatusReport(
-        project_id=project_id,
-        executive_summary=llm_response.get("executive_summary", ""),
-        risks_summary=risks_summary,
-        meetings_summary=meetings_summary,
-        resources_summary=resources_summary,
+    status_report = build_status_report(
+        project_id, llm_response, data["risks"], data["meetings"], data["resources"], data["total_allocated"]
     )
     
     db.add(status_report)
@@ -115,6 +201,186 @@ async def generate_status_report(
     return status_report
 
 
+async def generate_status_report_coalesced(project_id: int) -> Dict[str, Any]:
+    """
+    generate_status_report, shared by concurrent requests for the same project.
+    Returns the report serialized as a StatusReportResponse dict.
+    """
+    return await coalesce(
+        "status_generate", project_id, None,
+        lambda db: generate_status_report(db, project_id),
+        lambda report: StatusReportResponse.model_validate(report).model_dump(mode="json")
+    )
+
+
+async def stream_status_report(
+    db: AsyncSession,
+    project_id: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of generate_status_report.
+    Project data is loaded (and a missing project raises ValueError) before this
+    returns; the returned iterator yields stream_llm events and a final "done"
+    event with the saved report, which is written in its own session.
+    """
+    data = await load_status_project_data(db, project_id)
+    prompt = build_status_prompt(data)
+    # Release the request's connection while the LLM streams
+    await db.commit()
+
+    async def events() -> AsyncIterator[Dict[str, Any]]:
+        llm_response = None
+        async for event in stream_llm(prompt, system_prompt=STATUS_SYSTEM_PROMPT):
+            if event["event"] == "result":
+                llm_response = event["value"]
+            else:
+                yield event
+
+        status_report = build_status_report(
+            project_id, llm_response, data["risks"], data["meetings"], data["resources"], data["total_allocated"]
+        )
+        async with AsyncSessionLocal() as save_db:
+            save_db.add(status_report)
+            await save_db.commit()
+            await save_db.refresh(status_report)
+        yield {"event": "done", "record": StatusReportResponse.model_validate(status_report).model_dump(mode="json")}
+
+    return events()
+
+
+async def load_status_inputs(
+    db: AsyncSession,
+    project_ids: Optional[List[int]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Load status report inputs for many projects with set-based queries:
+    projects, their risks, their five latest meetings (window function),
+    their resources and their allocated hour totals.
+    """
+    project_query = select(Project).order_by(Project.id)
+    if project_ids:
+        project_query = project_query.where(Project.id.in_(project_ids))
+    else:
+        project_query = project_query.where(Project.status == "active")
+    projects = list((await db.execute(project_query)).scalars().all())
+
+    inputs = {
+        project.id: {"project": project, "risks": [], "meetings": [], "resources": [], "total_allocated": 0.0}
+        for project in projects
+    }
+    if not inputs:
+        return inputs
+    ids = list(inputs.keys())
+
+    risks_result = await db.execute(
+        select(Risk.project_id, Risk.title, Risk.category, Risk.severity, Risk.status)
+        .where(Risk.project_id.in_(ids))
+        .order_by(Risk.id)
+    )
+    for risk in risks_result.all():
+        inputs[risk.project_id]["risks"].append(risk)
+
+    meeting_rank = func.row_number().over(
+        partition_by=Meeting.project_id,
+        order_by=(Meeting.created_at.desc(), Meeting.id.desc())
+    ).label("meeting_rank")
+    ranked_meetings = (
+        select(Meeting.project_id, Meeting.title, Meeting.summary, Meeting.decisions, meeting_rank)
+        .where(Meeting.project_id.in_(ids))
+        .subquery()
+    )
+    meetings_result = await db.execute(
+        select(ranked_meetings)
+        .where(ranked_meetings.c.meeting_rank <= 5)
+        .order_by(ranked_meetings.c.project_id, ranked_meetings.c.meeting_rank)
+    )
+    for meeting in meetings_result.all():
+        inputs[meeting.project_id]["meetings"].append(meeting)
+
+    resources_result = await db.execute(
+        select(Resource.project_id, Resource.name, Resource.role, Resource.capacity_hours, Resource.availability_hours)
+        .where(Resource.project_id.in_(ids))
+        .order_by(Resource.id)
+    )
+    for resource in resources_result.all():
+        inputs[resource.project_id]["resources"].append(resource)
+
+    totals_result = await db.execute(
+        select(Allocation.project_id, func.sum(Allocation.allocated_hours))
+        .where(Allocation.project_id.in_(ids))
+        .group_by(Allocation.project_id)
+    )
+    for project_id, total in totals_result.all():
+        inputs[project_id]["total_allocated"] = float(total or 0)
+
+    return inputs
+
+
+async def generate_status_reports_bulk(
+    db: AsyncSession,
+    project_ids: Optional[List[int]] = None,
+    max_concurrency: Optional[int] = None,
+    requests_per_minute: Optional[int] = None
+) -> BulkStatusReportResponse:
+    """
+    Generate status reports for many projects (all active projects by default).
+    Inputs are loaded with a handful of set-based queries, LLM prompts are sent
+    concurrently under a semaphore and rate limiter, and all reports are written
+    in one transaction. Projects whose LLM call fails are reported, not retried.
+    """
+    inputs = await load_status_inputs(db, project_ids)
+
+    missing = [project_id for project_id in (project_ids or []) if project_id not in inputs]
+    failed = [{"project_id": project_id, "error": f"Project {project_id} not found"} for project_id in missing]
+
+    # End the read transaction so the connection returns to the pool during the LLM fan-out
+    await db.commit()
+
+    prompt_template = load_prompt("status_prompt")
+    semaphore = asyncio.Semaphore(min(max_concurrency or settings.status_bulk_concurrency, settings.status_bulk_concurrency))
+    rate = settings.llm_requests_per_minute
+    if requests_per_minute is not None:
+        # A caller may slow the batch down but not exceed the configured rate
+        rate = min(requests_per_minute, rate) if rate else requests_per_minute
+    limiter = RateLimiter(rate)
+
+    async def summarize(data: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = build_status_prompt(data, prompt_template)
+        async with semaphore:
+            await limiter.acquire()
+            return await call_llm(prompt, system_prompt=STATUS_SYSTEM_PROMPT)
+
+    project_inputs = list(inputs.values())
+    llm_responses = await asyncio.gather(
+        *[summarize(data) for data in project_inputs],
+        return_exceptions=True
+    )
+
+    status_reports = []
+    for data, llm_response in zip(project_inputs, llm_responses):
+        project_id = data["project"].id
+        if isinstance(llm_response, Exception):
+            failed.append({"project_id": project_id, "error": str(llm_response)})
+            continue
+        status_reports.append(build_status_report(
+            project_id, llm_response, data["risks"], data["meetings"], data["resources"], data["total_allocated"]
+        ))
+
+    reports = []
+    if status_reports:
+        db.add_all(status_reports)
+        await db.commit()
+
+        result = await db.execute(
+            select(StatusReport)
+            .where(StatusReport.id.in_([report.id for report in status_reports]))
+            .order_by(StatusReport.project_id)
+        )
+        reports = [StatusReportResponse.model_validate(report) for report in result.scalars().all()]
+
+    return BulkStatusReportResponse(reports=reports, failed=failed)
+
+
 async def get_status_report_by_project(
     db: AsyncSession,
     project_id: int
@@ -127,4 +393,3 @@ async def get_status_report_by_project(
         .limit(1)
     )
     return result.scalar_one_or_none()
-
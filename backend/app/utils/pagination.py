@@ -0,0 +1,146 @@
+"""
+Keyset pagination and field projection for list endpoints.
+Pages are ordered newest first on (created_at, id); the cursor is an opaque
+token naming the last row of the previous page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import select, func, and_, or_, literal
+from sqlalchemy.orm import load_only, selectinload
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """Encode the sort key of a row as a URL-safe cursor."""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Cursor for ranked results, where there is no stable sort key to resume from."""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_offset_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))["offset"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def parse_fields(
+    fields: Optional[str],
+    schema: Type[BaseModel],
+    model: Any,
+    relationships: Iterable[str] = ()
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields` parameter into response field names.
+    Only schema fields backed by a column (or one of `relationships`) are allowed.
+    """
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    allowed = (set(model.__table__.columns.keys()) | set(relationships)) & set(schema.model_fields)
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}")
+    return requested
+
+
+def paginated_query(
+    model: Any,
+    filters: Sequence[Any] = (),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    relationships: Iterable[str] = (),
+    sort_column: Any = None
+):
+    """
+    Build a newest-first keyset query for `model`.
+    With `fields`, only those columns (plus the sort key) are loaded and only the
+    requested relationships are eager-loaded. Fetches limit + 1 rows so
+    split_page can tell whether another page exists.
+    """
+    sort_column = sort_column if sort_column is not None else model.created_at
+    query = select(model).where(*filters)
+
+    relationships = list(relationships)
+    if fields is not None:
+        columns = [getattr(model, f) for f in fields if f in model.__table__.columns]
+        query = query.options(load_only(model.id, sort_column, *columns))
+        relationships = [name for name in relationships if name in fields]
+    for name in relationships:
+        query = query.options(selectinload(getattr(model, name)))
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # Compare against the stored value of the cursor row so the database's own
+        # timestamp representation is used; fall back to the encoded value if it was deleted
+        anchor = select(sort_column).where(model.id == row_id).scalar_subquery()
+        boundary = func.coalesce(anchor, literal(sort_value, sort_column.type))
+        query = query.where(
+            or_(sort_column < boundary, and_(sort_column == boundary, model.id < row_id))
+        )
+
+    query = query.order_by(sort_column.desc(), model.id.desc())
+    if limit:
+        query = query.limit(limit + 1)
+    return query
+
+
+def split_page(rows: List[Any], limit: Optional[int], sort_attr: str = "created_at") -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and return (page, next_cursor)."""
+    if not limit or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
+
+
+@lru_cache(maxsize=256)
+def _partial_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, None) for name in fields},
+    )
+
+
+def serialize_items(
+    items: Iterable[Any],
+    schema: Type[BaseModel],
+    fields: Optional[List[str]] = None
+) -> List[dict]:
+    """Serialize ORM rows (or dicts) with `schema`, restricted to `fields` when given."""
+    target = _partial_schema(schema, tuple(fields)) if fields is not None else schema
+    return [target.model_validate(item).model_dump(mode="json") for item in items]
+
+
+def page_response(items: List[dict], next_cursor: Optional[str]) -> JSONResponse:
+    """JSON list response; the next page's cursor goes in the X-Next-Cursor header."""
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return JSONResponse(content=items, headers=headers)
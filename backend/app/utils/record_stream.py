@@ -0,0 +1,82 @@
+"""
+Incremental NDJSON / CSV parsing of a streamed request body.
+Records are yielded as `(row, data, error)` while the body is still arriving, so
+large uploads are never held in memory; a malformed line becomes a per-row error
+instead of failing the whole upload. `row` is 1-based and excludes the CSV header.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+RECORD_FORMATS = ("ndjson", "csv")
+
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines (newline kept); a UTF-8 BOM is dropped."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """One JSON object per non-blank line."""
+    row = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, data, None
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """CSV with a header row; empty cells are left out so schema defaults apply."""
+    header = None
+    pending = ""
+    row = 0
+    async for line in iter_lines(chunks):
+        pending += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) > len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value.strip() for name, value in zip(header, values) if value.strip()}, None
+    if pending.strip():
+        yield row + 1, None, "Unterminated quoted field"
+
+
+def iter_records(chunks: AsyncIterator[bytes], record_format: str) -> AsyncIterator[Record]:
+    """Records from `chunks` in `record_format` ("ndjson" or "csv")."""
+    if record_format == "csv":
+        return iter_csv_records(chunks)
+    if record_format == "ndjson":
+        return iter_ndjson_records(chunks)
+    raise ValueError(f"Unsupported format '{record_format}'. Use one of: {', '.join(RECORD_FORMATS)}")
@@ -0,0 +1,30 @@
+import json
+import traceback
+from typing import Any, AsyncIterator, Dict
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _encode_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            payload = {key: value for key, value in event.items() if key != "event"}
+            yield format_sse(event["event"], payload)
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band
+        print(f"Error while streaming: {str(e)}")
+        print(traceback.format_exc())
+        yield format_sse("error", {"detail": str(e)})
+
+
+def sse_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Stream `{"event": name, ...}` dicts as a text/event-stream response."""
+    return StreamingResponse(
+        _encode_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
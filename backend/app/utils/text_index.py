@@ -0,0 +1,319 @@
+"""
+In-process full-text index: tokenizer, inverted index and snippet highlighting.
+Postings live in a compact NumPy main segment plus a small dict delta for
+documents added since the last merge, so writes are cheap and a query touches
+only the postings of its own terms.
+"""
+
+import math
+import re
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"\w+")
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_STOP = "</b>"
+# Multi-term queries whose rarest term matches over 1/DENSE_QUERY_RATIO of all slots are scored densely
+DENSE_QUERY_RATIO = 16
+
+STOP_WORDS = frozenset(
+    "a an and are as at be been but by can could did do does for from had has have he her his i if in into "
+    "is it its me my no not of on or our she so than that the their them then there these they this those "
+    "to too us was we were what when where which while who will with would you your".split()
+)
+
+
+def stem(token: str) -> str:
+    """Light suffix stripping so plurals and -ing/-ed/-ly forms match their base word."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    for suffix in ("ing", "ed", "ly"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased, stemmed terms of `text` without stop words."""
+    if not text:
+        return []
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str]]:
+    """
+    Web-search style query: every term is required and `-term` excludes it.
+    Quotes only group words, which are then required individually.
+    """
+    required, excluded = [], []
+    for word in query.replace('"', " ").split():
+        target = excluded if word.startswith("-") else required
+        target.extend(tokenize(word.lstrip("-")))
+    return list(dict.fromkeys(required)), list(dict.fromkeys(excluded))
+
+
+def highlight(text: Optional[str], terms: Set[str], max_words: int = 30) -> str:
+    """
+    A window of up to `max_words` words around the first match, with matching
+    words wrapped in <b></b> (the same markup as Postgres ts_headline).
+    """
+    if not text:
+        return ""
+    words = list(WORD_PATTERN.finditer(text))
+    if not words:
+        return ""
+    matches = [stem(word.group().lower()) in terms for word in words]
+    first = matches.index(True) if True in matches else 0
+    start = max(0, min(first - max_words // 3, len(words) - max_words))
+    end = min(len(words), start + max_words)
+
+    parts = []
+    position = words[start].start()
+    for index in range(start, end):
+        word = words[index]
+        parts.append(text[position:word.start()])
+        parts.append(f"{HIGHLIGHT_START}{word.group()}{HIGHLIGHT_STOP}" if matches[index] else word.group())
+        position = word.end()
+    return " ".join("".join(parts).split())
+
+
+def term_weights(fields: Iterable[Tuple[Optional[str], float]]) -> Dict[str, float]:
+    """Per-term weight of a document: field weights summed per occurrence, log-damped."""
+    weights: Dict[str, float] = {}
+    for text, weight in fields:
+        for term in tokenize(text):
+            weights[term] = weights.get(term, 0.0) + weight
+    return {term: 1.0 + math.log(value) if value >= 1.0 else value for term, value in weights.items()}
+
+
+class InvertedIndex:
+    """
+    Documents are identified by a hashable key and carry a small-int `kind` and an
+    integer `scope` (e.g. a project id) for filtering. Re-adding a key replaces
+    the document; removed documents are tombstoned until the next merge, which
+    also reclaims their slots.
+    """
+
+    def __init__(self, merge_threshold: int = 50_000):
+        self.merge_threshold = merge_threshold
+        self._keys: List[Hashable] = []
+        self._slots: Dict[Hashable, int] = {}
+        self._kinds = array("b")
+        self._scopes = array("q")
+        self._alive = array("b")
+        self._live = 0
+        # Main segment: postings of term i are _docs/_weights[_offsets[i]:_offsets[i + 1]], by slot
+        self._terms: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        # Delta segment: term -> {slot: weight} for slots added since the last merge
+        self._delta: Dict[str, Dict[int, float]] = {}
+        self._delta_postings = 0
+        # Documents from extend() waiting for the next merge
+        self._staged = (array("i"), array("i"), array("f"))
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _new_slot(self, key: Hashable, kind: int, scope: int) -> int:
+        self.remove(key)
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._slots[key] = slot
+        self._kinds.append(kind)
+        self._scopes.append(scope)
+        self._alive.append(1)
+        self._live += 1
+        return slot
+
+    def add(self, key: Hashable, kind: int, scope: int, weights: Dict[str, float]) -> None:
+        """Index (or re-index) one document from its term_weights."""
+        slot = self._new_slot(key, kind, scope)
+        for term, weight in weights.items():
+            self._delta.setdefault(term, {})[slot] = weight
+        self._delta_postings += len(weights)
+        if self._delta_postings >= self.merge_threshold:
+            self.merge()
+
+    def extend(self, documents: Iterable[Tuple[Hashable, int, int, Dict[str, float]]]) -> None:
+        """
+        Stage many documents for the main segment without per-term dicts; they
+        become searchable at the next merge(), so call it once loading is done.
+        """
+        term_ids, slots, weights = self._staged
+        for key, kind, scope, doc_weights in documents:
+            slot = self._new_slot(key, kind, scope)
+            for term, weight in doc_weights.items():
+                term_ids.append(self._terms.setdefault(term, len(self._terms)))
+                slots.append(slot)
+                weights.append(weight)
+
+    def remove(self, key: Hashable) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is not None and self._alive[slot]:
+            self._alive[slot] = 0
+            self._live -= 1
+
+    def remove_where(self, kind: Optional[int] = None, scope: Optional[int] = None) -> None:
+        """Remove every document of `kind` and/or in `scope`."""
+        mask = np.frombuffer(self._alive, dtype=np.bool_).copy()
+        if kind is not None:
+            mask &= np.frombuffer(self._kinds, dtype=np.int8) == kind
+        if scope is not None:
+            mask &= np.frombuffer(self._scopes, dtype=np.int64) == scope
+        for slot in np.flatnonzero(mask).tolist():
+            self.remove(self._keys[slot])
+
+    def _main_triples(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        counts = np.diff(self._offsets)
+        return np.repeat(np.arange(len(counts), dtype=np.int32), counts), self._docs, self._weights
+
+    def _compact(self) -> np.ndarray:
+        """Drop tombstoned slots, renumbering the rest in order; returns old slot -> new slot."""
+        alive = np.frombuffer(self._alive, dtype=np.bool_)
+        remap = np.cumsum(alive, dtype=np.int32) - 1
+        kept = np.flatnonzero(alive).tolist()
+        self._keys = [self._keys[slot] for slot in kept]
+        self._slots = {key: slot for slot, key in enumerate(self._keys)}
+        self._kinds = array("b", (self._kinds[slot] for slot in kept))
+        self._scopes = array("q", (self._scopes[slot] for slot in kept))
+        self._alive = array("b", bytes([1]) * len(kept))
+        return remap
+
+    def _rebuild(self, term_ids: np.ndarray, slots: np.ndarray, weights: np.ndarray) -> None:
+        main_terms, main_slots, main_weights = self._main_triples()
+        term_ids = np.concatenate([main_terms, term_ids])
+        slots = np.concatenate([main_slots, slots])
+        weights = np.concatenate([main_weights, weights])
+        keep = np.frombuffer(self._alive, dtype=np.bool_)[slots]
+        term_ids, slots, weights = term_ids[keep], slots[keep], weights[keep]
+        slots = self._compact()[slots]
+        # Terms left without postings are dropped and the rest renumbered
+        counts = np.bincount(term_ids, minlength=len(self._terms))
+        used = counts > 0
+        term_remap = np.cumsum(used, dtype=np.int32) - 1
+        self._terms = {term: int(term_remap[term_id]) for term, term_id in self._terms.items() if used[term_id]}
+        term_ids = term_remap[term_ids]
+        order = np.lexsort((slots, term_ids))
+        self._docs = slots[order]
+        self._weights = weights[order]
+        self._offsets = np.zeros(len(self._terms) + 1, dtype=np.int64)
+        np.cumsum(counts[used], out=self._offsets[1:])
+
+    def merge(self) -> None:
+        """
+        Fold the delta segment and staged documents into the main segment,
+        dropping tombstoned documents, their slots and terms nothing uses anymore.
+        """
+        term_ids, slots, weights = self._staged
+        for term, postings in self._delta.items():
+            term_id = self._terms.setdefault(term, len(self._terms))
+            term_ids.extend([term_id] * len(postings))
+            slots.extend(postings.keys())
+            weights.extend(postings.values())
+        self._delta = {}
+        self._delta_postings = 0
+        self._staged = (array("i"), array("i"), array("f"))
+        self._rebuild(np.frombuffer(term_ids, dtype=np.int32), np.frombuffer(slots, dtype=np.int32),
+                      np.frombuffer(weights, dtype=np.float32))
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, weights) for `term`, sorted by slot; may include tombstoned slots."""
+        docs, weights = self._docs[:0], self._weights[:0]
+        term_id = self._terms.get(term)
+        if term_id is not None:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs, weights = self._docs[start:end], self._weights[start:end]
+        delta = self._delta.get(term)
+        if delta:
+            docs = np.concatenate([docs, np.fromiter(delta.keys(), dtype=np.int32, count=len(delta))])
+            weights = np.concatenate([weights, np.fromiter(delta.values(), dtype=np.float32, count=len(delta))])
+        return docs, weights
+
+    def _match_sparse(self, lists, excluded, kinds, scope) -> Tuple[np.ndarray, np.ndarray]:
+        """Intersect from the rarest term; each step is a binary search into a longer list."""
+        docs, scores = lists[0]
+        for other_docs, other_scores in lists[1:]:
+            positions = np.minimum(np.searchsorted(other_docs, docs), len(other_docs) - 1)
+            found = other_docs[positions] == docs
+            docs, scores = docs[found], scores[found] + other_scores[positions[found]]
+
+        mask = np.frombuffer(self._alive, dtype=np.bool_)[docs]
+        if kinds is not None:
+            mask &= np.isin(np.frombuffer(self._kinds, dtype=np.int8)[docs], list(kinds))
+        if scope is not None:
+            mask &= np.frombuffer(self._scopes, dtype=np.int64)[docs] == scope
+        for term in excluded:
+            mask &= ~np.isin(docs, self.postings(term)[0])
+        return docs[mask], scores[mask]
+
+    def _match_dense(self, lists, excluded, kinds, scope) -> Tuple[np.ndarray, np.ndarray]:
+        """Accumulate into per-slot arrays; cheaper than intersecting when every list is long."""
+        scores = np.zeros(len(self._keys), dtype=np.float32)
+        mask = np.frombuffer(self._alive, dtype=np.bool_).copy()
+        for docs, weights in lists:
+            # Slots are unique within a postings list, so buffered fancy-index adds are safe
+            scores[docs] += weights
+            present = np.zeros(len(self._keys), dtype=np.bool_)
+            present[docs] = True
+            mask &= present
+        if kinds is not None:
+            mask &= np.isin(np.frombuffer(self._kinds, dtype=np.int8), list(kinds))
+        if scope is not None:
+            mask &= np.frombuffer(self._scopes, dtype=np.int64) == scope
+        for term in excluded:
+            mask[self.postings(term)[0]] = False
+        docs = np.flatnonzero(mask).astype(np.int32)
+        return docs, scores[docs]
+
+    def search(
+        self,
+        required: Sequence[str],
+        excluded: Sequence[str] = (),
+        kinds: Optional[Iterable[int]] = None,
+        scope: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[int, List[Tuple[Hashable, float]]]:
+        """
+        Documents containing every `required` term and no `excluded` term, ranked
+        by TF-IDF. Returns (total matches, [(key, score)] for the requested page).
+        """
+        if not required or not self._live:
+            return 0, []
+        lists = []
+        for term in dict.fromkeys(required):
+            docs, weights = self.postings(term)
+            if not len(docs):
+                return 0, []
+            idf = math.log(1.0 + self._live / len(docs))
+            lists.append((docs, weights * np.float32(idf)))
+        lists.sort(key=lambda item: len(item[0]))
+
+        if len(lists) > 1 and len(lists[0][0]) * DENSE_QUERY_RATIO > len(self._keys):
+            docs, scores = self._match_dense(lists, excluded, kinds, scope)
+        else:
+            docs, scores = self._match_sparse(lists, excluded, kinds, scope)
+
+        total = len(docs)
+        wanted = min(offset + limit, total)
+        if wanted <= offset:
+            return total, []
+        top = np.argpartition(-scores, wanted - 1)[:wanted] if wanted < total else np.arange(total)
+        # Score descending, then insertion order for ties
+        top = top[np.lexsort((docs[top], -scores[top]))][offset:wanted]
+        return total, [(self._keys[slot], float(scores[i])) for i, slot in zip(top.tolist(), docs[top].tolist())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self._live,
+            "slots": len(self._keys),
+            "terms": len(self._terms) + sum(1 for term in self._delta if term not in self._terms),
+            "postings": int(len(self._docs)) + self._delta_postings,
+            "delta_postings": self._delta_postings,
+        }
@@ -0,0 +1,223 @@
+"""
+Seeded synthetic PMO data for the benchmarks.
+The same seed and sizes always produce the same rows, so timings are comparable
+between runs and commits.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (
+    Project, ProjectRequirement, Resource, ResourceSkill, Allocation,
+    Risk, RiskMetric, Meeting, ActionItem, StatusReport,
+)
+from app.services.resource_service import refresh_allocated_hours
+from app.services.risk_analytics_service import calculate_risk_score, refresh_risk_aggregate
+
+SKILLS = ["Python", "React", "SQL", "Go", "AWS", "Docker", "Kubernetes", "TypeScript", "Java", "Terraform"]
+ROLES = ["Backend Engineer", "Frontend Engineer", "DevOps Engineer", "Data Engineer", "QA Engineer"]
+CATEGORIES = ["schedule", "budget", "resource", "technical", "scope", "quality"]
+SPEAKERS = ["Alice", "Bob", "Carol", "Dan", "Erin"]
+WORDS = (
+    "vendor delay budget review api launch security migration timeline staffing "
+    "decision testing rollout dependency scope estimate backlog sprint demo"
+).split()
+
+INSERT_CHUNK = 1000
+
+
+@dataclass
+class DatasetSize:
+    """Row counts for one generated dataset."""
+    name: str
+    projects: int
+    resources: int
+    allocations: int
+    risks_per_project: int = 10
+    metrics_per_risk: int = 6
+    meetings_per_project: int = 5
+    status_reports_per_project: int = 2
+
+
+SIZES = {
+    "small": DatasetSize("small", projects=20, resources=100, allocations=500),
+    "medium": DatasetSize("medium", projects=100, resources=500, allocations=5000),
+    "large": DatasetSize("large", projects=500, resources=2000, allocations=20000),
+}
+
+
+async def _insert(db: AsyncSession, model: Any, rows: List[Dict[str, Any]]) -> List[int]:
+    """Multi-row insert in chunks; returns the new ids in row order."""
+    ids: List[int] = []
+    for start in range(0, len(rows), INSERT_CHUNK):
+        result = await db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[start:start + INSERT_CHUNK],
+        )
+        ids.extend(result.scalars().all())
+    return ids
+
+
+def generate_transcript(rnd: random.Random, turns: int) -> str:
+    return "\n".join(
+        f"{rnd.choice(SPEAKERS)}: " + " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 40)))
+        for _ in range(turns)
+    )
+
+
+async def generate_dataset(db: AsyncSession, size: DatasetSize, seed: int = 42) -> Dict[str, int]:
+    """
+    Insert a synthetic portfolio into empty tables and return the row counts.
+    Risk aggregates are rebuilt so analytics read the same state the API would maintain.
+    """
+    rnd = random.Random(seed)
+    start_day = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+
+    project_rows = []
+    for i in range(size.projects):
+        start = start_day + timedelta(days=rnd.randint(0, 180))
+        project_rows.append({
+            "name": f"Project {i}",
+            "description": " ".join(rnd.choice(WORDS) for _ in range(30)),
+            "status": "active" if rnd.random() < 0.8 else "completed",
+            "priority": rnd.randint(1, 10),
+            "start_date": start,
+            "deadline": start + timedelta(days=rnd.randint(30, 240)),
+        })
+    project_ids = await _insert(db, Project, project_rows)
+
+    requirement_rows = [
+        {
+            "project_id": project_id,
+            "skill_name": skill,
+            "required_proficiency": rnd.randint(1, 5),
+            "required_hours": Decimal(rnd.randint(20, 200)),
+        }
+        for project_id in project_ids
+        for skill in rnd.sample(SKILLS, rnd.randint(1, 4))
+    ]
+    await _insert(db, ProjectRequirement, requirement_rows)
+
+    resource_rows = [
+        {
+            "project_id": rnd.choice(project_ids) if rnd.random() < 0.7 else None,
+            "name": f"Resource {i}",
+            "role": rnd.choice(ROLES),
+            "capacity_hours": Decimal(rnd.choice([80, 120, 160])),
+            "availability_hours": Decimal(rnd.choice([20, 40])),
+            "department": rnd.choice(["Engineering", "Data", "Platform"]),
+            "location": rnd.choice(["Remote", "Berlin", "Pune", "Austin"]),
+        }
+        for i in range(size.resources)
+    ]
+    resource_ids = await _insert(db, Resource, resource_rows)
+
+    skill_rows = [
+        {"resource_id": resource_id, "skill_name": skill, "proficiency_level": rnd.randint(1, 5)}
+        for resource_id in resource_ids
+        for skill in rnd.sample(SKILLS, rnd.randint(1, 5))
+    ]
+    await _insert(db, ResourceSkill, skill_rows)
+
+    allocation_rows = []
+    for _ in range(size.allocations):
+        start = start_day + timedelta(days=rnd.randint(0, 330))
+        dated = rnd.random() < 0.85
+        allocation_rows.append({
+            "resource_id": rnd.choice(resource_ids),
+            "project_id": rnd.choice(project_ids),
+            "allocated_hours": Decimal(rnd.randint(4, 40)),
+            "start_date": start if dated else None,
+            "end_date": start + timedelta(days=rnd.randint(7, 90)) if dated else None,
+        })
+    await _insert(db, Allocation, allocation_rows)
+    await refresh_allocated_hours(db)
+
+    risk_rows = []
+    for project_id in project_ids:
+        for j in range(size.risks_per_project):
+            probability, impact = rnd.randint(1, 10), rnd.randint(1, 10)
+            risk_rows.append({
+                "project_id": project_id,
+                "title": f"Risk {j}: {rnd.choice(WORDS)} {rnd.choice(WORDS)}",
+                "description": " ".join(rnd.choice(WORDS) for _ in range(25)),
+                "category": rnd.choice(CATEGORIES),
+                "probability": probability,
+                "impact": impact,
+                "severity": rnd.choice(["low", "medium", "high"]),
+                "risk_score": calculate_risk_score(probability, impact),
+                "trend": "stable",
+                "status": rnd.choice(["open", "open", "mitigated", "closed"]),
+                "approval_status": rnd.choice(["pending", "approved"]),
+                "is_escalated": 1 if rnd.random() < 0.1 else 0,
+            })
+    risk_ids = await _insert(db, Risk, risk_rows)
+
+    metric_rows = []
+    for risk_id in risk_ids:
+        score = rnd.uniform(5, 80)
+        for k in range(size.metrics_per_risk):
+            score = max(1.0, score + rnd.uniform(-10, 12))
+            metric_rows.append({
+                "risk_id": risk_id,
+                "probability": rnd.randint(1, 10),
+                "impact": rnd.randint(1, 10),
+                "risk_score": round(score, 2),
+                "severity": "medium",
+                "recorded_at": now - timedelta(days=(size.metrics_per_risk - k) * 4),
+            })
+    await _insert(db, RiskMetric, metric_rows)
+
+    meeting_rows = [
+        {
+            "project_id": project_id,
+            "title": f"Sync {j}",
+            "raw_text": generate_transcript(rnd, rnd.randint(20, 80)),
+            "summary": " ".join(rnd.choice(WORDS) for _ in range(60)),
+            "decisions": "- " + " ".join(rnd.choice(WORDS) for _ in range(10)),
+            "status": "completed",
+        }
+        for project_id in project_ids
+        for j in range(size.meetings_per_project)
+    ]
+    meeting_ids = await _insert(db, Meeting, meeting_rows)
+
+    action_item_rows = [
+        {"meeting_id": meeting_id, "description": f"Follow up on {rnd.choice(WORDS)}", "status": "open"}
+        for meeting_id in meeting_ids
+        for _ in range(rnd.randint(0, 3))
+    ]
+    await _insert(db, ActionItem, action_item_rows)
+
+    status_rows = [
+        {
+            "project_id": project_id,
+            "executive_summary": " ".join(rnd.choice(WORDS) for _ in range(80)),
+            "risks_summary": "Total risks: 10.",
+            "meetings_summary": "Total meetings: 5.",
+            "resources_summary": "Resources: 4.",
+        }
+        for project_id in project_ids
+        for _ in range(size.status_reports_per_project)
+    ]
+    await _insert(db, StatusReport, status_rows)
+
+    for project_id in project_ids:
+        await refresh_risk_aggregate(db, project_id)
+    await db.commit()
+
+    return {
+        **{key: value for key, value in asdict(size).items() if key != "name"},
+        "requirements": len(requirement_rows),
+        "skills": len(skill_rows),
+        "risks": len(risk_rows),
+        "risk_metrics": len(metric_rows),
+        "meetings": len(meeting_rows),
+        "action_items": len(action_item_rows),
+        "status_reports": len(status_rows),
+    }
@@ -0,0 +1,79 @@
+"""
+Offline stand-in for the Groq client so LLM-backed endpoints can be timed
+without network access. One canned JSON document satisfies every prompt.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+STUB_RESPONSE = json.dumps({
+    "summary": "The team reviewed the rollout plan and agreed on the next milestones.",
+    "decisions": "- Ship the API migration behind a feature flag",
+    "open_questions": "- Who owns the vendor escalation?",
+    "action_items": [
+        {"description": "Draft the rollout checklist", "assignee": "Alice", "due_date": None},
+    ],
+    "executive_summary": "The project is on track; two high-severity risks need owners.",
+    "risks": [
+        {
+            "title": "Vendor delivery delay",
+            "description": "The vendor has missed two interim deadlines.",
+            "category": "schedule",
+            "probability": 6,
+            "impact": 7,
+            "severity": "high",
+            "mitigation_plan": "Agree on a recovery plan with the vendor.",
+        },
+    ],
+})
+
+
+class _StubStream:
+    def __init__(self, text: str, latency: float, chunk_size: int = 16):
+        self.text = text
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        pieces = range(0, len(self.text), self.chunk_size)
+        for start in pieces:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(pieces))
+            delta = SimpleNamespace(content=self.text[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)
+
+
+class _StubCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def create(self, stream: bool = False, **kwargs):
+        self.calls += 1
+        if stream:
+            return _StubStream(STUB_RESPONSE, self.latency)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        usage = SimpleNamespace(prompt_tokens=len(kwargs["messages"][-1]["content"]) // 4, completion_tokens=len(STUB_RESPONSE) // 4)
+        message = SimpleNamespace(content=STUB_RESPONSE)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class StubLLMClient:
+    """Mimics the parts of AsyncGroq used by app.ai.llm_client."""
+
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=_StubCompletions(latency))
+
+
+def install_llm_stub(latency: float = 0.0) -> StubLLMClient:
+    """Route all LLM calls to the stub and disable the response cache."""
+    from app.ai import llm_client
+    from app.core.config import settings
+
+    stub = StubLLMClient(latency)
+    settings.groq_api_key = settings.groq_api_key or "benchmark-stub"
+    settings.llm_cache_enabled = False
+    llm_client.client = stub
+    return stub
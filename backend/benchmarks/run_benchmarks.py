@@ -0,0 +1,250 @@
+"""
+Offline benchmark harness.
+
+Generates a seeded dataset for each requested size, times the optimizer,
+conflict detection, utilization, risk analytics and list endpoints (with the
+LLM stubbed), and writes the results as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmarks --sizes small,medium --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --max-slowdown 1.5
+    python -m benchmarks.run_benchmarks --database-url postgresql+asyncpg://... --reset
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Noise floor: regressions are only reported for benchmarks slower than this
+MIN_COMPARABLE_MS = 2.0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the offline PMO backend benchmarks.")
+    parser.add_argument("--database-url", help="Database to benchmark against (default: a temporary SQLite file)")
+    parser.add_argument("--reset", action="store_true", help="Allow dropping and recreating all tables in --database-url")
+    parser.add_argument("--sizes", default="small,medium", help="Comma-separated dataset sizes (small, medium, large)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="Data generator seed")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated LLM latency in seconds")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.5, help="Median ratio vs. baseline that counts as a regression")
+    return parser.parse_args(argv)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _summarize(durations: List[float], queries: List[int]) -> Dict[str, Any]:
+    ordered = sorted(durations)
+    p95_index = min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))
+    return {
+        "iterations": len(durations),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "queries": round(statistics.fmean(queries), 1),
+    }
+
+
+def build_benchmarks(client: Any, project_id: int) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """Benchmark name -> coroutine function. Service benchmarks use their own session."""
+    from app.core.database import AsyncSessionLocal
+    from app.schemas.meeting import MeetingUpload
+    from app.schemas.resource import PortfolioOptimizationRequest
+    from app.services.allocation_optimizer_service import (
+        get_resource_utilization, detect_scheduling_conflicts, recommend_optimal_allocation
+    )
+    from app.services.portfolio_optimizer_service import optimize_portfolio_allocation
+    from app.services.risk_analytics_service import get_risk_analytics, detect_early_warnings, refresh_risk_trends
+    from benchmarks.data_generator import generate_transcript
+
+    def service(function: Callable, *args: Any) -> Callable[[], Awaitable[Any]]:
+        async def run() -> Any:
+            async with AsyncSessionLocal() as db:
+                return await function(db, *args)
+        return run
+
+    def get(url: str, **params: Any) -> Callable[[], Awaitable[Any]]:
+        async def run() -> Any:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+        return run
+
+    def post(url: str, body: Any = None) -> Callable[[], Awaitable[Any]]:
+        async def run() -> Any:
+            response = await client.post(url, json=body)
+            response.raise_for_status()
+        return run
+
+    long_transcript = generate_transcript(random.Random(7), 1500)
+
+    return {
+        "utilization_all": service(get_resource_utilization),
+        "utilization_timeline_week": get("/resources/utilization/timeline", **{"from": "2026-01-01", "to": "2026-12-31"}),
+        "scheduling_conflicts": service(detect_scheduling_conflicts),
+        "recommend_allocation": service(recommend_optimal_allocation, project_id),
+        "portfolio_optimizer": service(optimize_portfolio_allocation, PortfolioOptimizationRequest(time_budget_seconds=5.0)),
+        "risk_analytics": service(get_risk_analytics, project_id),
+        "early_warnings": service(detect_early_warnings, project_id),
+        "risk_trend_refresh": service(refresh_risk_trends),
+        "list_projects": get("/projects"),
+        "list_risks_page": get("/risks", limit=50),
+        "list_risks_all": get("/risks"),
+        "list_resources_page": get("/resources", limit=50),
+        "list_resources_all": get("/resources"),
+        "list_meetings_page_projected": get("/meetings", limit=50, fields="id,project_id,title,created_at"),
+        "list_meetings_all": get("/meetings"),
+        "list_status_page": get("/status", limit=50),
+        "status_generate": post(f"/status/generate/{project_id}"),
+        "meeting_upload_long": post("/meetings/upload", MeetingUpload(
+            project_id=project_id, title="Benchmark workshop", raw_text=long_transcript
+        ).model_dump()),
+    }
+
+
+async def run_size(size_name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from sqlalchemy import select
+    from app.core.database import engine, AsyncSessionLocal, Base
+    from app.core.metrics import track_request_stats
+    from app.main import app
+    from app.models import Project
+    from benchmarks.data_generator import SIZES, generate_dataset
+
+    size = SIZES[size_name]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        counts = await generate_dataset(db, size, seed=args.seed)
+        project_id = (await db.execute(
+            select(Project.id).where(Project.status == "active").order_by(Project.id).limit(1)
+        )).scalar_one()
+    generation_seconds = time.perf_counter() - started
+    print(f"[{size_name}] generated {counts} in {generation_seconds:.1f}s")
+
+    only = set(args.only.split(",")) if args.only else None
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for name, benchmark in build_benchmarks(client, project_id).items():
+            if only and name not in only:
+                continue
+            try:
+                await benchmark()  # warm-up
+                durations, queries = [], []
+                for _ in range(args.repeat):
+                    with track_request_stats() as stats:
+                        start = time.perf_counter()
+                        await benchmark()
+                        durations.append(time.perf_counter() - start)
+                    queries.append(stats.db_queries)
+                results[name] = _summarize(durations, queries)
+                print(f"[{size_name}] {name}: {results[name]['median_ms']} ms median, {results[name]['queries']} queries")
+            except Exception as e:
+                results[name] = {"error": str(e)}
+                print(f"[{size_name}] {name}: failed: {str(e)}")
+
+    return {
+        "size": size_name,
+        "counts": counts,
+        "generation_seconds": round(generation_seconds, 3),
+        "benchmarks": results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], max_slowdown: float) -> List[Dict[str, Any]]:
+    """Benchmarks whose median grew by more than `max_slowdown` times against the baseline."""
+    baseline_runs = {run["size"]: run["benchmarks"] for run in baseline.get("results", [])}
+    regressions = []
+    for run in current["results"]:
+        previous = baseline_runs.get(run["size"], {})
+        for name, result in run["benchmarks"].items():
+            before = previous.get(name, {}).get("median_ms")
+            after = result.get("median_ms")
+            if before is None or after is None or max(before, after) < MIN_COMPARABLE_MS:
+                continue
+            ratio = after / before if before else float("inf")
+            if ratio > max_slowdown:
+                regressions.append({
+                    "size": run["size"],
+                    "benchmark": name,
+                    "baseline_ms": before,
+                    "current_ms": after,
+                    "ratio": round(ratio, 2),
+                })
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    from benchmarks.llm_stub import install_llm_stub
+
+    install_llm_stub(args.llm_latency)
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "database": os.environ["DATABASE_URL"].split("://")[0],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "llm_latency_seconds": args.llm_latency,
+        },
+        "results": [await run_size(size, args) for size in sizes],
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare_results(report, json.load(f), args.max_slowdown)
+        for regression in report["regressions"]:
+            print(
+                f"REGRESSION [{regression['size']}] {regression['benchmark']}: "
+                f"{regression['baseline_ms']} ms -> {regression['current_ms']} ms (x{regression['ratio']})"
+            )
+        exit_code = 1 if report["regressions"] else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.database_url:
+        if not arguments.database_url.startswith("sqlite") and not arguments.reset:
+            sys.exit("Refusing to drop tables in a non-SQLite database without --reset")
+        os.environ["DATABASE_URL"] = arguments.database_url
+    else:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="pmo-bench-"), "bench.sqlite")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_path}"
+    # List benchmarks time their queries, not response-cache hits
+    os.environ["CACHE_BACKEND"] = "none"
+    # Settings are read at import time, so the app is imported only after these are set
+    sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,12 @@
+"""
+Unit tests for modules that need neither the database nor the LLM provider.
+app.core.config requires DATABASE_URL, so a throwaway SQLite URL is set before
+anything from `app` is imported. (test_module3.py is the separate end-to-end
+check against a running deployment.)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
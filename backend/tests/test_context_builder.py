@@ -0,0 +1,75 @@
+import random
+from app.ai.chunking import estimate_tokens
+from app.ai.context_builder import ContextBuilder, truncate_to_tokens
+
+WORDS = "risk budget delay vendor staffing migration review overrun schedule dependency".split()
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def test_truncate_to_tokens():
+    assert truncate_to_tokens("short text", 10) == "short text"
+    cut = truncate_to_tokens("word " * 100, 10)
+    assert estimate_tokens(cut) <= 10
+    assert cut.endswith("…")
+
+
+def test_everything_is_kept_when_it_fits():
+    builder = ContextBuilder(1000)
+    builder.add_section("Risks", ["R1 high", "R2 low"], summary="2 risks")
+    builder.add_section("Meetings", [], empty="No meetings recorded")
+    assert builder.build() == (
+        "--- RISKS ---\n2 risks\nR1 high\nR2 low\n\n"
+        "--- MEETINGS ---\nNo meetings recorded"
+    )
+
+
+def test_items_that_do_not_fit_are_noted_in_rank_order():
+    builder = ContextBuilder(200)
+    items = [f"Risk {number}: " + "detail " * 10 for number in range(50)]
+    builder.add_section("Risks", items, summary="50 risks", omitted=lambda count: f"({count} lower-ranked risks omitted)")
+    context = builder.build()
+    kept = [line for line in context.splitlines() if line.startswith("Risk ")]
+    assert kept == items[:len(kept)]
+    assert 0 < len(kept) < 50
+    assert context.endswith(f"({50 - len(kept)} lower-ranked risks omitted)")
+    assert "50 risks" in context
+
+
+def test_heavier_sections_get_more_of_the_budget():
+    builder = ContextBuilder(400)
+    item = "entry " * 5
+    builder.add_section("Light", [item] * 100, weight=1)
+    builder.add_section("Heavy", [item] * 100, weight=3)
+    builder.build()
+    light, heavy = builder.sections
+    assert len(heavy.kept) > 2 * len(light.kept) > 0
+
+
+def test_budget_is_never_exceeded():
+    rng = random.Random(7)
+    for _ in range(500):
+        budget = rng.randint(300, 4000)
+        builder = ContextBuilder(budget)
+        for _ in range(rng.randint(1, 6)):
+            items = [words(rng, rng.randint(1, 120)) for _ in range(rng.randint(0, 80))]
+            builder.add_section(
+                words(rng, 2),
+                items,
+                summary=words(rng, rng.randint(1, 12)) if rng.random() < 0.7 else None,
+                weight=rng.choice([0.5, 1.0, 2.0, 3.0]),
+                omitted=(lambda count: f"... {count} more " + "very long explanation " * 20)
+                if rng.random() < 0.3 else None,
+                empty=words(rng, rng.randint(1, 20)) if rng.random() < 0.5 else None,
+            )
+        assert estimate_tokens(builder.build()) <= budget
+
+
+def test_single_items_are_capped_at_a_share_of_the_budget():
+    builder = ContextBuilder(400)
+    builder.add_section("Notes", ["x" * 10_000, "short"])
+    context = builder.build()
+    assert estimate_tokens(context) <= 400
+    assert "short" in context
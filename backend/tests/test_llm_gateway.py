@@ -0,0 +1,261 @@
+import asyncio
+import time
+import pytest
+from app.ai.llm_gateway import CircuitBreaker, LLMGateway, LLMTimeoutError, LLMUnavailableError
+from app.core.config import settings
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClient:
+    """Stands in for AsyncGroq: each create() call runs the next scripted step."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    async def create(self, **kwargs):
+        step = self.steps[min(self.calls, len(self.steps) - 1)]
+        self.calls += 1
+        return await step(**kwargs)
+
+
+def reply(text, delay=0.0):
+    async def step(**kwargs):
+        await asyncio.sleep(delay)
+        if kwargs.get("stream"):
+            return stream_of(text)
+        return text
+    return step
+
+
+def fail(status_code):
+    async def step(**kwargs):
+        raise StatusError(status_code)
+    return step
+
+
+def hang():
+    async def step(**kwargs):
+        await asyncio.sleep(3600)
+    return step
+
+
+class FakeStream:
+    """Provider stream of words that records whether it was closed."""
+
+    opened = []
+
+    def __init__(self, text):
+        self.words = text.split()
+        self.closed = False
+        FakeStream.opened.append(self)
+
+    async def __aiter__(self):
+        for word in self.words:
+            yield word
+
+    async def close(self):
+        self.closed = True
+
+
+def stream_of(text):
+    return FakeStream(text)
+
+
+def stalled_stream():
+    async def step(**kwargs):
+        stream = FakeStream("")
+
+        async def never():
+            await asyncio.sleep(3600)
+            yield None
+        stream.__aiter__ = never
+        return stream
+    return step
+
+
+@pytest.fixture(autouse=True)
+def gateway_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 2.0)
+    monkeypatch.setattr(settings, "llm_max_retries", 3)
+    monkeypatch.setattr(settings, "llm_retry_base_seconds", 0.01)
+    monkeypatch.setattr(settings, "llm_retry_max_seconds", 0.02)
+    monkeypatch.setattr(settings, "llm_hedge_enabled", False)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_breaker_failure_threshold", 3)
+    monkeypatch.setattr(settings, "llm_breaker_reset_seconds", 30)
+
+
+def expire(breaker):
+    breaker.opened_at -= breaker.reset_seconds
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert 29 < breaker.retry_in() <= 30
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    expire(breaker)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    # A failed probe reopens the circuit for another reset period
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    expire(breaker)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_retries_transient_errors_then_succeeds():
+    gateway = LLMGateway()
+    client = FakeClient(fail(503), fail(429), reply("ok"))
+    assert asyncio.run(gateway.complete(client)) == "ok"
+    assert client.calls == 3
+    assert gateway.retries == 2
+    assert gateway.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    gateway = LLMGateway()
+    client = FakeClient(fail(400), reply("ok"))
+    with pytest.raises(StatusError):
+        asyncio.run(gateway.complete(client))
+    assert client.calls == 1
+    assert gateway.breaker.failures == 0
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(settings, "llm_breaker_failure_threshold", 1000)
+    gateway = LLMGateway()
+    client = FakeClient(fail(502))
+    with pytest.raises(StatusError):
+        asyncio.run(gateway.complete(client))
+    assert client.calls == settings.llm_max_retries + 1
+
+
+def test_open_circuit_rejects_without_calling_the_provider():
+    gateway = LLMGateway()
+    failing = FakeClient(fail(500))
+    # The retry loop stops at the attempt that finds the circuit open
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(gateway.complete(failing))
+    assert failing.calls == settings.llm_breaker_failure_threshold
+    assert gateway.breaker.state == "open"
+
+    healthy = FakeClient(reply("ok"))
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(gateway.complete(healthy))
+    assert healthy.calls == 0
+
+    expire(gateway.breaker)
+    assert asyncio.run(gateway.complete(healthy)) == "ok"
+    assert gateway.breaker.state == "closed"
+
+
+def test_rate_limits_do_not_open_the_circuit(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 5)
+    gateway = LLMGateway()
+    client = FakeClient(fail(429), fail(429), fail(429), fail(429), reply("ok"))
+    assert asyncio.run(gateway.complete(client)) == "ok"
+    assert gateway.breaker.state == "closed" and gateway.breaker.failures == 0
+
+
+def test_deadline_bounds_a_hanging_call(monkeypatch):
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 0.2)
+    gateway = LLMGateway()
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(gateway.complete(FakeClient(hang())))
+    assert time.monotonic() - started < 1.0
+    assert gateway.timeouts == 1
+
+
+def test_deadline_covers_retries(monkeypatch):
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 0.3)
+    monkeypatch.setattr(settings, "llm_max_retries", 100)
+    monkeypatch.setattr(settings, "llm_retry_base_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_retry_max_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_breaker_failure_threshold", 1000)
+    gateway = LLMGateway()
+    started = time.monotonic()
+    with pytest.raises(StatusError):
+        asyncio.run(gateway.complete(FakeClient(fail(503))))
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedged_request_wins_over_a_slow_primary(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_enabled", True)
+    gateway = LLMGateway()
+    for _ in range(25):
+        gateway.latency.record(0.01)
+    client = FakeClient(reply("slow", delay=1.0), reply("fast"))
+    started = time.monotonic()
+    assert asyncio.run(gateway.complete(client)) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert (gateway.hedges, gateway.hedge_wins) == (1, 1)
+
+
+def test_stream_retries_before_the_first_chunk():
+    gateway = LLMGateway()
+    client = FakeClient(fail(503), reply("one two three"))
+
+    async def collect():
+        return [chunk async for chunk in gateway.stream(client)]
+
+    assert asyncio.run(collect()) == ["one", "two", "three"]
+    assert client.calls == 2
+    assert FakeStream.opened[-1].closed
+
+
+def test_stream_is_closed_when_the_consumer_stops_early():
+    gateway = LLMGateway()
+    client = FakeClient(reply("one two three"))
+
+    async def first_word():
+        stream = gateway.stream(client)
+        async for chunk in stream:
+            await stream.aclose()
+            return chunk
+
+    assert asyncio.run(first_word()) == "one"
+    assert FakeStream.opened[-1].closed
+
+
+def test_stream_stalled_before_the_first_chunk_is_closed_and_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 0.2)
+    gateway = LLMGateway()
+    FakeStream.opened.clear()
+
+    async def collect():
+        return [chunk async for chunk in gateway.stream(FakeClient(stalled_stream()))]
+
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(collect())
+    assert FakeStream.opened and all(stream.closed for stream in FakeStream.opened)
@@ -0,0 +1,125 @@
+from app.utils.text_index import InvertedIndex, parse_query, term_weights
+
+RISK, MEETING = 1, 2
+
+
+def doc(text):
+    return term_weights([(text, 1.0)])
+
+
+def search(index, query, **filters):
+    required, excluded = parse_query(query)
+    return index.search(required, excluded, **filters)
+
+
+def keys(result):
+    return [key for key, _ in result[1]]
+
+
+def make_index():
+    index = InvertedIndex(merge_threshold=10_000)
+    index.add("r1", RISK, 1, doc("database migration delayed"))
+    index.add("r2", RISK, 2, doc("vendor contract delayed"))
+    index.add("m1", MEETING, 1, doc("migration review meeting"))
+    return index
+
+
+def test_add_and_search_require_every_term():
+    index = make_index()
+    assert sorted(keys(search(index, "delayed"))) == ["r1", "r2"]
+    assert keys(search(index, "migration delay")) == ["r1"]
+    assert search(index, "missing") == (0, [])
+    assert index.search([]) == (0, [])
+
+
+def test_search_filters_excluded_kinds_and_scope():
+    index = make_index()
+    assert sorted(keys(search(index, "migration"))) == ["m1", "r1"]
+    assert keys(search(index, "migration -meeting")) == ["r1"]
+    assert keys(search(index, "migration", kinds=[MEETING])) == ["m1"]
+    assert sorted(keys(search(index, "delay", scope=2))) == ["r2"]
+
+
+def test_search_pages_by_score_then_insertion_order():
+    index = InvertedIndex()
+    for number in range(5):
+        index.add(number, RISK, 1, doc("budget"))
+    total, page = search(index, "budget", offset=1, limit=2)
+    assert total == 5
+    assert [key for key, _ in page] == [1, 2]
+
+
+def test_readding_a_key_replaces_the_document():
+    index = make_index()
+    index.add("r1", RISK, 1, doc("staffing shortage"))
+    assert len(index) == 3
+    assert keys(search(index, "migration")) == ["m1"]
+    assert keys(search(index, "staffing")) == ["r1"]
+
+
+def test_remove_and_remove_where():
+    index = make_index()
+    index.remove("r2")
+    index.remove("r2")
+    assert len(index) == 2
+    assert keys(search(index, "delay")) == ["r1"]
+
+    index.remove_where(kind=RISK, scope=1)
+    assert len(index) == 1
+    assert keys(search(index, "migration")) == ["m1"]
+
+    index.remove_where(scope=1)
+    assert len(index) == 0
+    assert search(index, "migration") == (0, [])
+
+
+def test_merge_keeps_results_and_reclaims_tombstoned_slots():
+    index = make_index()
+    before = search(index, "migration")
+    index.merge()
+    assert search(index, "migration") == before
+
+    index.remove("r1")
+    index.add("m1", MEETING, 1, doc("migration retrospective"))
+    assert index.stats()["slots"] == 4
+    index.merge()
+    stats = index.stats()
+    assert stats["documents"] == stats["slots"] == 2
+    assert stats["delta_postings"] == 0
+    # "database" only occurred in the removed r1
+    assert "database" not in index._terms
+    assert keys(search(index, "migration")) == ["m1"]
+    assert keys(search(index, "retrospective")) == ["m1"]
+    assert keys(search(index, "vendor", scope=2, kinds=[RISK])) == ["r2"]
+
+    # Documents added after a compaction still resolve to the right keys
+    index.add("r3", RISK, 2, doc("vendor insolvency"))
+    index.remove("r2")
+    assert keys(search(index, "vendor")) == ["r3"]
+    index.merge()
+    assert keys(search(index, "vendor")) == ["r3"]
+    assert index.stats()["slots"] == 2
+
+
+def test_extend_is_searchable_after_merge():
+    index = InvertedIndex()
+    index.extend([(n, RISK, n % 2, doc(f"item {'even' if n % 2 == 0 else 'odd'} shared")) for n in range(10)])
+    index.extend([(0, RISK, 0, doc("replaced"))])
+    index.merge()
+    assert len(index) == 10
+    assert index.stats()["slots"] == 10
+    assert search(index, "shared")[0] == 9
+    assert sorted(keys(search(index, "even"))) == [2, 4, 6, 8]
+    assert keys(search(index, "replaced")) == [0]
+
+
+def test_dense_and_sparse_matching_agree():
+    index = InvertedIndex()
+    for number in range(200):
+        words = ["common", "frequent"] + (["rare"] if number % 50 == 0 else [])
+        index.add(number, RISK, number % 3, doc(" ".join(words)))
+    index.merge()
+    # Both terms are in every document, so this query takes the dense path
+    dense_total, _ = search(index, "common frequent", scope=0, limit=5)
+    assert dense_total == len([n for n in range(200) if n % 3 == 0])
+    assert sorted(keys(search(index, "rare common"))) == [0, 50, 100, 150]